@@ -4,20 +4,60 @@ VIB34D Professional Dashboard Production Package Creator
 Creates optimized deployment packages with all necessary files
 """
 
+import argparse
 import os
 import shutil
 import json
 import time
 import zipfile
 import hashlib
+import re
+import subprocess
+import sys
 from pathlib import Path
 
+from vib34d_artifact_store import ArtifactStore
+from vib34d_asset_graph import AssetGraph
+from vib34d_build_profile import BuildProfiler
+from vib34d_bundler import ESModuleBundler
+from vib34d_delta import create_delta_package
+from vib34d_dispatch import compile_dispatch, load_dispatch_documents
+from vib34d_image_optimizer import ImageOptimizer, ImageFormatError
+from vib34d_page_weight import BUDGETS_FILE, BudgetError, PageWeightAnalyzer, load_budgets
+from vib34d_param_buffer import compile_parameter_buffer, load_parameter_documents
+from vib34d_schema import DocumentValidator
+from vib34d_service_worker import SERVICE_WORKER_FILE, inject_registration, render_service_worker
+from vib34d_shaders import COMPILED_DIR, build_permutations, load_shader_sources, write_compiled
+
+ASSET_REFERENCE_RE = re.compile(
+    r'(?P<prefix>\bimport\s*\(?\s*|\bfrom\s*|\bfetch\s*\(\s*|\b(?:src|href)\s*=\s*|url\(\s*)'
+    r'(?P<quote>[\'"]?)(?P<path>[^\'"()\s<>]+\.(?:js|css|json))(?P=quote)'
+)
+
+# Pages the package is built around; the first one becomes index.html
+DEFAULT_ENTRY_PAGES = [
+    'index_VIB34D_PROFESSIONAL.html',
+    'index_COMPLETE_SYSTEM.html',
+    'desktop-demo.html',
+    'VIB34D_EDITOR_DASHBOARD.html'
+]
+
 class VIB34DProductionPackager:
     """Creates production-ready deployment packages"""
     
-    def __init__(self, source_dir='.', output_dir='production-package'):
+    def __init__(self, source_dir='.', output_dir='production-package', quantize_images=False,
+                 entry_pages=None, previous_manifest=None, cprofile_path=None, static_export_dir=None,
+                 allow_invalid_configs=()):
         self.source_dir = Path(source_dir)
         self.output_dir = Path(output_dir)
+        self.entry_pages = list(entry_pages or DEFAULT_ENTRY_PAGES)
+        self.cache_dir = self.source_dir / '.vib34d-cache'
+        self.quantize_images = quantize_images
+        self.previous_manifest = previous_manifest
+        self.cprofile_path = cprofile_path
+        self.static_export_dir = static_export_dir
+        # Documents that may be left out of the package when they fail validation; anything else fails the build
+        self.allow_invalid_configs = set(allow_invalid_configs)
         self.package_info = {
             'name': 'VIB34D Professional Dashboard',
             'version': '1.0.0',
@@ -31,6 +71,17 @@ class VIB34DProductionPackager:
                 'Production-ready server'
             ]
         }
+        self.asset_map = {}
+        self.media_report = {}
+        self.reachability_report = {}
+        self.document_validator = DocumentValidator(str(self.source_dir))
+        self.validation_report = {}
+        self.dispatch_report = {}
+        self.shader_report = {}
+        self.page_weight_report = {}
+        self.artifact_store = ArtifactStore(self.cache_dir / 'objects')
+        self.dedup_report = {}
+        self.service_worker_report = {}
     
     def create_directory_structure(self):
         """Create clean production directory structure"""
@@ -47,7 +98,6 @@ class VIB34DProductionPackager:
             'core',
             'documentation',
             'scripts',
-            'styles',
             'tests'
         ]
         
@@ -56,71 +106,58 @@ class VIB34DProductionPackager:
         
         print('✅ Directory structure created')
     
-    def copy_core_files(self):
-        """Copy essential core files"""
-        print('📋 Copying core files...')
-        
-        # Core JavaScript files
-        core_files = [
-            'core/DragScrollHandler.js',
-            'core/VIB3HomeMaster.js',
-            'core/UnifiedReactivityBridge.js',
-            'core/ShaderManager.js',
-            'core/HypercubeCore.js',
-            'core/GeometryManager.js',
-            'core/ProjectionManager.js',
-            'core/ReactiveHyperAVCore.js',
-            'core/SemanticReactivityEngine.js',
-            'core/VIB3StyleSystem.js'
-        ]
+    def copy_reachable_files(self):
+        """Copy every file reachable from the entry pages, keeping relative paths"""
+        print('🕸️ Crawling entry pages for reachable files...')
         
-        for file_path in core_files:
-            source = self.source_dir / file_path
+        graph = AssetGraph(self.source_dir)
+        reachable = graph.crawl(self.entry_pages)
+        
+        for file_path in sorted(reachable):
             dest = self.output_dir / file_path
-            if source.exists():
-                shutil.copy2(source, dest)
-                print(f'   ✅ {file_path}')
-            else:
-                print(f'   ⚠️ Missing: {file_path}')
+            dest.parent.mkdir(parents=True, exist_ok=True)
+            shutil.copy2(self.source_dir / file_path, dest)
+            print(f'   ✅ {file_path}')
         
-        # Additional core files
-        additional_files = [
-            'VIB3_JSON_CONFIG_SYSTEM.js',
-            'VIB3_COMPREHENSIVE_ENHANCEMENT_SYSTEM.js',
-            'VIB3_UNIFIED_EFFECTS_SYSTEM.js'
-        ]
+        # Main dashboard doubles as the package entry point
+        main_entry = self.source_dir / self.entry_pages[0]
+        if main_entry.exists():
+            shutil.copy2(main_entry, self.output_dir / 'index.html')
+            print(f'   ✅ index.html (main entry point)')
         
-        for file_name in additional_files:
-            source = self.source_dir / file_name
-            if source.exists():
-                shutil.copy2(source, self.output_dir / 'core' / file_name)
-                print(f'   ✅ {file_name}')
+        for referrer, target in graph.missing:
+            print(f'   ⚠️ Missing: {target} (referenced by {referrer})')
+        for referrer, expression in graph.dynamic:
+            print(f'   ⚠️ Unresolvable reference in {referrer}: {expression}')
+        
+        report = graph.report(exclude=[self.output_dir])
+        self.reachability_report = {
+            'entry_pages': list(self.entry_pages),
+            **report
+        }
+        report_path = self.output_dir.parent / 'reachability-report.json'
+        with open(report_path, 'w') as f:
+            json.dump(self.reachability_report, f, indent=2)
+        
+        print(f'   📊 {len(reachable)} reachable files, {len(report["dead_files"])} dead files '
+              f'(full list in {report_path})')
+        for directory, count in list(report['dead_by_directory'].items())[:5]:
+            print(f'      {count:5d} dead in {directory}/')
+        
+        return reachable
     
-    def copy_dashboard_files(self):
-        """Copy main dashboard HTML files"""
-        print('🌐 Copying dashboard files...')
-        
-        dashboard_files = [
-            'index_VIB34D_PROFESSIONAL.html',
-            'index_COMPLETE_SYSTEM.html',
-            'desktop-demo.html',
-            'VIB34D_EDITOR_DASHBOARD.html'
-        ]
+    def validate_documents(self):
+        """Validate config and preset documents against their schemas"""
+        print('🧪 Validating configuration schemas...')
         
-        for file_name in dashboard_files:
-            source = self.source_dir / file_name
-            if source.exists():
-                # Copy to root of package
-                shutil.copy2(source, self.output_dir / file_name)
-                print(f'   ✅ {file_name}')
-                
-                # Create symlink for main dashboard
-                if file_name == 'index_VIB34D_PROFESSIONAL.html':
-                    index_path = self.output_dir / 'index.html'
-                    if index_path.exists():
-                        index_path.unlink()
-                    shutil.copy2(source, index_path)
-                    print(f'   ✅ index.html (main entry point)')
+        for document, result in self.document_validator.validate_all().items():
+            self.validation_report[document] = result
+            if result['valid']:
+                print(f'   ✅ {document}')
+                continue
+            print(f'   ❌ {document} ({len(result["errors"])} errors)')
+            for error in result['errors'][:5]:
+                print(f'      {error["path"]}: {error["message"]}')
     
     def copy_configuration_files(self):
         """Copy and optimize configuration files"""
@@ -130,42 +167,110 @@ class VIB34DProductionPackager:
             'config/visuals.json',
             'config/behavior.json', 
             'config/content.json',
-            'config/dashboard-config.json'
+            'config/dashboard-config.json',
+            'config/event-reaction-manifest.json',
+            'config/comprehensive-event-manifest.json',
+            'presets/visual-styles.json',
+            # Inputs of the server-side preset resolver
+            'presets/theme-collections.json',
+            'presets/reactivity-presets.json',
+            'presets/scroll-physics-presets.json',
+            'presets/navigation-config.json'
         ]
         
+        invalid = []
         for file_path in config_files:
             source = self.source_dir / file_path
             dest = self.output_dir / file_path
+            dest.parent.mkdir(parents=True, exist_ok=True)
             
             if source.exists():
-                # Copy and validate JSON
-                try:
-                    with open(source, 'r') as f:
-                        config_data = json.load(f)
-                    
-                    # Write minimized JSON
-                    with open(dest, 'w') as f:
-                        json.dump(config_data, f, separators=(',', ':'))
-                    
-                    print(f'   ✅ {file_path} (validated and minimized)')
-                except json.JSONDecodeError as e:
-                    print(f'   ❌ {file_path} - Invalid JSON: {e}')
+                # Parse and validate against the document schema (memoized by content hash)
+                config_data, result = self.document_validator.validate_file(file_path)
+                self.validation_report[file_path] = result
+                if not result['valid']:
+                    error = f'{result["errors"][0]["path"]}: {result["errors"][0]["message"]}'
+                    if file_path in self.allow_invalid_configs:
+                        print(f'   ⚠️ {file_path} - left out (allowed invalid) - {error}')
+                    else:
+                        print(f'   ❌ {file_path} - {error}')
+                        invalid.append(file_path)
+                    continue
+                
+                # Write minimized JSON
+                with open(dest, 'w') as f:
+                    json.dump(config_data, f, separators=(',', ':'))
+                
+                print(f'   ✅ {file_path} (validated and minimized)')
             else:
                 print(f'   ⚠️ Missing: {file_path}')
+        
+        if invalid:
+            raise RuntimeError(f'Invalid configuration documents: {", ".join(invalid)} '
+                               f'(fix them, or pass --allow-invalid-config to ship without them)')
     
-    def copy_style_files(self):
-        """Copy style and CSS files"""
-        print('🎨 Copying style files...')
+    def export_parameter_buffers(self):
+        """Compile theme and geometry parameters into a Float32 buffer"""
+        print('🔢 Exporting parameter buffers...')
         
-        style_files = [
-            'VIB3_UNIFIED_EFFECTS.css'
-        ]
+        documents = load_parameter_documents(self.source_dir)
+        buffer, index = compile_parameter_buffer(documents)
+        index['buffer'] = 'parameters.bin'
         
-        for file_name in style_files:
-            source = self.source_dir / file_name
-            if source.exists():
-                shutil.copy2(source, self.output_dir / 'styles' / file_name)
-                print(f'   ✅ {file_name}')
+        with open(self.output_dir / 'config' / 'parameters.bin', 'wb') as f:
+            f.write(buffer)
+        with open(self.output_dir / 'config' / 'parameters.index.json', 'w') as f:
+            json.dump(index, f, separators=(',', ':'))
+        
+        for name, section in index['sections'].items():
+            print(f'   ✅ {name}: {section["count"]} records × {section["stride"]} floats')
+        print(f'   ✅ config/parameters.bin ({len(buffer):,} bytes)')
+        
+        return index
+    
+    def compile_event_dispatch(self):
+        """Flatten the event manifests into integer-keyed dispatch tables"""
+        print('🎛️ Compiling event dispatch tables...')
+        
+        artifact, diagnostics = compile_dispatch(load_dispatch_documents(self.source_dir))
+        self.dispatch_report = diagnostics
+        
+        if diagnostics['cycles']:
+            for cycle in diagnostics['cycles']:
+                print(f'   ❌ Dispatch cycle: {" -> ".join(cycle)}')
+            raise RuntimeError(f'{len(diagnostics["cycles"])} event/reaction cycles in the event manifests')
+        
+        with open(self.output_dir / 'config' / 'event-dispatch.json', 'w') as f:
+            json.dump(artifact, f, separators=(',', ':'))
+        
+        print(f'   ✅ config/event-dispatch.json: {diagnostics["events"]} events, '
+              f'{diagnostics["reactions"]} reactions, {diagnostics["targets"]} targets')
+        for name in diagnostics['unreachable_reactions']:
+            print(f'   ⚠️ Unreachable reaction: {name}')
+        
+        return artifact
+    
+    def compile_shader_permutations(self):
+        """Precompose, minify and deduplicate every geometry/projection shader"""
+        print('🧩 Compiling shader permutations...')
+        
+        index, shaders, diagnostics = build_permutations(load_shader_sources(self.source_dir))
+        self.shader_report = diagnostics
+        
+        if diagnostics['errors']:
+            for error in diagnostics['errors']:
+                print(f'   ❌ {error}')
+            raise RuntimeError(f'{len(diagnostics["errors"])} shader consistency errors')
+        
+        # The packaged server serves these; fingerprinting renames the core/ sources
+        write_compiled(self.output_dir / COMPILED_DIR, index, shaders, diagnostics)
+        
+        print(f'   ✅ {diagnostics["permutations"]} permutations -> {diagnostics["unique_shaders"]} unique shaders '
+              f'({diagnostics["source_bytes"]:,} -> {diagnostics["minified_bytes"]:,} bytes)')
+        for warning in diagnostics['warnings']:
+            print(f'   ⚠️ {warning}')
+        
+        return index
     
     def copy_server_files(self):
         """Copy production server files"""
@@ -173,6 +278,21 @@ class VIB34DProductionPackager:
         
         server_files = [
             'production-server.py',
+            'vib34d_config_index.py',
+            'vib34d_config_store.py',
+            'vib34d_dispatch.py',
+            'vib34d_geometry.py',
+            'vib34d_image_optimizer.py',
+            'vib34d_keyframes.py',
+            'vib34d_param_buffer.py',
+            'vib34d_preset_resolver.py',
+            'vib34d_preview.py',
+            'vib34d_profiler.py',
+            'vib34d_rum.py',
+            'vib34d_schema.py',
+            'vib34d_shaders.py',
+            'vib34d_static_index.py',
+            'vib34d_timing.py',
             'package.json'
         ]
         
@@ -237,6 +357,33 @@ node test-production-system.js
         os.chmod(test_script, 0o755)
         print('   ✅ run-tests.sh')
     
+    def optimize_media(self):
+        """Losslessly recompress shipped PNG and GIF media"""
+        print('🖼️ Optimizing media...')
+        
+        optimizer = ImageOptimizer(self.cache_dir / 'images', quantize=self.quantize_images)
+        self.media_report = {}
+        
+        for file_path in sorted(self.output_dir.rglob('*')):
+            if file_path.suffix.lower() not in ('.png', '.gif') or not file_path.is_file():
+                continue
+            relative = file_path.relative_to(self.output_dir).as_posix()
+            try:
+                result = optimizer.optimize_file(file_path)
+            except (ImageFormatError, ValueError, IndexError) as e:
+                print(f'   ⚠️ {relative} - could not optimize: {e}')
+                continue
+            
+            self.media_report[relative] = result
+            cached = ' (cached)' if result['cached'] else ''
+            print(f'   ✅ {relative}: {result["original_bytes"]:,} → {result["optimized_bytes"]:,} bytes '
+                  f'(-{result["saved_bytes"]:,}){cached}')
+        
+        saved = sum(result['saved_bytes'] for result in self.media_report.values())
+        print(f'   📉 {len(self.media_report)} media files, {saved:,} bytes saved')
+        
+        return self.media_report
+    
     def create_single_file_version(self):
         """Create a single-file HTML version for easy deployment"""
         print('📄 Creating single-file version...')
@@ -251,28 +398,9 @@ node test-production-system.js
             with open(main_html_path, 'r') as f:
                 html_content = f.read()
             
-            # Read core JavaScript files
-            core_scripts = []
-            script_files = [
-                'core/DragScrollHandler.js',
-                'core/VIB3HomeMaster.js',
-                'core/UnifiedReactivityBridge.js',
-                'core/ShaderManager.js',
-                'core/HypercubeCore.js',
-                'core/GeometryManager.js',
-                'core/ProjectionManager.js',
-                'core/ReactiveHyperAVCore.js'
-            ]
-            
-            for script_file in script_files:
-                script_path = self.output_dir / script_file
-                if script_path.exists():
-                    with open(script_path, 'r') as f:
-                        core_scripts.append(f'// {script_file}\n{f.read()}\n')
-            
             # Read CSS files
             css_content = ''
-            css_files = ['styles/VIB3_UNIFIED_EFFECTS.css']
+            css_files = ['VIB3_UNIFIED_EFFECTS.css']
             for css_file in css_files:
                 css_path = self.output_dir / css_file
                 if css_path.exists():
@@ -306,31 +434,18 @@ node test-production-system.js
 </head>'''
             )
             
-            # Replace script imports with embedded scripts
-            script_imports = [
-                '<script src="./core/DragScrollHandler.js"></script>',
-                '<script src="./core/VIB3HomeMaster.js" type="module"></script>',
-                '<script src="./core/UnifiedReactivityBridge.js" type="module"></script>',
-                '<script src="./core/ShaderManager.js" type="module"></script>',
-                '<script src="./core/HypercubeCore.js" type="module"></script>',
-                '<script src="./core/GeometryManager.js" type="module"></script>',
-                '<script src="./core/ProjectionManager.js" type="module"></script>',
-                '<script src="VIB3_JSON_CONFIG_SYSTEM.js"></script>'
-            ]
-            
-            embedded_scripts = f'''
-    <!-- Embedded Core Scripts -->
-    <script>
-    {chr(10).join(core_scripts)}
-    </script>'''
-            
-            for script_import in script_imports:
-                single_file_content = single_file_content.replace(script_import, '')
-            
-            single_file_content = single_file_content.replace(
-                '<!-- Load Core Systems (copied from backup architecture) -->',
-                embedded_scripts
+            # Bundle the module graph and inline classic scripts
+            bundler = ESModuleBundler([self.output_dir, self.source_dir])
+            single_file_content = bundler.bundle_html(
+                single_file_content,
+                main_html_path.relative_to(self.output_dir).as_posix()
             )
+            report = bundler.report()
+            
+            print(f'   ✅ Bundled {len(report["modules"])} modules '
+                  f'({len(report["wrapped_modules"])} wrapped, {len(report["dropped_exports"])} unused exports dropped)')
+            for warning in report['warnings']:
+                print(f'   ⚠️ {warning}')
             
             # Save single file version
             single_file_path = self.output_dir / 'vib34d-dashboard-standalone.html'
@@ -342,6 +457,152 @@ node test-production-system.js
         except Exception as e:
             print(f'   ❌ Error creating single-file version: {e}')
     
+    def _resolve_asset_reference(self, referrer, prefix, path):
+        """Resolve a referenced path to a package-relative POSIX path"""
+        if '://' in path or path.startswith('//') or path.startswith('data:'):
+            return None
+        if path.startswith('/'):
+            return path.lstrip('/')
+        # Module specifiers and CSS url() resolve against the referring file,
+        # fetch() and src/href against the page, which lives in the package root
+        if prefix.startswith(('import', 'from', 'url')):
+            base = os.path.dirname(referrer)
+        else:
+            base = ''
+        resolved = os.path.normpath(os.path.join(base, path)).replace(os.sep, '/')
+        return None if resolved.startswith('..') else resolved
+    
+    def _rewrite_asset_references(self, referrer, text):
+        """Point every resolvable asset reference at its fingerprinted name"""
+        def replace(match):
+            target = self._resolve_asset_reference(referrer, match.group('prefix'), match.group('path'))
+            if target not in self.asset_map:
+                return match.group(0)
+            path = match.group('path')
+            hashed_name = Path(self.asset_map[target]).name
+            new_path = path[:len(path) - len(Path(path).name)] + hashed_name
+            return f'{match.group("prefix")}{match.group("quote")}{new_path}{match.group("quote")}'
+        
+        return ASSET_REFERENCE_RE.sub(replace, text)
+    
+    def fingerprint_assets(self):
+        """Rename JS/CSS/JSON outputs to content-hashed names and rewrite references"""
+        print('🔖 Fingerprinting assets...')
+        
+        excluded = {'package.json', 'package-manifest.json'}
+        assets = {}
+        for file_path in sorted(self.output_dir.rglob('*')):
+            relative = file_path.relative_to(self.output_dir).as_posix()
+            if (file_path.is_file() and file_path.suffix in ('.js', '.css', '.json')
+                    and relative not in excluded and not relative.startswith('tests/')):
+                with open(file_path, 'r', encoding='utf-8') as f:
+                    assets[relative] = f.read()
+        
+        # Hash dependencies first so a file's digest covers its rewritten references
+        dependencies = {}
+        for relative, text in assets.items():
+            dependencies[relative] = set()
+            for match in ASSET_REFERENCE_RE.finditer(text):
+                target = self._resolve_asset_reference(relative, match.group('prefix'), match.group('path'))
+                if target in assets and target != relative:
+                    dependencies[relative].add(target)
+        
+        order = []
+        cyclic = set()
+        state = {}
+        
+        def visit(relative):
+            if state.get(relative) == 'done':
+                return
+            if state.get(relative) == 'visiting':
+                cyclic.add(relative)
+                return
+            state[relative] = 'visiting'
+            for dependency in sorted(dependencies[relative]):
+                visit(dependency)
+            state[relative] = 'done'
+            order.append(relative)
+        
+        for relative in assets:
+            visit(relative)
+        
+        self.asset_map = {}
+        for relative in order:
+            text = self._rewrite_asset_references(relative, assets[relative])
+            digest = hashlib.md5(text.encode('utf-8')).hexdigest()[:10]
+            source = self.output_dir / relative
+            hashed = source.with_name(f'{source.stem}.{digest}{source.suffix}')
+            with open(hashed, 'w', encoding='utf-8') as f:
+                f.write(text)
+            self.asset_map[relative] = hashed.relative_to(self.output_dir).as_posix()
+            
+            # JSON keeps its plain name too: the config API and runtime-built
+            # config paths (e.g. `${configType}.json`) read it by name
+            if source.suffix != '.json' and relative not in cyclic:
+                source.unlink()
+            print(f'   ✅ {relative} → {hashed.name}')
+        
+        for page in sorted(self.output_dir.rglob('*.html')):
+            relative = page.relative_to(self.output_dir).as_posix()
+            with open(page, 'r', encoding='utf-8') as f:
+                html = f.read()
+            rewritten = self._rewrite_asset_references(relative, html)
+            if rewritten != html:
+                with open(page, 'w', encoding='utf-8') as f:
+                    f.write(rewritten)
+                print(f'   ✅ {relative} references updated')
+        
+        for relative in sorted(cyclic):
+            print(f'   ⚠️ Reference cycle through {relative}, original name kept')
+        
+        return self.asset_map
+    
+    def register_service_worker(self):
+        """Add the service worker registration to every entry page"""
+        print('📡 Registering service worker in entry pages...')
+        
+        for relative in self.entry_pages + ['index.html']:
+            page = self.output_dir / relative
+            if not page.exists():
+                continue
+            with open(page, 'r', encoding='utf-8') as f:
+                html = f.read()
+            registered = inject_registration(html)
+            if registered != html:
+                with open(page, 'w', encoding='utf-8') as f:
+                    f.write(registered)
+                print(f'   ✅ {relative}')
+    
+    def check_page_budgets(self):
+        """Measure each entry page's cold load in the package and enforce page-budgets.json"""
+        print('⚖️ Checking page weight budgets...')
+        
+        try:
+            budgets = load_budgets(self.source_dir / BUDGETS_FILE)
+        except BudgetError as e:
+            raise RuntimeError(str(e))
+        
+        # Measured on the packaged tree, so fingerprinted names and optimized files count
+        report = PageWeightAnalyzer(self.output_dir).report(self.entry_pages, budgets)
+        for page, page_report in report['pages'].items():
+            if 'error' in page_report:
+                print(f'   ❌ {page}: {page_report["error"]}')
+                continue
+            print(f'   📄 {page}: {page_report["requests"]} requests, '
+                  f'{page_report["transfer_bytes"] / 1024:.1f} KB gzip '
+                  f'({page_report["raw_bytes"] / 1024:.1f} KB raw), '
+                  f'waterfall depth {page_report["waterfall_depth"]}')
+        if budgets is None:
+            print(f'   ⚠️ No {BUDGETS_FILE}, budgets not enforced')
+        self.page_weight_report = report
+        
+        if report['violations']:
+            for violation in report['violations']:
+                print(f'   ❌ Over budget: {violation}')
+            raise RuntimeError(f'{len(report["violations"])} page budget(s) exceeded')
+        
+        return report
+    
     def create_documentation(self):
         """Create comprehensive documentation"""
         print('📚 Creating documentation...')
@@ -533,6 +794,25 @@ Modify core JavaScript files for deeper customization:
             f.write(install_guide)
         print('   ✅ documentation/INSTALLATION.md')
     
+    def deduplicate_outputs(self):
+        """Hardlink identical outputs to one copy in the shared content-addressable store"""
+        print('🗃️ Deduplicating package files...')
+        
+        report = self.artifact_store.deduplicate(self.output_dir)
+        # Objects only the previous, now deleted, package linked to
+        removed, freed = self.artifact_store.collect_garbage()
+        self.dedup_report = {**report, 'gc_objects': removed, 'gc_bytes': freed}
+        
+        print(f'   ✅ {report["files"]} files, {report["unique_files"]} unique '
+              f'({report["saved_bytes"] / 1024:.1f} KB of duplicates now hardlinks)')
+        print(f'      {report["reused_objects"]} objects reused from earlier builds, {report["new_objects"]} new, '
+              f'{removed} unreferenced removed')
+        if report['unlinked']:
+            print(f'   ⚠️ {report["unlinked"]} files left as copies: hardlinks into '
+                  f'{self.artifact_store.root} are not supported here')
+        
+        return self.dedup_report
+    
     def create_package_manifest(self):
         """Create package manifest and checksums"""
         print('📦 Creating package manifest...')
@@ -541,20 +821,35 @@ Modify core JavaScript files for deeper customization:
             **self.package_info,
             'files': {},
             'checksums': {},
+            'assets': self.asset_map,
+            'media': self.media_report,
+            'dispatch': self.dispatch_report,
+            'shaders': self.shader_report,
+            'page_weight': self.page_weight_report,
+            'dedup': self.dedup_report,
+            'validation': {
+                document: {'valid': result['valid'], 'errors': result['errors']}
+                for document, result in self.validation_report.items()
+            },
             'size_bytes': 0
         }
         
-        # Calculate file checksums and sizes
+        # Calculate file checksums and sizes; hardlinked duplicates are read once
+        checksums = {}
         for root, dirs, files in os.walk(self.output_dir):
             for file in files:
                 file_path = Path(root) / file
                 relative_path = file_path.relative_to(self.output_dir)
+                file_stat = file_path.stat()
                 
                 # Calculate MD5 checksum
-                with open(file_path, 'rb') as f:
-                    file_hash = hashlib.md5(f.read()).hexdigest()
+                inode = (file_stat.st_dev, file_stat.st_ino)
+                if inode not in checksums:
+                    with open(file_path, 'rb') as f:
+                        checksums[inode] = hashlib.md5(f.read()).hexdigest()
+                file_hash = checksums[inode]
                 
-                file_size = file_path.stat().st_size
+                file_size = file_stat.st_size
                 
                 manifest['files'][str(relative_path)] = {
                     'size': file_size,
@@ -573,6 +868,49 @@ Modify core JavaScript files for deeper customization:
         
         return manifest
     
+    def generate_service_worker(self, manifest):
+        """Write sw.js with a precache list versioned by the manifest checksums"""
+        print('📡 Generating service worker...')
+        
+        source, report = render_service_worker(manifest['files'], self.entry_pages + ['index.html'])
+        sw_path = self.output_dir / SERVICE_WORKER_FILE
+        with open(sw_path, 'w', encoding='utf-8') as f:
+            f.write(source)
+        self.service_worker_report = report
+        
+        # Written after the checksums it is built from, so add itself to the manifest
+        size = sw_path.stat().st_size
+        manifest['files'][SERVICE_WORKER_FILE] = {
+            'size': size,
+            'checksum': hashlib.md5(source.encode('utf-8')).hexdigest()
+        }
+        manifest['service_worker'] = report
+        manifest['size_bytes'] += size
+        manifest['total_files'] = len(manifest['files'])
+        manifest['size_mb'] = round(manifest['size_bytes'] / 1024 / 1024, 2)
+        with open(self.output_dir / 'package-manifest.json', 'w') as f:
+            json.dump(manifest, f, indent=2)
+        
+        print(f'   ✅ {SERVICE_WORKER_FILE} (cache version {report["version"]}): '
+              f'{report["precache_files"]} files, {report["precache_bytes"] / 1024:.1f} KB precached')
+        for strategy, totals in sorted(report['strategies'].items()):
+            print(f'      {strategy}: {totals["files"]} files, {totals["bytes"] / 1024:.1f} KB')
+        
+        return report
+    
+    def smoke_test_package(self):
+        """Start the packaged server and check the API routes the dashboards depend on"""
+        print('💨 Smoke testing the packaged server...')
+        
+        # Separate process so the package's own server modules are the ones under test
+        script = Path(__file__).resolve().parent / 'vib34d_smoke_test.py'
+        result = subprocess.run([sys.executable, str(script), str(self.output_dir)], capture_output=True, text=True)
+        for line in result.stdout.splitlines():
+            print(f'   {line.strip()}')
+        if result.returncode != 0:
+            failures = [line.strip() for line in result.stdout.splitlines() if line.startswith('❌')]
+            raise RuntimeError(f'Packaged server smoke test failed: {failures or result.stderr.strip().splitlines()[-1:]}')
+    
     def create_zip_package(self):
         """Create compressed ZIP package"""
         print('🗜️ Creating ZIP package...')
@@ -591,64 +929,158 @@ Modify core JavaScript files for deeper customization:
         
         return zip_path
     
+    def create_delta_package(self):
+        """Create a patch ZIP against the previous release's manifest"""
+        if not self.previous_manifest:
+            return None
+        
+        print('🩹 Creating delta package...')
+        
+        try:
+            with open(self.previous_manifest, 'r') as f:
+                previous = json.load(f)
+        except (OSError, json.JSONDecodeError) as e:
+            print(f'   ⚠️ Previous manifest unusable, skipping delta: {e}')
+            return None
+        
+        delta_path = f'vib34d-dashboard-delta-{int(time.time())}.zip'
+        result = create_delta_package(previous, self.output_dir, delta_path)
+        
+        print(f'   ✅ Delta package: {delta_path} ({result["archive_bytes"] / 1024:.1f} KB)')
+        print(f'      +{result["added"]} added, ~{result["changed"]} changed, '
+              f'-{result["removed"]} removed, {result["unchanged"]} unchanged')
+        
+        return delta_path
+    
+    def export_static_site(self):
+        """Crawl the finished package into a directory for static hosting"""
+        if not self.static_export_dir:
+            return None
+        
+        print('🌐 Exporting static site...')
+        
+        # Separate process: the exporter imports the packaged server and chdirs into the package
+        exporter = Path(__file__).resolve().parent / 'vib34d_static_export.py'
+        result = subprocess.run([sys.executable, str(exporter), str(self.output_dir), '-o', str(self.static_export_dir)],
+                                capture_output=True, text=True)
+        for line in result.stdout.splitlines()[1:]:
+            print(f'   {line.strip()}')
+        if result.returncode != 0:
+            raise RuntimeError(f'Static export failed: {(result.stdout + result.stderr).strip().splitlines()[-1:]}')
+        
+        # Exported files are mostly byte-identical to packaged ones
+        report = self.artifact_store.deduplicate(self.static_export_dir)
+        print(f'   🗃️ {report["files"] - report["new_objects"]} of {report["files"]} exported files '
+              f'hardlinked to existing objects')
+        
+        return self.static_export_dir
+    
     def create_production_package(self):
         """Create complete production package"""
         print('🚀 Creating VIB34D Professional Dashboard Production Package')
         print('============================================================\n')
         
-        start_time = time.time()
+        profiler = BuildProfiler(self.output_dir, self.cprofile_path)
+        profiler.start()
+        run = profiler.run
         
         try:
             # Create directory structure
-            self.create_directory_structure()
+            run(self.create_directory_structure)
             
             # Copy all necessary files
-            self.copy_core_files()
-            self.copy_dashboard_files()
-            self.copy_configuration_files()
-            self.copy_style_files()
-            self.copy_server_files()
-            self.copy_test_files()
+            run(self.copy_reachable_files)
+            run(self.validate_documents)
+            run(self.copy_configuration_files)
+            run(self.export_parameter_buffers)
+            run(self.compile_event_dispatch)
+            run(self.compile_shader_permutations)
+            run(self.copy_server_files)
+            run(self.copy_test_files)
+            run(self.optimize_media)
             
             # Create additional files
-            self.create_launcher_scripts()
-            self.create_single_file_version()
-            self.create_documentation()
+            run(self.create_launcher_scripts)
+            run(self.create_single_file_version)
+            run(self.fingerprint_assets)
+            run(self.register_service_worker)
+            run(self.check_page_budgets)
+            run(self.create_documentation)
+            run(self.deduplicate_outputs)
             
             # Create manifest and package
-            manifest = self.create_package_manifest()
-            zip_path = self.create_zip_package()
-            
-            end_time = time.time()
-            duration = end_time - start_time
-            
-            print(f'\n🌟 Production package created successfully!')
-            print(f'📁 Package directory: {self.output_dir}')
-            print(f'📦 ZIP package: {zip_path}')
-            print(f'⏱️ Build time: {duration:.1f} seconds')
-            print(f'📊 Package size: {manifest["size_mb"]} MB')
-            print(f'📄 Total files: {manifest["total_files"]}')
-            
-            return {
-                'directory': str(self.output_dir),
-                'zip_file': zip_path,
-                'manifest': manifest,
-                'build_time': duration
-            }
-            
+            manifest = run(self.create_package_manifest)
+            run(self.generate_service_worker, manifest)
+            run(self.smoke_test_package)
+            zip_path = run(self.create_zip_package)
+            delta_path = run(self.create_delta_package)
+            static_site = run(self.export_static_site)
         except Exception as e:
+            profiler.fail(e)
             print(f'❌ Package creation failed: {e}')
             raise
+        finally:
+            profiler.stop()
+            # Written after the ZIP so it covers every stage; not part of the package itself.
+            # Failed builds write one too, naming the stage that broke, so CI history has no gaps
+            build_report = profiler.write_report(self.output_dir / 'build-report.json')
+        
+        duration = build_report['total_wall_seconds']
+        
+        print(f'\n🌟 Production package created successfully!')
+        print(f'📁 Package directory: {self.output_dir}')
+        print(f'📦 ZIP package: {zip_path}')
+        if delta_path:
+            print(f'🩹 Delta package: {delta_path}')
+        if static_site:
+            print(f'🌐 Static site: {static_site}')
+        print(f'⏱️ Build time: {duration:.1f} seconds (slowest stage: {build_report["slowest_stage"]})')
+        print(f'📊 Package size: {manifest["size_mb"]} MB')
+        print(f'📄 Total files: {manifest["total_files"]}')
+        print(f'📈 Build report: {self.output_dir / "build-report.json"}')
+        if self.cprofile_path:
+            print(f'🔬 cProfile dump: {self.cprofile_path}')
+        
+        return {
+            'directory': str(self.output_dir),
+            'zip_file': zip_path,
+            'delta_file': delta_path,
+            'static_site': static_site,
+            'manifest': manifest,
+            'build_time': duration,
+            'build_report': build_report
+        }
 
 def main():
     """Main entry point"""
-    packager = VIB34DProductionPackager()
+    parser = argparse.ArgumentParser(description='VIB34D production packager')
+    parser.add_argument('--previous-manifest',
+                        help='package-manifest.json of the deployed release; also emits a delta ZIP')
+    parser.add_argument('--profile', metavar='PATH',
+                        help='write a cProfile dump of the whole build (view with python3 -m pstats PATH)')
+    parser.add_argument('--static-export', metavar='DIR',
+                        help='also export every page, asset and API response to DIR for static hosting')
+    parser.add_argument('--quantize-images', action='store_true',
+                        help='convert PNGs with at most 256 colors to palette images (lossless)')
+    parser.add_argument('--allow-invalid-config', metavar='PATH', action='append', default=[],
+                        help='leave this config document out of the package if it fails validation '
+                             'instead of failing the build (repeatable)')
+    args = parser.parse_args()
+    
+    packager = VIB34DProductionPackager(previous_manifest=args.previous_manifest,
+                                        cprofile_path=args.profile,
+                                        static_export_dir=args.static_export,
+                                        quantize_images=args.quantize_images,
+                                        allow_invalid_configs=args.allow_invalid_config)
     result = packager.create_production_package()
     
     print('\n✅ Production package ready for deployment!')
     print('\n🚀 Quick Start:')
     print(f'   cd {result["directory"]}')
     print('   python3 production-server.py')
+    if result['delta_file']:
+        print('\n🩹 Update an existing deployment in place:')
+        print(f'   python3 vib34d_delta.py apply {result["delta_file"]} <deployed-package-dir>')
 
 if __name__ == '__main__':
     main()
\ No newline at end of file
@@ -12,34 +12,123 @@ import json
 import os
 import sys
 import webbrowser
-from urllib.parse import urlparse, parse_qs
+from urllib.parse import urlparse, parse_qs, unquote
 import mimetypes
+import re
+import contextlib
+
+from vib34d_config_index import ConfigPathIndex, ConfigQueryError
+from vib34d_config_store import MAX_PATCH_BYTES, PATCH_CONTENT_TYPES, ConfigWriteStore, pointer_from_dotted
+from vib34d_dispatch import DispatchTableCache
+from vib34d_geometry import (GEOMETRY_AVAILABLE, GEOMETRY_TYPES, DEFAULT_RESOLUTION, MAX_RESOLUTION,
+                             MIN_RESOLUTION, GeometryError, build_geometry, parse_resolution)
+from vib34d_keyframes import (KEYFRAMES_AVAILABLE, PROJECTIONS, KeyframeError, build_timeline, chain_for_theme,
+                              parse_timeline_options, theme_profile)
+from vib34d_param_buffer import ParameterBufferCache
+from vib34d_preset_resolver import PresetResolver
+from vib34d_profiler import (ADMIN_TOKEN_HEADER, DEFAULT_TOP, MemoryTracker, ProfilerError, StackSampler,
+                              admin_allowed, collapsed_stacks, parse_profile_options)
+from vib34d_preview import PREVIEW_AVAILABLE, PreviewCache, PreviewError, parse_preview_options
+from vib34d_rum import DEFAULT_WINDOW_MINUTES, DIMENSIONS, MAX_BEACON_BYTES, RumAggregator, RumError, parse_beacon
+from vib34d_schema import DocumentValidator
+from vib34d_shaders import ShaderPermutationCache
+from vib34d_static_index import StaticFileIndex
+from vib34d_timing import TRACE_HEADER, RequestTimer, SlowRequestLog, trace_id_from
+
+# Packager output names fingerprinted assets `<name>.<10 hex digest>.<ext>`
+HASHED_ASSET_RE = re.compile(r'\.[0-9a-f]{10}\.(?:js|css|json)$')
+SHADER_HASH_RE = re.compile(r'^/api/shaders/([0-9a-f]{16})$')
+IMMUTABLE_CACHE_CONTROL = 'public, max-age=31536000, immutable'
+# Browsers must see a new worker as soon as it is deployed
+SERVICE_WORKER_PATH = '/sw.js'
+
+# Dashboard routes served from a page file; root defaults to the main dashboard
+PAGE_ALIASES = {
+    '/': '/index_VIB34D_PROFESSIONAL.html',
+    '/professional': '/index_VIB34D_PROFESSIONAL.html',
+    '/complete': '/index_COMPLETE_SYSTEM.html',
+    '/demo': '/desktop-demo.html'
+}
+
+# Set proper MIME types for WebGL and modern web; the static index reads them at scan time
+mimetypes.add_type('application/javascript', '.js')
+mimetypes.add_type('application/json', '.json')
+mimetypes.add_type('text/css', '.css')
+mimetypes.add_type('application/wasm', '.wasm')
+mimetypes.add_type('image/webp', '.webp')
 
 class VIB34DProductionHandler(http.server.SimpleHTTPRequestHandler):
     """Enhanced HTTP handler for VIB34D with WebGL optimization"""
     
-    def __init__(self, *args, **kwargs):
-        # Set proper MIME types for WebGL and modern web
-        mimetypes.add_type('application/javascript', '.js')
-        mimetypes.add_type('application/json', '.json')
-        mimetypes.add_type('text/css', '.css')
-        mimetypes.add_type('application/wasm', '.wasm')
-        mimetypes.add_type('image/webp', '.webp')
-        super().__init__(*args, **kwargs)
+    # Shared across requests; recompiled when a source document changes
+    document_validator = DocumentValidator('.')
+    parameter_buffers = ParameterBufferCache('.', document_validator)
+    config_index = ConfigPathIndex(document_validator, '.')
+    config_store = ConfigWriteStore(document_validator, config_index, '.')
+    preset_resolver = PresetResolver(document_validator, '.')
+    dispatch_tables = DispatchTableCache('.', document_validator)
+    shader_permutations = ShaderPermutationCache('.')
+    preview_cache = PreviewCache(os.path.join('.vib34d-cache', 'previews'))
+    slow_requests = SlowRequestLog.from_environment()
+    stack_sampler = StackSampler()
+    memory_tracker = MemoryTracker()
+    rum = RumAggregator()
+    static_index = StaticFileIndex('.')
+    
+    # Per-request timing; None until the request line has been read
+    timer = None
+    request_target = None
+    response_status = None
+    # Set by a route that knows its response is immutable, e.g. a known shader hash
+    cache_control = None
+    
+    def handle_one_request(self):
+        """Time the request and log it when it crosses the slow threshold"""
+        self.timer = None
+        self.response_status = None
+        self.cache_control = None
+        super().handle_one_request()
+        if self.timer is not None:
+            self.slow_requests.record(self.timer, self.command, self.request_target, self.response_status)
+    
+    def parse_request(self):
+        """Start the request timer and pick up the caller's trace id"""
+        self.timer = RequestTimer()
+        ok = super().parse_request()
+        self.request_target = self.path
+        if ok:
+            self.timer.trace_id = trace_id_from(self.headers)
+        return ok
+    
+    def stage(self, name):
+        """Charge the enclosed work to one Server-Timing stage"""
+        return self.timer.stage(name) if self.timer else contextlib.nullcontext()
+    
+    def send_response(self, code, message=None):
+        self.response_status = code
+        super().send_response(code, message)
     
     def end_headers(self):
         """Add security and performance headers"""
         # CORS headers for development
         self.send_header('Access-Control-Allow-Origin', '*')
         self.send_header('Access-Control-Allow-Methods', 'GET, POST, OPTIONS')
-        self.send_header('Access-Control-Allow-Headers', 'Content-Type')
+        self.send_header('Access-Control-Allow-Headers',
+                         f'Content-Type, {TRACE_HEADER}, traceparent, {ADMIN_TOKEN_HEADER}')
+        self.send_header('Access-Control-Expose-Headers', f'Server-Timing, {TRACE_HEADER}')
+        
+        # Per-stage timings for browser devtools
+        if self.timer:
+            self.send_header('Server-Timing', self.timer.header())
+            self.send_header('Timing-Allow-Origin', '*')
+            self.send_header(TRACE_HEADER, self.timer.trace_id)
         
         # WebGL and Canvas security
         self.send_header('Cross-Origin-Embedder-Policy', 'credentialless')
         self.send_header('Cross-Origin-Opener-Policy', 'same-origin')
         
         # Performance headers
-        self.send_header('Cache-Control', 'public, max-age=3600')
+        self.send_header('Cache-Control', self.cache_control_for(self.path))
         
         # Security headers
         self.send_header('X-Content-Type-Options', 'nosniff')
@@ -47,6 +136,17 @@ class VIB34DProductionHandler(http.server.SimpleHTTPRequestHandler):
         
         super().end_headers()
     
+    def cache_control_for(self, path):
+        """Immutable caching for fingerprinted assets, revalidation for HTML"""
+        if self.cache_control:
+            return self.cache_control
+        path = urlparse(path).path
+        if HASHED_ASSET_RE.search(path):
+            return IMMUTABLE_CACHE_CONTROL
+        if path.endswith('.html') or path.endswith('/') or path.startswith('/api/') or path == SERVICE_WORKER_PATH:
+            return 'no-cache'
+        return 'public, max-age=3600'
+    
     def do_OPTIONS(self):
         """Handle preflight CORS requests"""
         self.send_response(200)
@@ -54,28 +154,170 @@ class VIB34DProductionHandler(http.server.SimpleHTTPRequestHandler):
     
     def do_GET(self):
         """Enhanced GET handler with dashboard routes"""
-        parsed_url = urlparse(self.path)
-        path = parsed_url.path
+        with self.stage('route'):
+            parsed_url = urlparse(self.path)
+            path = parsed_url.path
         
         # Dashboard API endpoints
         if path.startswith('/api/'):
-            self.handle_api_request(path, parsed_url.query)
+            with self.stage('api'):
+                self.handle_api_request(path, parsed_url.query)
             return
         
-        # Default to index for root
-        if path == '/':
-            self.path = '/index_VIB34D_PROFESSIONAL.html'
-        
-        # Handle dashboard variants
-        elif path == '/professional':
-            self.path = '/index_VIB34D_PROFESSIONAL.html'
-        elif path == '/complete':
-            self.path = '/index_COMPLETE_SYSTEM.html'
-        elif path == '/demo':
-            self.path = '/desktop-demo.html'
+        with self.stage('route'):
+            # Default to index for root, plus the dashboard variants
+            if path in PAGE_ALIASES:
+                self.path = PAGE_ALIASES[path]
         
         super().do_GET()
     
+    def send_head(self):
+        """Static files from the in-memory index; misses never touch the filesystem"""
+        with self.stage('lookup'):
+            found = self.static_index.lookup(urlparse(self.path).path)
+        if found is None:
+            self.send_error(404, 'File not found')
+            return None
+        if found[0] == 'redirect':
+            query = urlparse(self.path).query
+            self.send_response(301)
+            self.send_header('Location', found[1] + ('?' + query if query else ''))
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return None
+        
+        _, url, entry = found
+        if self.not_modified(entry):
+            self.send_response(304)
+            self.send_header('ETag', entry.etag)
+            self.end_headers()
+            return None
+        with self.stage('fs'):
+            try:
+                f = open(entry.path, 'rb')
+            except OSError:
+                self.static_index.forget(url)
+                self.send_error(404, 'File not found')
+                return None
+            # Catches edits made since the last index scan
+            stat = os.fstat(f.fileno())
+            if not entry.matches(stat):
+                entry = self.static_index.refresh(url, entry.path, stat)
+        self.send_response(200)
+        self.send_header('Content-type', entry.content_type)
+        self.send_header('Content-Length', str(entry.size))
+        self.send_header('Last-Modified', entry.last_modified)
+        self.send_header('ETag', entry.etag)
+        self.end_headers()
+        return f
+    
+    def not_modified(self, entry):
+        """Conditional request check against the indexed validators"""
+        if 'If-None-Match' in self.headers:
+            return entry.etag in (tag.strip() for tag in self.headers['If-None-Match'].split(','))
+        return self.headers.get('If-Modified-Since') == entry.last_modified
+    
+    def copyfile(self, source, outputfile):
+        # Runs after the headers, so it only shows up in the slow-request log
+        with self.stage('read'):
+            super().copyfile(source, outputfile)
+    
+    def do_POST(self):
+        """Config writes from the editor dashboard"""
+        parsed_url = urlparse(self.path)
+        path = parsed_url.path
+        
+        if path == '/api/rum':
+            with self.stage('api'):
+                self.handle_rum_beacon()
+        elif path.startswith('/api/config/') and not self.is_admin():
+            # Any page open in the browser could otherwise rewrite config files on disk
+            self.send_json_response({
+                'error': 'Config writes are admin-only',
+                'hint': f'Send {ADMIN_TOKEN_HEADER} or connect from localhost'
+            }, status=403)
+        elif path == '/api/config/flush':
+            with self.stage('api'):
+                try:
+                    flushed = self.config_store.flush_all()
+                except OSError as e:
+                    self.send_json_response({'error': f'Config write failed: {e}', **self.config_store.describe()},
+                                            status=500)
+                    return
+                self.send_json_response({'flushed': flushed, **self.config_store.describe()})
+        elif path.startswith('/api/config/'):
+            # /api/config/<doc>[/<dotted.path>], body: JSON Patch array or merge-patch object
+            with self.stage('api'):
+                self.handle_config_write(unquote(path[len('/api/config/'):]), parsed_url.query)
+        elif path.startswith('/api/debug/'):
+            with self.stage('api'):
+                self.handle_debug_request(path[len('/api/debug/'):], parsed_url.query)
+        else:
+            self.send_json_response({'error': 'POST endpoint not found'}, status=404)
+    
+    def read_request_body(self, limit, name):
+        """The request body, or None after answering 400/413 for a bad or oversized Content-Length"""
+        try:
+            length = int(self.headers.get('Content-Length') or 0)
+        except ValueError:
+            length = -1
+        if length < 0:
+            # A negative length would make rfile.read() wait for EOF, past any size limit
+            self.send_json_response({'error': 'Content-Length must be a non-negative integer'}, status=400)
+            return None
+        if length > limit:
+            self.send_json_response({'error': f'{name} larger than {limit} bytes'}, status=413)
+            return None
+        with self.stage('body'):
+            return self.rfile.read(length)
+    
+    def handle_config_write(self, target, query):
+        """Apply one patch to a config/preset document; the file write is debounced"""
+        content_type = self.headers.get('Content-Type', '').split(';')[0].strip().lower()
+        if content_type not in PATCH_CONTENT_TYPES:
+            self.send_json_response({
+                'error': f'Unsupported Content-Type: {content_type or "(none)"}',
+                'accepted': sorted(PATCH_CONTENT_TYPES)
+            }, status=415)
+            return
+        body = self.read_request_body(MAX_PATCH_BYTES, 'Patch')
+        if body is None:
+            return
+        try:
+            patch = json.loads(body or b'null')
+        except (json.JSONDecodeError, UnicodeDecodeError) as e:
+            self.send_json_response({'error': f'Invalid JSON body: {e}'}, status=400)
+            return
+        
+        doc_id, _, node_path = target.strip('/').partition('/')
+        kind = PATCH_CONTENT_TYPES[content_type] or ('json-patch' if isinstance(patch, list) else 'merge-patch')
+        flush = parse_qs(query).get('flush', ['0'])[0] in ('1', 'true')
+        try:
+            receipt = self.config_store.patch(doc_id, kind, patch, pointer_from_dotted(node_path), flush=flush)
+        except ConfigQueryError as e:
+            self.send_json_response({'error': str(e), **e.details}, status=e.status)
+            return
+        except OSError as e:
+            # Accepted and queued for retry, but not on disk yet
+            self.send_json_response({'error': f'Config write failed: {e}', 'pending': True}, status=500)
+            return
+        self.send_json_response(receipt, status=200 if flush else 202)
+    
+    def handle_rum_beacon(self):
+        """Fold a batch of client frame-time samples into the RUM sketches"""
+        body = self.read_request_body(MAX_BEACON_BYTES, 'Beacon')
+        if body is None:
+            return
+        try:
+            samples = parse_beacon(body)
+        except RumError as e:
+            self.send_json_response({'error': str(e)}, status=e.status)
+            return
+        self.rum.ingest(samples)
+        # sendBeacon ignores the response, so keep it empty
+        self.send_response(204)
+        self.end_headers()
+    
     def handle_api_request(self, path, query):
         """Handle API requests for dashboard configuration"""
         try:
@@ -90,30 +332,299 @@ class VIB34DProductionHandler(http.server.SimpleHTTPRequestHandler):
                         'WebGL Visualizers',
                         'JSON Configuration',
                         'Real-time Reactivity'
-                    ]
+                    ],
+                    'static_index': self.static_index.describe()
                 })
             
             elif path == '/api/config':
                 config_data = self.load_dashboard_config()
                 self.send_json_response(config_data)
             
+            elif path == '/api/config/writes':
+                self.send_json_response(self.config_store.describe())
+            
+            elif path.startswith('/api/config/'):
+                # /api/config/<doc>/<dotted.path>, e.g. /api/config/visuals/themes.hypercube.parameters
+                doc_id, _, node_path = unquote(path[len('/api/config/'):]).partition('/')
+                try:
+                    body, etag = self.config_index.query(doc_id, node_path)
+                except ConfigQueryError as e:
+                    self.send_json_response({'error': str(e), **e.details}, status=e.status)
+                    return
+                self.send_etagged_response(body, etag)
+            
+            elif path == '/api/resolved':
+                self.send_json_response(self.preset_resolver.describe())
+            
+            elif path.startswith('/api/resolved/'):
+                # /api/resolved/<face index or section name>/<role>[?collection=...]
+                face, _, role = unquote(path[len('/api/resolved/'):]).partition('/')
+                collection = parse_qs(query).get('collection', [None])[0]
+                try:
+                    body, gzipped, etag = self.preset_resolver.get(face, role, collection)
+                except ConfigQueryError as e:
+                    self.send_json_response({'error': str(e), **e.details}, status=e.status)
+                    return
+                self.send_etagged_response(body, etag, gzipped=gzipped)
+            
+            elif path == '/api/events/dispatch':
+                body, gzipped, etag, _ = self.dispatch_tables.get()
+                self.send_etagged_response(body, etag, gzipped=gzipped)
+            
+            elif path == '/api/events/diagnostics':
+                self.send_json_response(self.dispatch_tables.get()[3])
+            
+            elif path == '/api/geometry':
+                self.send_json_response({
+                    'available': GEOMETRY_AVAILABLE,
+                    'types': GEOMETRY_TYPES,
+                    'resolution': {'default': DEFAULT_RESOLUTION, 'min': MIN_RESOLUTION, 'max': MAX_RESOLUTION}
+                })
+            
+            elif path.startswith('/api/geometry/'):
+                # /api/geometry/<type>[.bin]?resolution=N
+                self.handle_geometry_request(path[len('/api/geometry/'):], query)
+            
+            elif path == '/api/keyframes' or path.startswith('/api/keyframes/'):
+                # /api/keyframes/<theme>[.bin]?duration=S&fps=N&projection=P
+                self.handle_keyframes_request(path[len('/api/keyframes/'):], query)
+            
+            elif path == '/api/shaders':
+                body, gzipped, etag = self.shader_permutations.get()['index']
+                self.send_etagged_response(body, etag, gzipped=gzipped)
+            
+            elif path == '/api/shaders/diagnostics':
+                self.send_json_response(self.shader_permutations.get()['diagnostics'])
+            
+            elif SHADER_HASH_RE.match(path):
+                digest = SHADER_HASH_RE.match(path).group(1)
+                shader = self.shader_permutations.get()['shaders'].get(digest)
+                if shader is None:
+                    self.send_json_response({'error': f'Unknown shader: {digest}', 'index': '/api/shaders'},
+                                            status=404)
+                else:
+                    self.cache_control = IMMUTABLE_CACHE_CONTROL
+                    self.send_etagged_response(shader[0], f'"{digest}"', content_type='text/plain; charset=utf-8',
+                                               gzipped=shader[1])
+            
+            elif path == '/api/preview' or path.startswith('/api/preview/'):
+                # /api/preview/<theme>.png?width=W&height=H&time=T&frames=N&geometry=G&projection=P
+                self.handle_preview_request(path[len('/api/preview/'):], query)
+            
+            elif path == '/api/metrics':
+                # /api/metrics?window=<minutes>&by=geometry,role[,face,canvas]
+                params = parse_qs(query)
+                by = [d for d in params.get('by', ['geometry,role'])[0].split(',') if d]
+                try:
+                    window = float(params.get('window', [DEFAULT_WINDOW_MINUTES])[0])
+                    if not window > 0:
+                        raise ValueError
+                except ValueError:
+                    self.send_json_response({'error': 'window must be a positive number of minutes'}, status=400)
+                    return
+                unknown = [d for d in by if d not in DIMENSIONS]
+                if unknown:
+                    self.send_json_response({'error': f'Unknown dimension: {unknown[0]}', 'dimensions': DIMENSIONS},
+                                            status=400)
+                    return
+                self.send_json_response(self.rum.view(window, by))
+            
+            elif path.startswith('/api/debug/'):
+                # POST /api/debug/profile?seconds=N&hz=H[&format=json], [POST] /api/debug/memory?top=N&group=G[&stop=1]
+                self.handle_debug_request(path[len('/api/debug/'):], query)
+            
+            elif path == '/api/validation':
+                results = self.document_validator.validate_all()
+                self.send_json_response({
+                    'valid': all(result['valid'] for result in results.values()),
+                    'documents': results
+                })
+            
             elif path == '/api/visualizers':
                 visualizer_info = self.get_visualizer_info()
                 self.send_json_response(visualizer_info)
             
+            elif path == '/api/parameters':
+                _, index = self.parameter_buffers.get()
+                self.send_json_response({**index, 'buffer': '/api/parameters.bin'})
+            
+            elif path == '/api/parameters.bin':
+                buffer, _ = self.parameter_buffers.get()
+                self.send_binary_response(buffer)
+            
             else:
                 self.send_error(404, 'API endpoint not found')
         
         except Exception as e:
             self.send_error(500, f'API error: {str(e)}')
     
-    def send_json_response(self, data):
+    def handle_geometry_request(self, name, query):
+        """Mesh descriptor (JSON) or packed Float32/Uint32 buffer for one geometry"""
+        if not GEOMETRY_AVAILABLE:
+            self.send_json_response({'error': 'Geometry engine requires numpy (pip install numpy)'}, status=503)
+            return
+        binary = name.endswith('.bin')
+        geometry = name[:-len('.bin')] if binary else name
+        try:
+            resolution = parse_resolution(parse_qs(query).get('resolution', [None])[0])
+            data, descriptor, etag = build_geometry(geometry, resolution)
+        except GeometryError as e:
+            self.send_json_response({'error': str(e), 'types': GEOMETRY_TYPES}, status=400)
+            return
+        if binary:
+            self.send_etagged_response(data, etag, content_type='application/octet-stream')
+        else:
+            self.send_json_response({**descriptor, 'buffer': f'/api/geometry/{geometry}.bin?resolution={resolution}'})
+    
+    def handle_keyframes_request(self, name, query):
+        """Rotation/projection keyframe timeline for one visuals.json theme"""
+        if not KEYFRAMES_AVAILABLE:
+            self.send_json_response({'error': 'Keyframe service requires numpy (pip install numpy)'}, status=503)
+            return
+        visuals, result = self.document_validator.validate_file('config/visuals.json')
+        if not result['valid']:
+            self.send_json_response({'error': 'config/visuals.json failed validation', 'errors': result['errors']},
+                                    status=422)
+            return
+        themes = list(visuals.get('themes') or {})
+        if not name:
+            self.send_json_response({
+                'themes': {theme: {'chain': chain_for_theme(theme), 'buffer': f'/api/keyframes/{theme}.bin'}
+                           for theme in themes},
+                'projections': PROJECTIONS
+            })
+            return
+        binary = name.endswith('.bin')
+        theme = name[:-len('.bin')] if binary else name
+        try:
+            rotation_speed, morph = theme_profile(visuals, theme)
+            duration, fps, projection = parse_timeline_options(parse_qs(query))
+            data, descriptor, etag = build_timeline(chain_for_theme(theme), rotation_speed, morph,
+                                                    duration, fps, projection)
+        except KeyframeError as e:
+            self.send_json_response({'error': str(e), 'themes': themes, 'projections': PROJECTIONS}, status=400)
+            return
+        if binary:
+            self.send_etagged_response(data, etag, content_type='application/octet-stream')
+        else:
+            buffer = f'/api/keyframes/{theme}.bin?duration={duration:g}&fps={fps}&projection={projection}'
+            self.send_json_response({**descriptor, 'theme': theme, 'buffer': buffer})
+    
+    def handle_preview_request(self, name, query):
+        """CPU-rendered PNG preview of one visuals.json theme, cached on disk"""
+        if not PREVIEW_AVAILABLE:
+            self.send_json_response({'error': 'Preview renderer requires numpy (pip install numpy)'}, status=503)
+            return
+        visuals, result = self.document_validator.validate_file('config/visuals.json')
+        if not result['valid']:
+            self.send_json_response({'error': 'config/visuals.json failed validation', 'errors': result['errors']},
+                                    status=422)
+            return
+        themes = list(visuals.get('themes') or {})
+        if not name:
+            self.send_json_response({
+                'themes': {theme: f'/api/preview/{theme}.png' for theme in themes},
+                'options': ['width', 'height', 'time', 'frames', 'fps', 'geometry', 'projection']
+            })
+            return
+        theme = name[:-len('.png')] if name.endswith('.png') else name
+        try:
+            options = parse_preview_options(parse_qs(query), theme)
+            png, etag, _ = self.preview_cache.get(visuals, theme, options)
+        except PreviewError as e:
+            self.send_json_response({'error': str(e), 'themes': themes}, status=400)
+            return
+        self.send_etagged_response(png, etag, content_type='image/png')
+    
+    def is_admin(self):
+        """Admin token, or a same-origin loopback caller addressing this server's port"""
+        return admin_allowed(self.client_address, self.headers, self.server.server_address[1])
+    
+    def handle_debug_request(self, name, query):
+        """Admin-only live profiling of the running process"""
+        if not self.is_admin():
+            self.send_json_response({
+                'error': 'Debug endpoints are admin-only',
+                'hint': f'Send {ADMIN_TOKEN_HEADER} or connect from localhost'
+            }, status=403)
+            return
+        params = parse_qs(query)
+        # Anything that starts work or changes tracing is POST-only, so a cross-site <img> can't trigger it
+        post = self.command == 'POST'
+        try:
+            if name == 'profile':
+                if not post:
+                    raise ProfilerError(405, 'Profiling runs with POST /api/debug/profile')
+                seconds, hz = parse_profile_options(params)
+                result = self.stack_sampler.sample(seconds, hz)
+                if params.get('format', ['collapsed'])[0] == 'json':
+                    self.send_json_response({
+                        'seconds': round(result['elapsed'], 3),
+                        'hz': hz,
+                        'samples': result['samples'],
+                        'threads': result['threads'],
+                        'stacks': dict(result['stacks'].most_common())
+                    })
+                else:
+                    self.send_binary_response(collapsed_stacks(result['stacks']).encode('utf-8'),
+                                              content_type='text/plain; charset=utf-8')
+            elif name == 'memory':
+                stop = params.get('stop', ['0'])[0] in ('1', 'true')
+                if not post and (stop or not self.memory_tracker.tracing()):
+                    raise ProfilerError(405, 'Starting or stopping tracemalloc needs POST /api/debug/memory')
+                if stop:
+                    self.send_json_response({'stopped': self.memory_tracker.stop()})
+                    return
+                try:
+                    top = max(1, int(params.get('top', [DEFAULT_TOP])[0]))
+                except ValueError:
+                    raise ProfilerError(400, 'top must be an integer')
+                self.send_json_response(self.memory_tracker.snapshot(top, params.get('group', ['lineno'])[0]))
+            else:
+                self.send_json_response({'error': f'Unknown debug endpoint: {name}',
+                                         'endpoints': ['profile', 'memory']}, status=404)
+        except ProfilerError as e:
+            self.send_json_response({'error': str(e)}, status=e.status)
+    
+    def send_json_response(self, data, status=200):
         """Send JSON response with proper headers"""
-        json_data = json.dumps(data, indent=2)
-        self.send_response(200)
+        with self.stage('serialize'):
+            json_data = json.dumps(data, indent=2).encode('utf-8')
+        self.send_response(status)
         self.send_header('Content-type', 'application/json')
         self.end_headers()
-        self.wfile.write(json_data.encode('utf-8'))
+        with self.stage('write'):
+            self.wfile.write(json_data)
+    
+    def send_etagged_response(self, body, etag, content_type='application/json', gzipped=None):
+        """Send pre-encoded bytes, or 304 when the client already has this ETag"""
+        if etag in (tag.strip() for tag in self.headers.get('If-None-Match', '').split(',')):
+            self.send_response(304)
+            self.send_header('ETag', etag)
+            self.end_headers()
+            return
+        use_gzip = gzipped is not None and 'gzip' in self.headers.get('Accept-Encoding', '')
+        payload = gzipped if use_gzip else body
+        self.send_response(200)
+        self.send_header('Content-type', content_type)
+        self.send_header('Content-Length', str(len(payload)))
+        self.send_header('ETag', etag)
+        if gzipped is not None:
+            self.send_header('Vary', 'Accept-Encoding')
+        if use_gzip:
+            self.send_header('Content-Encoding', 'gzip')
+        self.end_headers()
+        with self.stage('write'):
+            self.wfile.write(payload)
+    
+    def send_binary_response(self, data, content_type='application/octet-stream'):
+        """Send raw bytes, e.g. a Float32 parameter buffer"""
+        self.send_response(200)
+        self.send_header('Content-type', content_type)
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        with self.stage('write'):
+            self.wfile.write(data)
     
     def load_dashboard_config(self):
         """Load dashboard configuration files"""
@@ -124,8 +635,15 @@ class VIB34DProductionHandler(http.server.SimpleHTTPRequestHandler):
             filepath = os.path.join('config', filename)
             if os.path.exists(filepath):
                 try:
-                    with open(filepath, 'r') as f:
-                        config[filename.replace('.json', '')] = json.load(f)
+                    # Re-read on every request; validation is memoized by content hash
+                    data, result = self.document_validator.validate_file(filepath.replace(os.sep, '/'))
+                    if result['valid']:
+                        config[filename.replace('.json', '')] = data
+                    else:
+                        config[filename.replace('.json', '')] = {
+                            'error': 'Schema validation failed',
+                            'errors': result['errors']
+                        }
                 except Exception as e:
                     config[filename.replace('.json', '')] = {'error': str(e)}
         
@@ -165,6 +683,11 @@ class VIB34DProductionHandler(http.server.SimpleHTTPRequestHandler):
         message = format % args
         print(f"[{timestamp}] {message}")
 
+class VIB34DThreadingServer(socketserver.ThreadingTCPServer):
+    """One thread per request, with a listen backlog deep enough for a page load's parallel fetches"""
+    daemon_threads = True
+    request_queue_size = 128
+
 class VIB34DProductionServer:
     """Production server manager for VIB34D Dashboard"""
     
@@ -198,8 +721,21 @@ class VIB34DProductionServer:
             # Find available port
             self.find_available_port()
             
-            # Create server
-            self.server = socketserver.TCPServer(
+            # Replay config patches that were acknowledged but not yet written
+            recovered = VIB34DProductionHandler.config_store.recover()
+            if recovered:
+                print(f"🩹 Recovered journaled config writes: {', '.join(recovered)}")
+            
+            indexed = VIB34DProductionHandler.static_index.start()
+            print(f"🗂️ Indexed {indexed} static files (rescanned every "
+                  f"{VIB34DProductionHandler.static_index.poll_interval:g}s)")
+            
+            slow_requests = VIB34DProductionHandler.slow_requests
+            if slow_requests.threshold_ms is not None:
+                print(f"🐢 Logging requests slower than {slow_requests.threshold_ms:g} ms to {slow_requests.path}")
+            
+            # Create server; one thread per request so a profile run doesn't stall other clients
+            self.server = VIB34DThreadingServer(
                 (self.host, self.port), 
                 VIB34DProductionHandler
             )
@@ -217,8 +753,19 @@ class VIB34DProductionServer:
 📍 Server URL: {url}
 🌐 Dashboard: {url}/professional
 📊 Status API: {url}/api/status
-⚙️ Config API: {url}/api/config
+⚙️ Config API: {url}/api/config (+ /api/config/<doc>/<dotted.path>)
+✏️ Config writes: POST {url}/api/config/<doc>[/<dotted.path>] (+ /api/config/writes)
+🧪 Validation: {url}/api/validation
+📈 Client metrics: POST {url}/api/rum (+ /api/metrics?by=geometry,role)
+🔬 Live profiling (admin): POST {url}/api/debug/profile?seconds=N (+ /api/debug/memory)
+🔷 Geometry: {url}/api/geometry/<type> (+ /api/geometry/<type>.bin)
+🖼️ Previews: {url}/api/preview/<theme>.png
+🧩 Shaders: {url}/api/shaders (+ /api/shaders/<hash>)
+🌀 Keyframes: {url}/api/keyframes/<theme> (+ /api/keyframes/<theme>.bin)
+🎛️ Event dispatch: {url}/api/events/dispatch (+ /api/events/diagnostics)
+🧬 Resolved presets: {url}/api/resolved (+ /api/resolved/<face>/<role>)
 🎨 Visualizers: {url}/api/visualizers
+🔢 Parameters: {url}/api/parameters (+ /api/parameters.bin)
 
 🎯 Features:
    • Full WebGL support with proper CORS headers
@@ -226,6 +773,7 @@ class VIB34DProductionServer:
    • 33+ WebGL visualizers
    • JSON configuration system
    • Real-time performance monitoring
+   • Server-Timing stage breakdown and X-Trace-Id on every response
    • Cross-origin resource sharing enabled
 
 🔧 Available Routes:
@@ -251,6 +799,8 @@ Press Ctrl+C to stop the server
         """Stop the production server"""
         if self.server:
             print("🛑 Stopping VIB34D Production Server...")
+            VIB34DProductionHandler.config_store.flush_all()
+            VIB34DProductionHandler.static_index.stop()
             self.server.shutdown()
             self.server.server_close()
             if self.thread:
@@ -0,0 +1,51 @@
+"""Build reports for succeeded and failed packager runs"""
+
+import json
+import os
+import tempfile
+import unittest
+
+from vib34d_build_profile import BuildProfiler
+
+
+def copy_files():
+    return 'ok'
+
+
+def optimize_media():
+    raise RuntimeError('media broke')
+
+
+class BuildProfilerTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.profiler = BuildProfiler(self.tmp.name)
+        self.profiler.start()
+        self.addCleanup(self.profiler.stop)
+
+    def test_successful_build(self):
+        self.assertEqual(self.profiler.run(copy_files), 'ok')
+        report = self.profiler.report()
+        self.assertEqual(report['status'], 'succeeded')
+        self.assertIsNone(report['failure'])
+        self.assertEqual(report['stages'][0]['status'], 'ok')
+
+    def test_failed_stage_is_recorded_and_reraised(self):
+        self.profiler.run(copy_files)
+        with self.assertRaises(RuntimeError):
+            self.profiler.run(optimize_media)
+        # A later catch-all must not overwrite the stage that actually broke
+        self.profiler.fail(RuntimeError('media broke'))
+
+        path = os.path.join(self.tmp.name, 'missing', 'build-report.json')
+        self.profiler.write_report(path)
+        with open(path) as f:
+            report = json.load(f)
+        self.assertEqual(report['status'], 'failed')
+        self.assertEqual(report['failure'], {'stage': 'optimize_media', 'error': 'RuntimeError: media broke'})
+        self.assertEqual([stage['status'] for stage in report['stages']], ['ok', 'failed'])
+
+
+if __name__ == '__main__':
+    unittest.main()
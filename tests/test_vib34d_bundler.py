@@ -0,0 +1,86 @@
+"""ES module bundling and HTML inlining for the single-file dashboard"""
+
+import tempfile
+import unittest
+from pathlib import Path
+
+from vib34d_bundler import ESModuleBundler
+
+FILES = {
+    'core/lib.js': 'export const used = 1;\nexport function unusedHelper() { return 2; }\nexport default class Widget {}\n',
+    'core/main.js': "import Widget, { used } from './lib.js';\nimport * as three from 'three';\n"
+                    "console.log(new Widget(), used, three);\n",
+    'legacy.js': 'window.legacy = true;\n',
+    'style.css': 'body { color: red; }\n',
+    'pages/local.js': 'window.local = true;\n'
+}
+
+PAGE = '''<html><head><link rel="stylesheet" href="style.css"><link rel="icon" href="favicon.ico"></head><body>
+<script src="legacy.js"></script>
+<script src="https://cdn.example/x.js"></script>
+<script type="module" src="core/main.js"></script>
+<script type="module">import { used } from './core/lib.js'; console.log(used);</script>
+</body></html>
+'''
+
+
+class BundleHtmlTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.root = Path(self.directory.name)
+        for relative, text in FILES.items():
+            (self.root / relative).parent.mkdir(parents=True, exist_ok=True)
+            (self.root / relative).write_text(text)
+        self.bundler = ESModuleBundler([self.root])
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def bundle(self, html=PAGE, entry='index.html'):
+        return self.bundler.bundle_html(html, entry)
+
+    def test_module_graph_becomes_one_module_script(self):
+        output = self.bundle()
+        self.assertEqual(output.count('<script type="module">'), 1)
+        self.assertNotIn('core/main.js"', output)
+        report = self.bundler.report()
+        self.assertEqual(report['modules'], ['core/lib.js', 'core/main.js', 'index.html#inline-1'])
+        self.assertEqual(report['dropped_exports'], ['core/lib.js:unusedHelper'])
+        self.assertNotIn('unusedHelper', output)
+        self.assertNotIn('export ', output)
+
+    def test_bare_import_specifiers_stay_external(self):
+        self.assertIn("import * as three from 'three';", self.bundle())
+
+    def test_schemeless_script_and_stylesheet_urls_are_inlined(self):
+        output = self.bundle()
+        self.assertIn('// legacy.js\nwindow.legacy = true;', output)
+        self.assertNotIn('src="legacy.js"', output)
+        self.assertIn('/* style.css */\nbody { color: red; }', output)
+        self.assertNotIn('rel="stylesheet"', output)
+
+    def test_other_origins_and_non_stylesheet_links_are_left_alone(self):
+        output = self.bundle()
+        self.assertIn('<script src="https://cdn.example/x.js"></script>', output)
+        self.assertIn('<link rel="icon" href="favicon.ico">', output)
+
+    def test_urls_resolve_against_the_page_directory(self):
+        html = '<script src="local.js"></script><script src="../legacy.js?v=2"></script>'
+        output = self.bundle(html, 'pages/page.html')
+        self.assertIn('// pages/local.js', output)
+        self.assertIn('// legacy.js', output)
+
+    def test_missing_local_scripts_are_kept_and_reported(self):
+        output = self.bundle('<script src="missing.js"></script>')
+        self.assertIn('<script src="missing.js"></script>', output)
+        self.assertEqual(self.bundler.report()['warnings'], ['Missing classic script: missing.js'])
+
+    def test_closing_tags_inside_inlined_code_are_escaped(self):
+        (self.root / 'legacy.js').write_text("document.write('</script>');\n")
+        output = self.bundle('<script src="legacy.js"></script>')
+        self.assertIn("document.write('<\\/script>');", output)
+        self.assertEqual(output.count('</script>'), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,209 @@
+"""Config write store: patch semantics, journal replay and file writes"""
+
+import json
+import os
+import shutil
+import stat
+import tempfile
+import unittest
+
+from vib34d_config_index import ConfigPathIndex, ConfigQueryError
+from vib34d_config_store import (_UMASK, ConfigWriteStore, apply_json_patch, apply_merge_patch, apply_patch,
+                                 atomic_write, pointer_from_dotted, render_document)
+from vib34d_param_buffer import ParameterBufferCache
+from vib34d_preset_resolver import PresetResolver
+from vib34d_schema import DocumentValidator
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+VISUALS = 'config/visuals.json'
+
+
+class JsonPatchTest(unittest.TestCase):
+    document = {'a': {'b': 1, 'c': [1, 2]}, 'd': 'x'}
+
+    def patched(self, *operations, prefix=''):
+        return apply_json_patch(self.document, list(operations), prefix)
+
+    def test_add_remove_replace(self):
+        self.assertEqual(self.patched({'op': 'add', 'path': '/a/e', 'value': 3})['a']['e'], 3)
+        self.assertEqual(self.patched({'op': 'add', 'path': '/a/c/-', 'value': 3})['a']['c'], [1, 2, 3])
+        self.assertEqual(self.patched({'op': 'add', 'path': '/a/c/0', 'value': 0})['a']['c'], [0, 1, 2])
+        self.assertNotIn('d', self.patched({'op': 'remove', 'path': '/d'}))
+        self.assertEqual(self.patched({'op': 'replace', 'path': '/a/b', 'value': 5})['a']['b'], 5)
+
+    def test_move_copy_and_test(self):
+        moved = self.patched({'op': 'move', 'from': '/d', 'path': '/a/d'})
+        self.assertEqual((moved['a']['d'], 'd' in moved), ('x', False))
+        copied = self.patched({'op': 'copy', 'from': '/a/c', 'path': '/e'})
+        self.assertEqual(copied['e'], [1, 2])
+        copied['e'].append(3)
+        self.assertEqual(copied['a']['c'], [1, 2])
+        self.assertEqual(self.patched({'op': 'test', 'path': '/a/b', 'value': 1}), self.document)
+
+    def test_operations_are_relative_to_the_prefix(self):
+        self.assertEqual(self.patched({'op': 'replace', 'path': '/b', 'value': 7}, prefix='/a')['a']['b'], 7)
+
+    def test_input_document_is_not_mutated(self):
+        self.patched({'op': 'add', 'path': '/a/c/-', 'value': 3}, {'op': 'remove', 'path': '/d'})
+        self.assertEqual(self.document, {'a': {'b': 1, 'c': [1, 2]}, 'd': 'x'})
+
+    def test_errors_carry_http_statuses(self):
+        cases = [
+            ({'op': 'test', 'path': '/a/b', 'value': 2}, 409),
+            ({'op': 'replace', 'path': '/missing', 'value': 1}, 409),
+            ({'op': 'add', 'path': '/a/c/9', 'value': 1}, 409),
+            ({'op': 'move', 'from': '/a', 'path': '/a/b/x'}, 400),
+            ({'op': 'frobnicate', 'path': '/a'}, 400),
+            ({'op': 'add', 'path': '/a'}, 400),
+            ({'op': 'remove', 'path': ''}, 400)
+        ]
+        for operation, status in cases:
+            with self.assertRaises(ConfigQueryError, msg=operation) as caught:
+                self.patched(operation)
+            self.assertEqual(caught.exception.status, status, operation)
+
+    def test_operations_apply_all_or_nothing(self):
+        with self.assertRaises(ConfigQueryError):
+            self.patched({'op': 'remove', 'path': '/d'}, {'op': 'test', 'path': '/a/b', 'value': 2})
+        self.assertIn('d', self.document)
+
+
+class MergePatchTest(unittest.TestCase):
+    def test_rfc7396_semantics(self):
+        target = {'a': {'b': 1, 'c': 2}, 'd': [1], 'e': 'x'}
+        merged = apply_merge_patch(target, {'a': {'b': None, 'z': 3}, 'd': [2], 'e': {'f': 1}})
+        self.assertEqual(merged, {'a': {'c': 2, 'z': 3}, 'd': [2], 'e': {'f': 1}})
+        self.assertEqual(apply_merge_patch(target, [1]), [1])
+        self.assertEqual(target, {'a': {'b': 1, 'c': 2}, 'd': [1], 'e': 'x'})
+
+    def test_merge_at_a_dotted_path(self):
+        document = {'themes': {'hypercube': {'parameters': {'gridDensity': 8, 'morphFactor': 0.5}}}}
+        pointer = pointer_from_dotted('themes.hypercube.parameters')
+        merged = apply_patch(document, 'merge-patch', {'gridDensity': 12}, pointer)
+        self.assertEqual(merged['themes']['hypercube']['parameters'], {'gridDensity': 12, 'morphFactor': 0.5})
+
+
+class RenderDocumentTest(unittest.TestCase):
+    def test_untouched_formatting_is_kept(self):
+        text = '{\n    "keep":   [1,2,3],\n    "change": 1\n}\n'
+        old = json.loads(text)
+        rendered = render_document(text, old, {'keep': [1, 2, 3], 'change': 2}).decode('utf-8')
+        self.assertIn('"keep":   [1,2,3]', rendered)
+        self.assertEqual(json.loads(rendered), {'keep': [1, 2, 3], 'change': 2})
+
+
+class AtomicWriteTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, 'visuals.json')
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_replacing_keeps_the_existing_mode(self):
+        with open(self.path, 'w') as f:
+            f.write('{}')
+        os.chmod(self.path, 0o664)
+        atomic_write(self.path, b'{"a": 1}')
+        self.assertEqual(stat.S_IMODE(os.stat(self.path).st_mode), 0o664)
+        with open(self.path, 'rb') as f:
+            self.assertEqual(f.read(), b'{"a": 1}')
+
+    def test_new_files_get_0644_less_umask(self):
+        atomic_write(self.path, b'{}')
+        self.assertEqual(stat.S_IMODE(os.stat(self.path).st_mode), 0o644 & ~_UMASK)
+        self.assertEqual(os.listdir(self.directory.name), ['visuals.json'])
+
+
+class StoreTest(unittest.TestCase):
+    """Against a copy of the checked-in config and preset documents"""
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.root = self.directory.name
+        for folder in ('config', 'presets'):
+            shutil.copytree(os.path.join(REPO_ROOT, folder), os.path.join(self.root, folder))
+        self.stores = []
+        self.store = self.open_store()
+
+    def tearDown(self):
+        for store in self.stores:
+            for timer in list(store.timers.values()):
+                timer.cancel()
+        self.directory.cleanup()
+
+    def open_store(self):
+        """A fresh validator/index/store over the root, as after a restart; writes wait for flush()"""
+        validator = DocumentValidator(self.root)
+        store = ConfigWriteStore(validator, ConfigPathIndex(validator, self.root), self.root, debounce=3600)
+        self.stores.append(store)
+        return store
+
+    def on_disk(self):
+        with open(os.path.join(self.root, VISUALS)) as f:
+            return json.load(f)['themes']['hypercube']['parameters']['gridDensity']
+
+    def set_density(self, store, value):
+        return store.patch('visuals', 'merge-patch', {'gridDensity': value},
+                           pointer_from_dotted('themes.hypercube.parameters'))
+
+    def test_accepted_writes_are_served_before_the_flush(self):
+        validator = self.store.validator
+        buffers = ParameterBufferCache(self.root, validator)
+        resolver = PresetResolver(validator, self.root)
+        before = (buffers.get()[0], resolver.get(0, 'background')[0], self.on_disk())
+
+        receipt = self.set_density(self.store, 31.5)
+        self.assertTrue(receipt['pending'])
+        self.assertEqual(self.on_disk(), before[2])
+        value, _ = validator.validate_file(VISUALS)
+        self.assertEqual(value['themes']['hypercube']['parameters']['gridDensity'], 31.5)
+        self.assertEqual(json.loads(self.store.index.query('visuals', 'themes.hypercube.parameters.gridDensity')[0]),
+                         31.5)
+        self.assertNotEqual(buffers.get()[0], before[0])
+        self.assertNotEqual(resolver.get(0, 'background')[0], before[1])
+
+        self.assertEqual(self.store.flush_all(), ['visuals'])
+        self.assertEqual(self.on_disk(), 31.5)
+        self.assertFalse(os.path.exists(self.store.journal_path))
+
+    def test_invalid_patches_are_refused(self):
+        with self.assertRaises(ConfigQueryError) as caught:
+            self.store.patch('visuals', 'merge-patch', {'themes': 'not an object'})
+        self.assertEqual(caught.exception.status, 422)
+        with self.assertRaises(ConfigQueryError) as caught:
+            self.store.patch('no-such-document', 'merge-patch', {})
+        self.assertEqual(caught.exception.status, 404)
+        self.assertEqual(self.store.describe()['pending'], [])
+
+    def test_recover_replays_unwritten_patches(self):
+        self.set_density(self.store, 20.0)
+        self.set_density(self.store, 21.0)
+        original = self.on_disk()
+        self.assertNotEqual(original, 21.0)
+
+        # Crash before the debounced write: a new store finds the journal
+        recovered = self.open_store()
+        self.assertEqual(recovered.recover(), ['visuals'])
+        self.assertEqual(self.on_disk(), 21.0)
+        self.assertEqual(recovered.describe()['recovered'], 2)
+        self.assertFalse(os.path.exists(recovered.journal_path))
+
+    def test_recover_skips_committed_patches_and_a_torn_tail(self):
+        self.set_density(self.store, 20.0)
+        self.store.flush_all()
+        self.set_density(self.store, 22.0)
+        with open(self.store.journal_path, 'a') as f:
+            f.write('{"revision": 9, "docu')
+
+        recovered = self.open_store()
+        self.assertEqual(recovered.recover(), ['visuals'])
+        self.assertEqual(self.on_disk(), 22.0)
+        self.assertEqual(recovered.describe()['recovered'], 1)
+
+    def test_recover_without_a_journal_is_a_no_op(self):
+        self.assertEqual(self.open_store().recover(), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,128 @@
+"""Delta package creation and apply"""
+
+import json
+import os
+import stat
+import tempfile
+import unittest
+import zipfile
+from pathlib import Path
+
+from vib34d_delta import (DELTA_INFO, MANIFEST_NAME, DeltaError, apply_delta_package, create_delta_package,
+                          file_checksum)
+
+
+def write_tree(root, files, modes=None):
+    """Write {relative: text} under root plus its manifest; returns the manifest"""
+    manifest = {'created': str(root), 'files': {}}
+    for relative, text in files.items():
+        path = root / relative
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(text)
+        os.chmod(path, (modes or {}).get(relative, 0o644))
+        manifest['files'][relative] = {'checksum': file_checksum(path), 'size': path.stat().st_size}
+    with open(root / MANIFEST_NAME, 'w') as f:
+        json.dump(manifest, f)
+    return manifest
+
+
+def mode_of(path):
+    return stat.S_IMODE(path.stat().st_mode)
+
+
+class DeltaRoundTripTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.root = Path(self.directory.name)
+        self.deployed = self.root / 'deployed'
+        self.package = self.root / 'package'
+        self.patch = self.root / 'patch.zip'
+        self.old_manifest = write_tree(self.deployed, {
+            'README.md': 'old readme\n', 'launch.sh': '#!/bin/sh\necho old\n', 'gone.js': 'x', 'same.css': 'a{}'
+        }, {'launch.sh': 0o755})
+        write_tree(self.package, {
+            'README.md': 'new readme\n', 'launch.sh': '#!/bin/sh\necho new\n', 'same.css': 'a{}',
+            'core/added.js': 'export {};\n'
+        }, {'launch.sh': 0o755})
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_apply_reproduces_the_new_tree(self):
+        summary = create_delta_package(self.old_manifest, self.package, self.patch)
+        self.assertEqual((summary['added'], summary['changed'], summary['removed']), (1, 2, 1))
+        result = apply_delta_package(self.patch, self.deployed)
+        self.assertEqual(result['verified_files'], 4)
+        for relative in ('README.md', 'launch.sh', 'same.css', 'core/added.js'):
+            self.assertEqual((self.deployed / relative).read_bytes(), (self.package / relative).read_bytes())
+        self.assertFalse((self.deployed / 'gone.js').exists())
+
+    def test_apply_keeps_file_modes(self):
+        create_delta_package(self.old_manifest, self.package, self.patch)
+        apply_delta_package(self.patch, self.deployed)
+        self.assertEqual(mode_of(self.deployed / 'README.md'), 0o644)
+        self.assertEqual(mode_of(self.deployed / 'launch.sh'), 0o755)
+        self.assertEqual(mode_of(self.deployed / 'core/added.js'), 0o644)
+
+    def test_drifted_tree_is_refused(self):
+        create_delta_package(self.old_manifest, self.package, self.patch)
+        (self.deployed / 'README.md').write_text('edited on the host\n')
+        with self.assertRaises(DeltaError):
+            apply_delta_package(self.patch, self.deployed)
+        self.assertEqual((self.deployed / 'launch.sh').read_text(), '#!/bin/sh\necho old\n')
+
+
+
+class DeltaPathTest(unittest.TestCase):
+    """delta.json is untrusted: nothing outside the deployed tree may be read or written"""
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.root = Path(self.directory.name)
+        self.deployed = self.root / 'deployed'
+        self.deployed.mkdir()
+        self.victim = self.root / 'victim.txt'
+        self.victim.write_text('keep\n')
+        self.patch = self.root / 'patch.zip'
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def write_patch(self, **fields):
+        info = {'format': 'vib34d-delta', 'added': [], 'changed': [], 'removed': [], 'base_checksums': {},
+                'target_manifest': {'files': {}}}
+        info.update(fields)
+        with zipfile.ZipFile(self.patch, 'w') as archive:
+            archive.writestr(DELTA_INFO, json.dumps(info))
+            for path in info['added'] + info['changed']:
+                archive.writestr('files/' + path, 'owned\n')
+
+    def assert_refused(self, **fields):
+        self.write_patch(**fields)
+        with self.assertRaises(DeltaError) as caught:
+            apply_delta_package(self.patch, self.deployed)
+        self.assertIn('outside the deployed tree', str(caught.exception))
+        self.assertEqual(self.victim.read_text(), 'keep\n')
+
+    def test_parent_and_absolute_removals_are_refused(self):
+        for path in ('../victim.txt', str(self.victim), 'sub/../../victim.txt'):
+            self.assert_refused(removed=[path])
+
+    def test_escaping_writes_are_refused(self):
+        self.assert_refused(added=['../victim.txt'],
+                            target_manifest={'files': {'../victim.txt': {'checksum': 'x', 'size': 6}}})
+
+    def test_symlinked_directories_are_refused(self):
+        (self.deployed / 'link').symlink_to(self.root)
+        self.assert_refused(removed=['link/victim.txt'])
+
+    def test_paths_inside_the_tree_are_applied(self):
+        (self.deployed / 'sub').mkdir()
+        (self.deployed / 'sub' / 'gone.txt').write_text('x')
+        self.write_patch(removed=['sub/gone.txt'])
+        self.assertEqual(apply_delta_package(self.patch, self.deployed)['removed'], 1)
+        self.assertFalse((self.deployed / 'sub' / 'gone.txt').exists())
+
+
+if __name__ == '__main__':
+    unittest.main()
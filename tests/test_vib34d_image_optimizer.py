@@ -0,0 +1,102 @@
+"""PNG filtering: NumPy and pure-Python paths agree, and recompression is lossless"""
+
+import random
+import struct
+import unittest
+import zlib
+
+import vib34d_image_optimizer as optimizer
+from vib34d_image_optimizer import (PNG_CHANNELS, encode_png, filter_candidates, filter_scanline, optimize_png,
+                                    read_png_chunks, unfilter_scanlines)
+
+
+def random_rows(width, height, bpp, seed):
+    rng = random.Random(seed)
+    # Runs of one value so the filters and quantizer have something to find
+    return [bytes(rng.choice((rng.randrange(256), 7, 7)) for _ in range(width * bpp)) for _ in range(height)]
+
+
+def mixed_filter_stream(rows, bpp, seed):
+    rng = random.Random(seed)
+    raw = []
+    previous = bytes(len(rows[0]))
+    for line in rows:
+        filter_type = rng.randrange(5)
+        raw.append(bytes((filter_type,)) + filter_scanline(filter_type, line, previous, bpp))
+        previous = line
+    return b''.join(raw)
+
+
+def decode_png(data):
+    chunks = read_png_chunks(data)
+    width, height, _, color_type = struct.unpack('>IIBB', dict(chunks)[b'IHDR'][:10])
+    channels = PNG_CHANNELS[color_type]
+    raw = zlib.decompress(b''.join(body for chunk_type, body in chunks if chunk_type == b'IDAT'))
+    return color_type, unfilter_scanlines(raw, height, width * channels, channels)
+
+
+class PurePythonMixin:
+    def setUp(self):
+        self.numpy = optimizer.np
+        optimizer.np = None
+
+    def tearDown(self):
+        optimizer.np = self.numpy
+
+
+class FilterTest(unittest.TestCase):
+    SHAPES = [(1, 7, 5), (2, 5, 4), (3, 11, 9), (4, 13, 6), (8, 3, 3)]
+
+    def test_unfilter_reverses_every_filter_type(self):
+        for seed, (bpp, width, height) in enumerate(self.SHAPES):
+            rows = random_rows(width, height, bpp, seed)
+            raw = mixed_filter_stream(rows, bpp, seed)
+            self.assertEqual(unfilter_scanlines(raw, height, width * bpp, bpp), rows, bpp)
+
+    def test_unknown_filter_type_is_rejected(self):
+        with self.assertRaises(optimizer.ImageFormatError):
+            unfilter_scanlines(b'\x05\x00\x00\x00', 1, 3, 3)
+
+    @unittest.skipIf(optimizer.np is None, 'NumPy not installed')
+    def test_numpy_candidates_match_pure_python(self):
+        for seed, (bpp, width, height) in enumerate(self.SHAPES):
+            rows = random_rows(width, height, bpp, seed)
+            fast = list(filter_candidates(rows, width * bpp, bpp))
+            numpy, optimizer.np = optimizer.np, None
+            try:
+                slow = list(filter_candidates(rows, width * bpp, bpp))
+            finally:
+                optimizer.np = numpy
+            self.assertEqual(fast, slow, bpp)
+
+
+class PurePythonFilterTest(PurePythonMixin, FilterTest):
+    pass
+
+
+class OptimizePngTest(unittest.TestCase):
+    def test_round_trip_is_lossless(self):
+        rows = random_rows(24, 16, 3, 1)
+        original = encode_png(24, 16, rows)
+        self.assertEqual(decode_png(optimize_png(original)), (2, rows))
+
+    def test_opaque_alpha_is_dropped(self):
+        rows = [bytes(channel if index % 4 != 3 else 255 for index, channel in enumerate(line))
+                for line in random_rows(10, 6, 4, 2)]
+        color_type, decoded = decode_png(optimize_png(encode_png(10, 6, rows, color_type=6)))
+        self.assertEqual(color_type, 2)
+        self.assertEqual(decoded, [bytes(b for index, b in enumerate(line) if index % 4 != 3) for line in rows])
+
+    def test_quantize_makes_a_palette_image(self):
+        rows = [bytes((0, 0, 255) * 4 + (255, 0, 0) * 4)] * 8
+        color_type, decoded = decode_png(optimize_png(encode_png(8, 8, rows), quantize=True))
+        self.assertEqual(color_type, 3)
+        self.assertEqual(len(set(b''.join(decoded))), 2)
+
+
+class PurePythonOptimizePngTest(PurePythonMixin, OptimizePngTest):
+    pass
+
+
+if __name__ == '__main__':
+    unittest.main()
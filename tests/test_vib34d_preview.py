@@ -0,0 +1,60 @@
+"""Preview option limits and the preview disk cache"""
+
+import os
+import tempfile
+import unittest
+
+from vib34d_preview import MAX_PIXELS, PreviewCache, PreviewError, parse_preview_options
+
+
+def options(**query):
+    return parse_preview_options({name: [str(value)] for name, value in query.items()}, 'hypercube')
+
+
+class PreviewOptionsTest(unittest.TestCase):
+    def test_time_and_fps_snap_to_the_frame_grid(self):
+        snapped = options(time=1.234, fps=9.7)
+        self.assertEqual((snapped['fps'], snapped['time']), (10, 1.2))
+        self.assertEqual(options(time=1.21, fps=10), options(time=1.19, fps=10))
+
+    def test_pixel_budget_covers_all_frames(self):
+        self.assertEqual(options(width=512, frames=4)['frames'], 4)
+        with self.assertRaises(PreviewError):
+            options(width=512, frames=16)
+        self.assertLessEqual(256 * 256 * 16, MAX_PIXELS)
+
+    def test_rejects_non_finite_numbers(self):
+        for query in ({'time': 'nan'}, {'fps': 'inf'}, {'time': -1}):
+            with self.assertRaises(PreviewError):
+                options(**query)
+
+
+class PreviewCacheEvictionTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.cache = PreviewCache(self.directory.name, max_bytes=250)
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def write(self, name, size, mtime):
+        path = os.path.join(self.directory.name, name)
+        with open(path, 'wb') as f:
+            f.write(bytes(size))
+        os.utime(path, (mtime, mtime))
+
+    def test_evicts_least_recently_served_first(self):
+        self.write('old.png', 100, 1000)
+        self.write('recent.png', 100, 3000)
+        self.write('middle.png', 100, 2000)
+        self.write('render.tmp', 500, 0)
+        self.assertEqual(self.cache.evict(), 100)
+        self.assertEqual(sorted(os.listdir(self.directory.name)), ['middle.png', 'recent.png', 'render.tmp'])
+
+    def test_nothing_evicted_under_the_cap(self):
+        self.write('a.png', 100, 1000)
+        self.assertEqual(self.cache.evict(), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
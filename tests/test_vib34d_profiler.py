@@ -0,0 +1,37 @@
+"""Admin gate for the debug and config write endpoints"""
+
+import unittest
+
+from vib34d_profiler import ADMIN_TOKEN_HEADER, admin_allowed
+
+LOOPBACK = ('127.0.0.1', 50000)
+PORT = 8080
+
+
+class AdminAllowedTest(unittest.TestCase):
+    def allowed(self, headers, client=LOOPBACK, token=''):
+        return admin_allowed(client, headers, PORT, token=token)
+
+    def test_loopback_host_on_the_bound_port(self):
+        for host in ('localhost:8080', '127.0.0.1:8080', '[::1]:8080', 'LOCALHOST:8080'):
+            self.assertTrue(self.allowed({'Host': host}), host)
+            self.assertTrue(self.allowed({'Host': host, 'Origin': f'http://{host}'}), host)
+
+    def test_dns_rebinding_is_refused(self):
+        headers = {'Host': 'attacker.example:8080', 'Origin': 'http://attacker.example:8080'}
+        self.assertFalse(self.allowed(headers))
+
+    def test_other_ports_missing_host_and_other_origins_are_refused(self):
+        self.assertFalse(self.allowed({'Host': 'localhost:9090'}))
+        self.assertFalse(self.allowed({'Host': 'localhost'}))
+        self.assertFalse(self.allowed({}))
+        self.assertFalse(self.allowed({'Host': 'localhost:8080', 'Origin': 'http://evil.example'}))
+
+    def test_remote_clients_need_the_token(self):
+        self.assertFalse(self.allowed({'Host': 'localhost:8080'}, client=('10.0.0.5', 1)))
+        self.assertTrue(self.allowed({ADMIN_TOKEN_HEADER: 'Bearer s3cret'}, client=('10.0.0.5', 1), token='s3cret'))
+        self.assertFalse(self.allowed({ADMIN_TOKEN_HEADER: 'wrong', 'Host': 'localhost:8080'}, token='s3cret'))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,44 @@
+"""RUM beacon parsing and aggregation"""
+
+import unittest
+
+from vib34d_rum import OTHER, RumAggregator, RumError, parse_beacon
+
+
+class IngestTest(unittest.TestCase):
+    def setUp(self):
+        self.aggregator = RumAggregator()
+
+    def test_registered_geometries_and_theme_aliases_are_dimensions(self):
+        self.aggregator.ingest([{'fps': 60, 'geometry': 'hypersphere'}, {'fps': 60, 'geometry': 'torus'},
+                                {'fps': 60, 'geometry': 'bogus'}], now=0)
+        self.assertEqual(set(self.aggregator.view(now=0)['geometry']), {'hypersphere', 'torus', OTHER})
+
+    def test_unhashable_dimension_values_count_as_other(self):
+        accepted, rejected = self.aggregator.ingest([{'fps': 60, 'geometry': [1], 'role': {'a': 1}}], now=0)
+        self.assertEqual((accepted, rejected), (1, 0))
+        view = self.aggregator.view(now=0)
+        self.assertEqual(list(view['geometry']), [OTHER])
+        self.assertEqual(list(view['role']), [OTHER])
+
+    def test_counters_match_folded_samples(self):
+        self.aggregator.ingest([{'fps': 60}, 'not a sample', {'geometry': 'hypercube'}], now=0)
+        view = self.aggregator.view(now=0)
+        self.assertEqual((view['ingested'], view['rejected']), (1, 2))
+        self.assertEqual(view['overall']['samples'], 1)
+
+
+class ParseBeaconTest(unittest.TestCase):
+    def test_accepts_list_or_samples_object(self):
+        self.assertEqual(parse_beacon(b'[{"fps": 60}]'), [{'fps': 60}])
+        self.assertEqual(parse_beacon(b'{"samples": []}'), [])
+
+    def test_rejects_malformed_beacons(self):
+        for body in (b'{', b'"text"', b'{"samples": 1}'):
+            with self.assertRaises(RumError) as caught:
+                parse_beacon(body)
+            self.assertEqual(caught.exception.status, 400)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+"""
+VIB34D Artifact Store
+Content-addressable object store for build outputs. Every packaged file is
+keyed by its SHA-256 and replaced with a hardlink to the one stored copy,
+so duplicate outputs (index.html and the main dashboard, identical config
+copies, a static export of the same package) and unchanged files across
+package directories share one inode. A new object is the output file
+itself linked into the store, so ingesting never copies data.
+
+Linked files must be replaced, never edited in place: the server's config
+writes and delta apply already write a temp file and rename it over the
+original. Objects no package links to any more are removed by gc.
+
+Usage:
+    python3 vib34d_artifact_store.py stats [--store .vib34d-cache/objects]
+    python3 vib34d_artifact_store.py gc [--store .vib34d-cache/objects]
+"""
+
+import argparse
+import hashlib
+import os
+import stat
+import sys
+from pathlib import Path
+
+STORE_DIR = os.path.join('.vib34d-cache', 'objects')
+LINK_SUFFIX = '.vib34d-link'
+
+
+def file_digest(path):
+    """SHA-256 hex digest, streamed"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class ArtifactStore:
+    """SHA-256 -> one file under root, shared by hardlinks"""
+
+    def __init__(self, root=STORE_DIR):
+        self.root = Path(root)
+
+    def object_path(self, digest):
+        return self.root / digest[:2] / digest[2:]
+
+    def _link_over(self, source, path):
+        """Atomically replace path with a hardlink to source"""
+        temp_path = path.with_name(path.name + LINK_SUFFIX)
+        if temp_path.exists():
+            temp_path.unlink()
+        os.link(source, temp_path)
+        os.replace(temp_path, path)
+
+    def ingest(self, path):
+        """Store one file and link it to its object: (digest, 'new' | 'linked' | 'shared' | 'copy')
+
+        'new' adds the file itself as the object, 'linked' swaps it for an
+        existing object, 'shared' means it already was that object, and
+        'copy' means hardlinks aren't possible here and the file was left as is.
+        """
+        path = Path(path)
+        digest = file_digest(path)
+        target = self.object_path(digest)
+        file_stat = path.stat()
+        try:
+            object_stat = target.stat()
+        except FileNotFoundError:
+            object_stat = None
+        if (object_stat is not None and not os.path.samestat(file_stat, object_stat)
+                and file_digest(target) != digest):
+            # Something wrote through a link; the current file is the good copy
+            target.unlink()
+            object_stat = None
+
+        try:
+            if object_stat is None:
+                target.parent.mkdir(parents=True, exist_ok=True)
+                try:
+                    os.link(path, target)
+                    return digest, 'new'
+                except FileExistsError:
+                    # A concurrent build stored it first
+                    object_stat = target.stat()
+            if os.path.samestat(file_stat, object_stat):
+                return digest, 'shared'
+            self._link_over(target, path)
+            return digest, 'linked'
+        except OSError:
+            # Cross-device store or a filesystem without hardlinks
+            return digest, 'copy'
+
+    def deduplicate(self, directory, exclude=()):
+        """Ingest every regular file under directory; returns a report dict
+
+        Executable files are left alone: a hardlink shares its mode with
+        every other name for the same content.
+        """
+        directory = Path(directory)
+        report = {'files': 0, 'bytes': 0, 'unique_files': 0, 'unique_bytes': 0, 'saved_bytes': 0,
+                  'new_objects': 0, 'reused_objects': 0, 'skipped_executables': 0, 'unlinked': 0}
+        seen = set()
+        for root, dirs, files in os.walk(directory):
+            dirs.sort()
+            for name in sorted(files):
+                path = Path(root) / name
+                relative = path.relative_to(directory).as_posix()
+                file_stat = path.lstat()
+                if relative in exclude or not stat.S_ISREG(file_stat.st_mode) or name.endswith(LINK_SUFFIX):
+                    continue
+                report['files'] += 1
+                report['bytes'] += file_stat.st_size
+                if file_stat.st_mode & 0o111:
+                    report['skipped_executables'] += 1
+                    report['unique_files'] += 1
+                    report['unique_bytes'] += file_stat.st_size
+                    continue
+                digest, outcome = self.ingest(path)
+                if outcome == 'copy':
+                    report['unlinked'] += 1
+                if digest in seen:
+                    if outcome != 'copy':
+                        report['saved_bytes'] += file_stat.st_size
+                    continue
+                seen.add(digest)
+                report['unique_files'] += 1
+                report['unique_bytes'] += file_stat.st_size
+                if outcome == 'new':
+                    report['new_objects'] += 1
+                else:
+                    report['reused_objects'] += 1
+        return report
+
+    def _objects(self):
+        if not self.root.exists():
+            return
+        for bucket in sorted(self.root.iterdir()):
+            if bucket.is_dir():
+                for path in sorted(bucket.iterdir()):
+                    yield path
+
+    def describe(self):
+        """Object count and size, and how many are still linked from a package"""
+        objects = total = linked = 0
+        for path in self._objects():
+            object_stat = path.stat()
+            objects += 1
+            total += object_stat.st_size
+            linked += object_stat.st_nlink > 1
+        return {'root': str(self.root), 'objects': objects, 'bytes': total, 'linked_objects': linked}
+
+    def collect_garbage(self):
+        """Delete objects no file outside the store links to; returns (objects, bytes) freed"""
+        removed = freed = 0
+        for path in self._objects():
+            object_stat = path.stat()
+            if object_stat.st_nlink <= 1:
+                path.unlink()
+                removed += 1
+                freed += object_stat.st_size
+        for bucket in self.root.iterdir() if self.root.exists() else ():
+            if bucket.is_dir() and not any(bucket.iterdir()):
+                bucket.rmdir()
+        return removed, freed
+
+
+def main():
+    """Command line entry point"""
+    parser = argparse.ArgumentParser(description='VIB34D content-addressable artifact store')
+    parser.add_argument('command', choices=['stats', 'gc'])
+    parser.add_argument('--store', default=STORE_DIR)
+    args = parser.parse_args()
+
+    store = ArtifactStore(args.store)
+    if not store.root.exists():
+        print(f'❌ No artifact store at {store.root}')
+        sys.exit(1)
+    if args.command == 'gc':
+        removed, freed = store.collect_garbage()
+        print(f'🧹 Removed {removed} unreferenced objects ({freed / 1024:.1f} KB)')
+    info = store.describe()
+    print(f'🗃️ {info["objects"]} objects, {info["bytes"] / 1024:.1f} KB '
+          f'({info["linked_objects"]} linked from packages)')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+"""
+VIB34D Asset Graph
+Crawls the dashboard entry pages through <script>, <link>, import,
+fetch() and CSS url() references to find exactly the files to ship
+"""
+
+import os
+import re
+from collections import deque
+from pathlib import Path
+
+from vib34d_bundler import mask_source
+
+HTML_TAG_RE = re.compile(
+    r'<(?P<tag>script|link|img|source|video|audio)\b(?P<attrs>[^>]*)>',
+    re.IGNORECASE
+)
+HTML_ATTR_RE = re.compile(r'\b(?P<name>src|href|poster)\s*=\s*(?P<quote>["\']?)(?P<value>[^"\'\s>]+)(?P=quote)', re.IGNORECASE)
+INLINE_SCRIPT_RE = re.compile(r'<script\b(?P<attrs>[^>]*)>(?P<body>.*?)</script>', re.IGNORECASE | re.DOTALL)
+INLINE_STYLE_RE = re.compile(r'<style\b[^>]*>(?P<body>.*?)</style>', re.IGNORECASE | re.DOTALL)
+
+JS_IMPORT_RE = re.compile(
+    r'\b(?:import|export)\b[\w$\s{},*]*?\bfrom\s*(?P<quote>[\'"])(?P<value>[^\'"]+)(?P=quote)'
+    r'|\bimport\s*(?P<quote2>[\'"])(?P<value2>[^\'"]+)(?P=quote2)'
+    r'|\bimport\s*\(\s*(?P<quote3>[\'"])(?P<value3>[^\'"]+)(?P=quote3)\s*\)'
+)
+JS_FETCH_RE = re.compile(r'\bfetch\s*\(\s*(?P<quote>[\'"`])(?P<value>[^\'"`]*)(?P=quote)')
+CSS_URL_RE = re.compile(
+    r'url\(\s*(?P<quote>["\']?)(?P<value>[^"\')]+)(?P=quote)\s*\)'
+    r'|@import\s+(?P<quote2>["\'])(?P<value2>[^"\']+)(?P=quote2)'
+)
+
+IGNORED_DIRECTORIES = {'.git', 'node_modules', '__pycache__', '.vib34d-cache'}
+
+
+def _is_external(value):
+    return (
+        '://' in value or value.startswith('//') or value.startswith('data:')
+        or value.startswith('#') or value.startswith('mailto:') or value.startswith('javascript:')
+    )
+
+
+class AssetGraph:
+    """Reachability crawler over HTML, JavaScript and CSS references"""
+
+    def __init__(self, root):
+        self.root = Path(root)
+        self.reachable = set()
+        self.edges = {}
+        self.missing = []
+        self.dynamic = []
+        self.external = set()
+
+    def _resolve(self, base_dir, value):
+        value = value.split('?')[0].split('#')[0]
+        if not value:
+            return None
+        if value.startswith('/'):
+            candidate = value.lstrip('/')
+        else:
+            candidate = os.path.normpath(os.path.join(base_dir, value)).replace(os.sep, '/')
+        return None if candidate.startswith('..') else candidate
+
+    def _read(self, relative):
+        with open(self.root / relative, 'r', encoding='utf-8', errors='replace') as f:
+            return f.read()
+
+    # ------------------------------------------------------------------
+    # Reference extraction
+    # ------------------------------------------------------------------
+
+    def _js_references(self, source, module_dir, page_dir):
+        """Yield (kind, base_dir, value) for imports and fetches in JavaScript"""
+        masked = mask_source(source)
+        for match in JS_IMPORT_RE.finditer(source):
+            if masked[match.start()] == ' ':
+                continue
+            value = match.group('value') or match.group('value2') or match.group('value3')
+            yield 'import', module_dir, value
+        for match in JS_FETCH_RE.finditer(source):
+            if masked[match.start()] == ' ':
+                continue
+            value = match.group('value')
+            if match.group('quote') == '`' and '${' in value:
+                yield 'dynamic', page_dir, value
+            else:
+                # fetch() resolves against the document, not the script
+                yield 'fetch', page_dir, value
+
+    def _css_references(self, source, css_dir):
+        for match in CSS_URL_RE.finditer(re.sub(r'/\*.*?\*/', '', source, flags=re.DOTALL)):
+            yield 'url', css_dir, (match.group('value') or match.group('value2')).strip()
+
+    def _html_references(self, source, page_dir):
+        for match in HTML_TAG_RE.finditer(source):
+            for attr in HTML_ATTR_RE.finditer(match.group('attrs')):
+                yield match.group('tag').lower(), page_dir, attr.group('value')
+        for match in INLINE_SCRIPT_RE.finditer(source):
+            yield from self._js_references(match.group('body'), page_dir, page_dir)
+        for match in INLINE_STYLE_RE.finditer(source):
+            yield from self._css_references(match.group('body'), page_dir)
+
+    def references(self, relative, page_dir):
+        """All outgoing references of one file"""
+        suffix = Path(relative).suffix.lower()
+        if suffix not in ('.html', '.htm', '.js', '.mjs', '.css'):
+            return []
+        source = self._read(relative)
+        if suffix in ('.html', '.htm'):
+            return list(self._html_references(source, os.path.dirname(relative)))
+        if suffix == '.css':
+            return list(self._css_references(source, os.path.dirname(relative)))
+        return list(self._js_references(source, os.path.dirname(relative), page_dir))
+
+    # ------------------------------------------------------------------
+    # Crawl
+    # ------------------------------------------------------------------
+
+    def crawl(self, entries):
+        """Breadth-first walk from the entry pages, returning the reachable set"""
+        queue = deque()
+        seen = set()
+        for entry in entries:
+            if (self.root / entry).is_file():
+                queue.append((entry, os.path.dirname(entry)))
+            else:
+                self.missing.append(('<entry>', entry))
+
+        while queue:
+            relative, page_dir = queue.popleft()
+            if (relative, page_dir) in seen:
+                continue
+            seen.add((relative, page_dir))
+            self.reachable.add(relative)
+            if Path(relative).suffix.lower() in ('.html', '.htm'):
+                page_dir = os.path.dirname(relative)
+
+            targets = self.edges.setdefault(relative, set())
+            for kind, base_dir, value in self.references(relative, page_dir):
+                if kind == 'dynamic':
+                    self.dynamic.append((relative, value))
+                    continue
+                if _is_external(value):
+                    self.external.add(value)
+                    continue
+                target = self._resolve(base_dir, value)
+                if target is None:
+                    continue
+                if not (self.root / target).is_file():
+                    self.missing.append((relative, target))
+                    continue
+                targets.add(target)
+                queue.append((target, page_dir))
+
+        return self.reachable
+
+    def all_files(self, exclude=()):
+        """Every file under the root, skipping VCS, dependency and cache folders"""
+        excluded = {Path(path).resolve() for path in exclude}
+        files = set()
+        for directory, subdirectories, names in os.walk(self.root):
+            subdirectories[:] = [
+                name for name in subdirectories
+                if name not in IGNORED_DIRECTORIES and (Path(directory) / name).resolve() not in excluded
+            ]
+            for name in names:
+                files.add((Path(directory) / name).relative_to(self.root).as_posix())
+        return files
+
+    def dead_files(self, exclude=()):
+        return sorted(self.all_files(exclude) - self.reachable)
+
+    def report(self, exclude=()):
+        dead = self.dead_files(exclude)
+        by_directory = {}
+        for relative in dead:
+            top = relative.split('/', 1)[0] if '/' in relative else '.'
+            by_directory[top] = by_directory.get(top, 0) + 1
+        return {
+            'reachable': sorted(self.reachable),
+            'missing': [{'referrer': referrer, 'target': target} for referrer, target in self.missing],
+            'dynamic': [{'referrer': referrer, 'expression': value} for referrer, value in self.dynamic],
+            'external': sorted(self.external),
+            'dead_files': dead,
+            'dead_by_directory': dict(sorted(by_directory.items(), key=lambda item: -item[1]))
+        }
@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+VIB34D Build Profiler
+Per-stage wall time, CPU time, I/O bytes and peak Python memory for the
+production packager, written out as a machine-readable build report
+"""
+
+import cProfile
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+
+
+def read_io_counters():
+    """(bytes read, bytes written) for this process, or (None, None) off Linux"""
+    try:
+        with open('/proc/self/io', 'r') as f:
+            counters = dict(line.split(':', 1) for line in f if ':' in line)
+        return int(counters['rchar']), int(counters['wchar'])
+    except (OSError, KeyError, ValueError):
+        return None, None
+
+
+def directory_bytes(path):
+    total = 0
+    for root, dirs, files in os.walk(path):
+        for name in files:
+            try:
+                total += os.path.getsize(os.path.join(root, name))
+            except OSError:
+                pass
+    return total
+
+
+class BuildProfiler:
+    """Runs packager stages and records what each one cost"""
+
+    def __init__(self, output_dir, cprofile_path=None):
+        self.output_dir = output_dir
+        self.cprofile_path = cprofile_path
+        self.profile = cProfile.Profile() if cprofile_path else None
+        self.stages = []
+        self.started = None
+        self.failure = None
+
+    def start(self):
+        self.started = (time.perf_counter(), time.process_time())
+        tracemalloc.start()
+        if self.profile:
+            self.profile.enable()
+
+    def stop(self):
+        if self.profile:
+            self.profile.disable()
+            self.profile.dump_stats(self.cprofile_path)
+        if tracemalloc.is_tracing():
+            tracemalloc.stop()
+
+    def fail(self, error, stage=None):
+        """Record why the build stopped; the first failure wins"""
+        if self.failure is None:
+            self.failure = {'stage': stage, 'error': f'{type(error).__name__}: {error}'}
+
+    def run(self, stage, *args, **kwargs):
+        """Call a stage method, timing it under its own name"""
+        name = getattr(stage, '__name__', str(stage))
+        status = 'ok'
+        read_before, written_before = read_io_counters()
+        output_before = directory_bytes(self.output_dir)
+        if tracemalloc.is_tracing():
+            tracemalloc.reset_peak()
+        wall_before = time.perf_counter()
+        cpu_before = time.process_time()
+
+        try:
+            return stage(*args, **kwargs)
+        except Exception as e:
+            status = 'failed'
+            self.fail(e, name)
+            raise
+        finally:
+            wall = time.perf_counter() - wall_before
+            cpu = time.process_time() - cpu_before
+            read_after, written_after = read_io_counters()
+            self.stages.append({
+                'stage': name,
+                'status': status,
+                'wall_seconds': round(wall, 4),
+                'cpu_seconds': round(cpu, 4),
+                'bytes_read': None if read_after is None else read_after - read_before,
+                'bytes_written': None if written_after is None else written_after - written_before,
+                'output_bytes_delta': directory_bytes(self.output_dir) - output_before,
+                'peak_memory_bytes': tracemalloc.get_traced_memory()[1] if tracemalloc.is_tracing() else None
+            })
+
+    def report(self):
+        wall_start, cpu_start = self.started or (time.perf_counter(), time.process_time())
+        slowest = max(self.stages, key=lambda stage: stage['wall_seconds'], default=None)
+        return {
+            'format': 'vib34d-build-report',
+            'version': 1,
+            'created': time.strftime('%Y-%m-%d %H:%M:%S UTC', time.gmtime()),
+            'status': 'failed' if self.failure else 'succeeded',
+            'failure': self.failure,
+            'python': sys.version.split()[0],
+            'platform': platform.platform(),
+            'total_wall_seconds': round(time.perf_counter() - wall_start, 4),
+            'total_cpu_seconds': round(time.process_time() - cpu_start, 4),
+            'slowest_stage': slowest['stage'] if slowest else None,
+            'stages': self.stages,
+            'cprofile': str(self.cprofile_path) if self.cprofile_path else None
+        }
+
+    def write_report(self, path):
+        report = self.report()
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with open(path, 'w') as f:
+            json.dump(report, f, indent=2)
+        return report
@@ -0,0 +1,784 @@
+#!/usr/bin/env python3
+"""
+VIB34D ES Module Bundler
+Resolves the import/export graph of an HTML entry page and emits one
+deduplicated, scope-hoisted module bundle for the standalone dashboard
+"""
+
+import os
+import re
+from pathlib import Path
+from urllib.parse import unquote, urlparse
+
+IDENT = r'[A-Za-z_$][\w$]*'
+REGEX_PRECEDERS = set('(,=:[!&|?{};+-*%<>~^')
+REGEX_KEYWORDS = {
+    'return', 'typeof', 'case', 'do', 'else', 'in', 'of', 'new',
+    'delete', 'void', 'throw', 'yield', 'await', 'instanceof'
+}
+
+SCRIPT_TAG_RE = re.compile(r'<script\b([^>]*)>(.*?)</script>', re.IGNORECASE | re.DOTALL)
+LINK_TAG_RE = re.compile(r'<link\b([^>]*)>', re.IGNORECASE)
+ATTR_RE = re.compile(r'([\w-]+)\s*(?:=\s*("[^"]*"|\'[^\']*\'|[^\s>]+))?')
+
+STATIC_IMPORT_RE = re.compile(r'\bimport\s*(?P<clause>[\w$\s{},*]*?)\s*\bfrom\s*(?P<quote>[\'"])')
+SIDE_EFFECT_IMPORT_RE = re.compile(r'\bimport\s*(?P<quote>[\'"])')
+DYNAMIC_IMPORT_RE = re.compile(r'\bimport\s*\(\s*(?P<quote>[\'"`])')
+EXPORT_DEFAULT_RE = re.compile(r'\bexport\s+default\s+')
+EXPORT_LIST_RE = re.compile(r'\bexport\s*\{')
+EXPORT_STAR_RE = re.compile(r'\bexport\s*\*\s*(?:as\s+(?P<name>' + IDENT + r')\s*)?from\s*(?P<quote>[\'"])')
+EXPORT_DECL_RE = re.compile(
+    r'\bexport\s+(?=(?:async\s+)?function\b|class\b|const\b|let\b|var\b)'
+)
+DECL_RE = re.compile(
+    r'\b(?:(?:async\s+)?function\s*\*?\s*|class\s+|(?:const|let|var)\s+)(?P<name>' + IDENT + r')'
+)
+
+
+def mask_source(source):
+    """Blank out comments, string, template and regex contents, keeping offsets"""
+    out = list(source)
+    n = len(source)
+    i = 0
+    last_sig = ''
+    last_word = ''
+
+    def blank(start, end):
+        for k in range(start, min(end, n)):
+            if out[k] != '\n':
+                out[k] = ' '
+
+    while i < n:
+        c = source[i]
+        if c == '/' and source.startswith('//', i):
+            end = source.find('\n', i)
+            end = n if end == -1 else end
+            blank(i, end)
+            i = end
+        elif c == '/' and source.startswith('/*', i):
+            end = source.find('*/', i + 2)
+            end = n if end == -1 else end + 2
+            blank(i, end)
+            i = end
+        elif c in '\'"':
+            end = _skip_string(source, i)
+            blank(i + 1, end - 1)
+            i = end
+            last_sig, last_word = c, ''
+        elif c == '`':
+            end = _skip_template(source, i)
+            blank(i + 1, end - 1)
+            i = end
+            last_sig, last_word = c, ''
+        elif c == '/' and (not last_sig or last_sig in REGEX_PRECEDERS or last_word in REGEX_KEYWORDS):
+            end = _skip_regex(source, i)
+            blank(i + 1, end - 1)
+            i = end
+            last_sig, last_word = '/', ''
+        elif c.isalnum() or c in '_$':
+            j = i
+            while j < n and (source[j].isalnum() or source[j] in '_$'):
+                j += 1
+            last_word = source[i:j]
+            last_sig = source[j - 1]
+            i = j
+        else:
+            if not c.isspace():
+                last_sig, last_word = c, ''
+            i += 1
+
+    return ''.join(out)
+
+
+def _skip_string(source, i):
+    """Return the index just past the string literal starting at i"""
+    quote = source[i]
+    j = i + 1
+    n = len(source)
+    while j < n:
+        c = source[j]
+        if c == '\\':
+            j += 2
+            continue
+        if c == quote or c == '\n':
+            return j + 1
+        j += 1
+    return n
+
+
+def _skip_template(source, i):
+    """Return the index just past the template literal starting at i"""
+    j = i + 1
+    n = len(source)
+    while j < n:
+        c = source[j]
+        if c == '\\':
+            j += 2
+        elif c == '`':
+            return j + 1
+        elif source.startswith('${', j):
+            j = _skip_expression(source, j + 2)
+        else:
+            j += 1
+    return n
+
+
+def _skip_expression(source, i):
+    """Return the index just past the `}` closing a template expression"""
+    depth = 1
+    j = i
+    n = len(source)
+    while j < n:
+        c = source[j]
+        if c in '\'"':
+            j = _skip_string(source, j)
+            continue
+        if c == '`':
+            j = _skip_template(source, j)
+            continue
+        if c == '{':
+            depth += 1
+        elif c == '}':
+            depth -= 1
+            if depth == 0:
+                return j + 1
+        j += 1
+    return n
+
+
+def _skip_regex(source, i):
+    """Return the index just past the regex literal (and flags) starting at i"""
+    j = i + 1
+    n = len(source)
+    in_class = False
+    while j < n:
+        c = source[j]
+        if c == '\\':
+            j += 2
+            continue
+        if c == '\n':
+            return j
+        if c == '[':
+            in_class = True
+        elif c == ']':
+            in_class = False
+        elif c == '/' and not in_class:
+            j += 1
+            while j < n and (source[j].isalnum() or source[j] == '_'):
+                j += 1
+            return j
+        j += 1
+    return n
+
+
+def depth_map(masked):
+    """Bracket nesting depth at every offset of a masked source"""
+    depths = [0] * (len(masked) + 1)
+    depth = 0
+    for index, c in enumerate(masked):
+        depths[index] = depth
+        if c in '{([':
+            depth += 1
+        elif c in '})]':
+            depth -= 1
+    depths[len(masked)] = depth
+    return depths
+
+
+def find_block_end(masked, start):
+    """Index just past the `}` matching the first `{` at or after start"""
+    open_index = masked.find('{', start)
+    if open_index == -1:
+        return -1
+    depth = 0
+    for index in range(open_index, len(masked)):
+        c = masked[index]
+        if c == '{':
+            depth += 1
+        elif c == '}':
+            depth -= 1
+            if depth == 0:
+                return index + 1
+    return -1
+
+
+def _statement_end(masked, index):
+    """Extend index over trailing blanks and an optional semicolon"""
+    n = len(masked)
+    j = index
+    while j < n and masked[j] in ' \t':
+        j += 1
+    if j < n and masked[j] == ';':
+        return j + 1
+    return index
+
+
+def _parse_specifiers(text):
+    """Parse `a, b as c` into [(imported_or_local, alias)] pairs"""
+    pairs = []
+    for part in text.split(','):
+        part = part.strip()
+        if not part:
+            continue
+        bits = part.split()
+        if len(bits) == 3 and bits[1] == 'as':
+            pairs.append((bits[0], bits[2]))
+        else:
+            pairs.append((bits[0], bits[0]))
+    return pairs
+
+
+class ModuleRecord:
+    """Parsed import/export information for one ES module"""
+
+    def __init__(self, module_id, source, base_dir, inline=False):
+        self.module_id = module_id
+        self.source = source
+        self.base_dir = base_dir
+        self.inline = inline
+        self.imports = []          # {'start', 'end', 'specifier', 'bindings'}
+        self.dynamic_imports = []  # {'start', 'end', 'specifier'}
+        self.exports = {}          # exported name -> local identifier
+        self.reexports = {}        # exported name -> (specifier, imported name)
+        self.star_reexports = []   # specifiers
+        self.edits = []            # (start, end, replacement)
+        self.declared = set()
+        self.external_imports = []
+        self.dependencies = []     # resolved module ids, in source order
+        self.wrapped = False
+        self.needs_namespace = False
+        self.index = 0
+
+    @property
+    def namespace_var(self):
+        if self.wrapped:
+            return f'__vib34d_mod_{self.index}'
+        return f'__vib34d_ns_{self.index}'
+
+
+class ESModuleBundler:
+    """Builds a scope-hoisted bundle from the module graph of an HTML page"""
+
+    def __init__(self, roots):
+        self.roots = [Path(root) for root in roots]
+        self.modules = {}
+        self.order = []
+        self.warnings = []
+        self.dropped_exports = []
+        self._visiting = set()
+        self._default_counter = 0
+
+    # ------------------------------------------------------------------
+    # Resolution
+    # ------------------------------------------------------------------
+
+    def resolve(self, base_dir, specifier):
+        """Resolve a relative specifier to a root-relative module id"""
+        if specifier.startswith('/'):
+            candidate = specifier.lstrip('/')
+        elif specifier.startswith('./') or specifier.startswith('../'):
+            candidate = os.path.normpath(os.path.join(base_dir, specifier)).replace(os.sep, '/')
+        else:
+            return None
+        candidate = candidate.split('?')[0].split('#')[0]
+        for root in self.roots:
+            if (root / candidate).is_file():
+                return candidate
+        return candidate if not candidate.startswith('..') else None
+
+    def resolve_url(self, base_dir, url):
+        """Resolve an HTML src/href to a root-relative id; None for other origins and schemes
+
+        Unlike import specifiers there are no bare names here: any URL
+        without a scheme or host is a file relative to the page.
+        """
+        parsed = urlparse(url)
+        if parsed.scheme or parsed.netloc or not parsed.path:
+            return None
+        path = unquote(parsed.path)
+        return self.resolve(base_dir, path if path.startswith('/') else './' + path)
+
+    def read(self, module_id):
+        for root in self.roots:
+            path = root / module_id
+            if path.is_file():
+                with open(path, 'r', encoding='utf-8') as f:
+                    return f.read()
+        return None
+
+    # ------------------------------------------------------------------
+    # Parsing
+    # ------------------------------------------------------------------
+
+    def parse(self, module_id, source, base_dir, inline=False):
+        """Collect imports, exports and top-level declarations of a module"""
+        record = ModuleRecord(module_id, source, base_dir, inline)
+        masked = mask_source(source)
+        depths = depth_map(masked)
+
+        def literal(quote_index):
+            end = source.find(source[quote_index], quote_index + 1)
+            return source[quote_index + 1:end], end + 1
+
+        for match in STATIC_IMPORT_RE.finditer(masked):
+            if depths[match.start()] != 0:
+                continue
+            specifier, end = literal(match.start('quote'))
+            record.imports.append({
+                'start': match.start(),
+                'end': _statement_end(masked, end),
+                'specifier': specifier,
+                'bindings': self._parse_import_clause(match.group('clause'))
+            })
+
+        for match in SIDE_EFFECT_IMPORT_RE.finditer(masked):
+            if depths[match.start()] != 0:
+                continue
+            specifier, end = literal(match.start('quote'))
+            record.imports.append({
+                'start': match.start(),
+                'end': _statement_end(masked, end),
+                'specifier': specifier,
+                'bindings': []
+            })
+
+        for match in DYNAMIC_IMPORT_RE.finditer(masked):
+            quote_index = match.start('quote')
+            if source[quote_index] == '`':
+                self.warnings.append(f'{module_id}: template dynamic import left untouched')
+                continue
+            specifier, end = literal(quote_index)
+            close = re.match(r'\s*\)', masked[end:])
+            if not close:
+                self.warnings.append(f'{module_id}: non-literal dynamic import left untouched')
+                continue
+            record.dynamic_imports.append({
+                'start': match.start(),
+                'end': end + close.end(),
+                'specifier': specifier
+            })
+
+        self._parse_exports(record, source, masked, depths)
+
+        for match in DECL_RE.finditer(masked):
+            if depths[match.start()] == 0:
+                record.declared.add(match.group('name'))
+
+        record.imports.sort(key=lambda item: item['start'])
+        return record
+
+    def _parse_import_clause(self, clause):
+        bindings = []
+        clause = clause.strip()
+        named = re.search(r'\{([^}]*)\}', clause)
+        if named:
+            bindings.extend(('named', imported, local) for imported, local in _parse_specifiers(named.group(1)))
+            clause = clause[:named.start()] + clause[named.end():]
+        namespace = re.search(r'\*\s*as\s+(' + IDENT + r')', clause)
+        if namespace:
+            bindings.append(('namespace', '*', namespace.group(1)))
+            clause = clause[:namespace.start()] + clause[namespace.end():]
+        default = clause.strip().strip(',').strip()
+        if default:
+            bindings.append(('named', 'default', default))
+        return bindings
+
+    def _parse_exports(self, record, source, masked, depths):
+        for match in EXPORT_DEFAULT_RE.finditer(masked):
+            if depths[match.start()] != 0:
+                continue
+            rest = masked[match.end():]
+            declaration = re.match(r'(?:async\s+)?(?:function\s*\*?\s*|class\s+)(' + IDENT + r')?', rest)
+            if declaration and declaration.group(1) and declaration.group(1) != 'extends':
+                record.exports['default'] = declaration.group(1)
+                record.edits.append((match.start(), match.end(), ''))
+                continue
+            identifier = re.match(r'(' + IDENT + r')\s*(?:;|\n|$)', rest)
+            if identifier and not declaration:
+                record.exports['default'] = identifier.group(1)
+                end = _statement_end(masked, match.end() + identifier.end(1))
+                record.edits.append((match.start(), end, ''))
+                continue
+            self._default_counter += 1
+            local = f'__vib34d_default_{self._default_counter}'
+            record.exports['default'] = local
+            record.declared.add(local)
+            record.edits.append((match.start(), match.end(), f'const {local} = '))
+
+        for match in EXPORT_LIST_RE.finditer(masked):
+            if depths[match.start()] != 0:
+                continue
+            close = masked.find('}', match.end())
+            pairs = _parse_specifiers(source[match.end():close])
+            tail = re.match(r'\s*from\s*([\'"])', masked[close + 1:])
+            if tail:
+                quote_index = close + 1 + tail.start(1)
+                end = source.find(source[quote_index], quote_index + 1)
+                specifier = source[quote_index + 1:end]
+                for imported, exported in pairs:
+                    record.reexports[exported] = (specifier, imported)
+                record.imports.append({
+                    'start': match.start(),
+                    'end': _statement_end(masked, end + 1),
+                    'specifier': specifier,
+                    'bindings': []
+                })
+            else:
+                for local, exported in pairs:
+                    record.exports[exported] = local
+                record.edits.append((match.start(), _statement_end(masked, close + 1), ''))
+
+        for match in EXPORT_STAR_RE.finditer(masked):
+            if depths[match.start()] != 0:
+                continue
+            quote_index = match.start('quote')
+            end = source.find(source[quote_index], quote_index + 1)
+            specifier = source[quote_index + 1:end]
+            if match.group('name'):
+                record.reexports[match.group('name')] = (specifier, '*')
+            else:
+                record.star_reexports.append(specifier)
+            record.imports.append({
+                'start': match.start(),
+                'end': _statement_end(masked, end + 1),
+                'specifier': specifier,
+                'bindings': []
+            })
+
+        for match in EXPORT_DECL_RE.finditer(masked):
+            if depths[match.start()] != 0:
+                continue
+            declaration = DECL_RE.match(masked, match.end())
+            if declaration:
+                record.exports[declaration.group('name')] = declaration.group('name')
+            record.edits.append((match.start(), match.end(), ''))
+
+    # ------------------------------------------------------------------
+    # Graph
+    # ------------------------------------------------------------------
+
+    def load(self, module_id, source=None, base_dir=None, inline=False):
+        """Parse a module and its dependencies, appending them in execution order"""
+        if module_id in self.modules:
+            return self.modules[module_id]
+        if module_id in self._visiting:
+            self.warnings.append(f'Import cycle through {module_id}')
+            return None
+        if source is None:
+            source = self.read(module_id)
+            if source is None:
+                self.warnings.append(f'Missing module: {module_id}')
+                return None
+        if base_dir is None:
+            base_dir = os.path.dirname(module_id)
+
+        self._visiting.add(module_id)
+        record = self.parse(module_id, source, base_dir, inline)
+
+        specifiers = [item['specifier'] for item in record.imports]
+        specifiers += [item['specifier'] for item in record.dynamic_imports]
+        for specifier in specifiers:
+            dependency = self.resolve(base_dir, specifier)
+            if dependency is None:
+                continue
+            if self.load(dependency) is not None and dependency not in record.dependencies:
+                record.dependencies.append(dependency)
+
+        self._visiting.discard(module_id)
+        self.modules[module_id] = record
+        record.index = len(self.order)
+        self.order.append(module_id)
+        return record
+
+    def resolve_export(self, module_id, name, seen=None):
+        """Follow re-exports to the (module id, exported name) that owns a binding"""
+        seen = seen or set()
+        if (module_id, name) in seen or module_id not in self.modules:
+            return None
+        seen.add((module_id, name))
+        record = self.modules[module_id]
+        if name in record.exports:
+            return module_id, name
+        if name in record.reexports:
+            specifier, imported = record.reexports[name]
+            target = self.resolve(record.base_dir, specifier)
+            if imported == '*':
+                return (target, '*') if target in self.modules else None
+            return self.resolve_export(target, imported, seen)
+        if name != 'default':
+            for specifier in record.star_reexports:
+                found = self.resolve_export(self.resolve(record.base_dir, specifier), name, seen)
+                if found:
+                    return found
+        return None
+
+    def export_names(self, module_id, seen=None):
+        """All names a module exports, including re-exports"""
+        seen = seen or set()
+        if module_id in seen or module_id not in self.modules:
+            return []
+        seen.add(module_id)
+        record = self.modules[module_id]
+        names = list(record.exports) + list(record.reexports)
+        for specifier in record.star_reexports:
+            for name in self.export_names(self.resolve(record.base_dir, specifier), seen):
+                if name != 'default' and name not in names:
+                    names.append(name)
+        return names
+
+    def binding_expression(self, module_id, name):
+        """JavaScript expression that evaluates to an exported binding"""
+        owner = self.resolve_export(module_id, name)
+        if owner is None:
+            self.warnings.append(f'{module_id} does not export "{name}"')
+            return 'undefined'
+        owner_id, owner_name = owner
+        if owner_name == '*':
+            return self.namespace_expression(owner_id)
+        record = self.modules[owner_id]
+        if record.wrapped:
+            return f'{record.namespace_var}.{owner_name}'
+        return record.exports[owner_name]
+
+    def namespace_expression(self, module_id):
+        """Name of the frozen namespace object emitted after a module"""
+        record = self.modules[module_id]
+        record.needs_namespace = True
+        return record.namespace_var
+
+    def _namespace_declaration(self, record):
+        members = ', '.join(
+            f'{name}: {self.binding_expression(record.module_id, name)}'
+            for name in self.export_names(record.module_id)
+        )
+        return f'const {record.namespace_var} = Object.freeze({{ {members} }});'
+
+    def _mark_used(self, used, module_id, name):
+        if name == '*':
+            for exported in self.export_names(module_id):
+                self._mark_used(used, module_id, exported)
+            return
+        owner = self.resolve_export(module_id, name)
+        if owner is None:
+            return
+        if owner[1] == '*':
+            self._mark_used(used, owner[0], '*')
+        else:
+            used.add(owner)
+
+    # ------------------------------------------------------------------
+    # Emission
+    # ------------------------------------------------------------------
+
+    def _plan_scopes(self):
+        """Hoist every module into the shared scope unless its names collide"""
+        taken = set()
+        for module_id in self.order:
+            record = self.modules[module_id]
+            names = set(record.declared)
+            for item in record.imports:
+                target = self.resolve(record.base_dir, item['specifier'])
+                for kind, imported, local in item['bindings']:
+                    if target in self.modules and kind == 'named':
+                        owner = self.resolve_export(target, imported)
+                        if owner and owner[1] != '*' and not self.modules[owner[0]].wrapped \
+                                and self.modules[owner[0]].exports[owner[1]] == local:
+                            continue
+                    names.add(local)
+            if names & taken:
+                record.wrapped = True
+            else:
+                taken |= names
+
+    def _emit_module(self, record):
+        edits = list(record.edits)
+        for item in record.imports:
+            target = self.resolve(record.base_dir, item['specifier'])
+            statement = record.source[item['start']:item['end']]
+            if target is None:
+                record.external_imports.append(statement.strip())
+                edits.append((item['start'], item['end'], ''))
+                continue
+            aliases = []
+            if target in self.modules:
+                for kind, imported, local in item['bindings']:
+                    expression = (self.namespace_expression(target) if kind == 'namespace'
+                                  else self.binding_expression(target, imported))
+                    if expression != local:
+                        aliases.append(f'const {local} = {expression};')
+            else:
+                aliases.extend(f'const {local} = undefined;' for _, _, local in item['bindings'])
+            edits.append((item['start'], item['end'], ' '.join(aliases)))
+
+        for item in record.dynamic_imports:
+            target = self.resolve(record.base_dir, item['specifier'])
+            if target in self.modules:
+                replacement = f'Promise.resolve({self.namespace_expression(target)})'
+                edits.append((item['start'], item['end'], replacement))
+
+        text = record.source
+        for start, end, replacement in sorted(edits, key=lambda edit: edit[0], reverse=True):
+            text = text[:start] + replacement + text[end:]
+        return text
+
+    def _wrap(self, record, text, used):
+        members = ', '.join(
+            f'{name}: {local}' for name, local in record.exports.items()
+            if (record.module_id, name) in used
+        )
+        return (
+            f'const {record.namespace_var} = (() => {{\n'
+            f'{text}\n'
+            f'return {{ {members} }};\n'
+            f'}})();'
+        )
+
+    def _drop_unused_declarations(self, bodies, used):
+        """Remove exported class/function declarations nothing references"""
+        changed = True
+        while changed:
+            changed = False
+            masked = {module_id: mask_source(text) for module_id, text in bodies.items()}
+            combined = '\n'.join(masked.values())
+            for module_id, text in bodies.items():
+                record = self.modules[module_id]
+                if record.inline:
+                    continue
+                for name, local in record.exports.items():
+                    if (module_id, name) in used:
+                        continue
+                    if len(re.findall(r'(?<![\w$.])' + re.escape(local) + r'(?![\w$])', combined)) != 1:
+                        continue
+                    declaration = re.search(
+                        r'(?m)^[ \t]*(?:async\s+)?(?:function\s*\*?\s*|class\s+)' + re.escape(local) + r'\b',
+                        masked[module_id]
+                    )
+                    if not declaration:
+                        continue
+                    end = find_block_end(masked[module_id], declaration.end())
+                    if end == -1:
+                        continue
+                    bodies[module_id] = text[:declaration.start()] + text[end:]
+                    self.dropped_exports.append(f'{module_id}:{name}')
+                    changed = True
+                    break
+                if changed:
+                    break
+
+    def build(self):
+        """Emit the bundle source for every loaded module in execution order"""
+        self._plan_scopes()
+
+        used = set()
+        for record in self.modules.values():
+            for item in record.imports:
+                target = self.resolve(record.base_dir, item['specifier'])
+                if target not in self.modules:
+                    continue
+                for kind, imported, _ in item['bindings']:
+                    self._mark_used(used, target, '*' if kind == 'namespace' else imported)
+            for item in record.dynamic_imports:
+                target = self.resolve(record.base_dir, item['specifier'])
+                if target in self.modules:
+                    self._mark_used(used, target, '*')
+
+        bodies = {module_id: self._emit_module(self.modules[module_id]) for module_id in self.order}
+        self._drop_unused_declarations(bodies, used)
+
+        externals = []
+        chunks = []
+        for module_id in self.order:
+            record = self.modules[module_id]
+            for statement in record.external_imports:
+                if statement not in externals:
+                    externals.append(statement)
+            body = self._wrap(record, bodies[module_id], used) if record.wrapped else bodies[module_id]
+            if record.needs_namespace and not record.wrapped:
+                body += '\n' + self._namespace_declaration(record)
+            chunks.append(f'// ---- {module_id} ----\n{body}\n')
+
+        return '\n'.join(externals + chunks)
+
+    # ------------------------------------------------------------------
+    # HTML entry
+    # ------------------------------------------------------------------
+
+    def bundle_html(self, html, entry_id):
+        """Inline classic scripts and replace module scripts with one bundle"""
+        base_dir = os.path.dirname(entry_id)
+        tags = []
+        inline_count = 0
+
+        for match in SCRIPT_TAG_RE.finditer(html):
+            attrs = {key.lower(): (value or '').strip('\'"') for key, value in ATTR_RE.findall(match.group(1))}
+            src = attrs.get('src')
+            is_module = attrs.get('type', '').lower() == 'module'
+            tags.append((match, src, is_module))
+            if not is_module:
+                continue
+            if src:
+                module_id = self.resolve_url(base_dir, src)
+                if module_id is None:
+                    self.warnings.append(f'External module script left in place: {src}')
+                else:
+                    self.load(module_id)
+            else:
+                inline_count += 1
+                self.load(f'{entry_id}#inline-{inline_count}', match.group(2), base_dir, inline=True)
+
+        bundle = self.build().replace('</script', '<\\/script')
+        bundle_placed = False
+        pieces = []
+        cursor = 0
+
+        for match, src, is_module in tags:
+            pieces.append(self.inline_stylesheets(html[cursor:match.start()], base_dir))
+            cursor = match.end()
+            if is_module:
+                if src and self.resolve_url(base_dir, src) is None:
+                    pieces.append(match.group(0))
+                elif not bundle_placed:
+                    pieces.append(f'<script type="module">\n{bundle}\n</script>')
+                    bundle_placed = True
+                continue
+            if src:
+                script_id = self.resolve_url(base_dir, src)
+                content = self.read(script_id) if script_id else None
+                if content is None:
+                    if script_id:
+                        self.warnings.append(f'Missing classic script: {src}')
+                    pieces.append(match.group(0))
+                else:
+                    content = content.replace('</script', '<\\/script')
+                    pieces.append(f'<script>\n// {script_id}\n{content}\n</script>')
+                continue
+            pieces.append(match.group(0))
+
+        pieces.append(self.inline_stylesheets(html[cursor:], base_dir))
+        return ''.join(pieces)
+
+    def inline_stylesheets(self, html, base_dir):
+        """Replace local <link rel="stylesheet"> tags in markup outside scripts with <style> blocks"""
+        def replace(match):
+            attrs = {key.lower(): (value or '').strip('\'"') for key, value in ATTR_RE.findall(match.group(1))}
+            href = attrs.get('href')
+            if 'stylesheet' not in attrs.get('rel', '').lower().split() or not href:
+                return match.group(0)
+            style_id = self.resolve_url(base_dir, href)
+            content = self.read(style_id) if style_id else None
+            if content is None:
+                if style_id:
+                    self.warnings.append(f'Missing stylesheet: {href}')
+                return match.group(0)
+            content = content.replace('</style', '<\\/style')
+            return f'<style>\n/* {style_id} */\n{content}\n</style>'
+
+        return LINK_TAG_RE.sub(replace, html)
+
+    def report(self):
+        return {
+            'modules': [self.modules[module_id].module_id for module_id in self.order],
+            'wrapped_modules': [module_id for module_id in self.order if self.modules[module_id].wrapped],
+            'dropped_exports': list(self.dropped_exports),
+            'warnings': list(self.warnings)
+        }
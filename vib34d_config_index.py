@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+VIB34D Config Path Index
+Flattens each config/preset document into a dotted-path index so a client
+can fetch one subtree (e.g. visuals/themes.hypercube.parameters) with its
+own ETag instead of downloading every document
+"""
+
+import hashlib
+import json
+import os
+import threading
+
+from vib34d_schema import DOCUMENT_SCHEMAS
+
+
+class ConfigQueryError(Exception):
+    """Raised for unknown documents, unknown paths and invalid documents"""
+
+    def __init__(self, status, message, details=None):
+        super().__init__(message)
+        self.status = status
+        self.details = details or {}
+
+
+def document_id(document):
+    """config/visuals.json -> visuals"""
+    return os.path.splitext(os.path.basename(document))[0]
+
+
+def flatten_paths(value, prefix=''):
+    """Map every node's dotted path ('' for the root) to the node itself"""
+    index = {prefix: value}
+    if isinstance(value, dict):
+        items = value.items()
+    elif isinstance(value, list):
+        items = enumerate(value)
+    else:
+        return index
+    for key, child in items:
+        index.update(flatten_paths(child, f'{prefix}.{key}' if prefix else str(key)))
+    return index
+
+
+def encode_node(value):
+    """Compact JSON bytes plus a strong ETag derived from them"""
+    body = json.dumps(value, separators=(',', ':')).encode('utf-8')
+    return body, '"' + hashlib.sha1(body).hexdigest()[:20] + '"'
+
+
+class IndexedDocument:
+    """One parsed document, its path index and lazily encoded nodes"""
+
+    def __init__(self, value, signature):
+        self.signature = signature
+        self.paths = flatten_paths(value)
+        self.encoded = {}
+
+    def node(self, path):
+        if path not in self.paths:
+            return None
+        if path not in self.encoded:
+            self.encoded[path] = encode_node(self.paths[path])
+        return self.encoded[path]
+
+    def children(self, path):
+        node = self.paths.get(path)
+        if isinstance(node, dict):
+            return list(node)
+        if isinstance(node, list):
+            return [str(index) for index in range(len(node))]
+        return []
+
+
+class ConfigPathIndex:
+    """Per-document path indexes, rebuilt when the file's mtime or size changes"""
+
+    def __init__(self, validator, root='.'):
+        self.validator = validator
+        self.root = root
+        self.documents = {document_id(document): document for document in DOCUMENT_SCHEMAS}
+        self.indexes = {}
+        self.lock = threading.Lock()
+
+    def _load(self, doc_id):
+        document = self.documents.get(doc_id)
+        if document is None:
+            raise ConfigQueryError(404, f'Unknown config document: {doc_id}',
+                                   {'documents': sorted(self.documents)})
+        path = os.path.join(self.root, document)
+        try:
+            stat = os.stat(path)
+        except OSError:
+            raise ConfigQueryError(404, f'Config document not found: {document}')
+        signature = (stat.st_mtime_ns, stat.st_size)
+
+        with self.lock:
+            indexed = self.indexes.get(doc_id)
+            if indexed is not None and indexed.signature == signature:
+                return indexed
+
+        value, result = self.validator.validate_file(document)
+        if not result['valid']:
+            raise ConfigQueryError(422, f'{document} failed validation', {'errors': result['errors']})
+
+        indexed = IndexedDocument(value, signature)
+        with self.lock:
+            self.indexes[doc_id] = indexed
+        return indexed
+
+    def install(self, doc_id, value, signature):
+        """Replace a document's index with a value the caller just wrote to disk"""
+        with self.lock:
+            self.indexes[doc_id] = IndexedDocument(value, signature)
+
+    def query(self, doc_id, path=''):
+        """(body bytes, etag) for one node of one document"""
+        indexed = self._load(doc_id)
+        path = path.strip('.')
+        encoded = indexed.node(path)
+        if encoded is not None:
+            return encoded
+
+        # Point the caller at the deepest prefix that does exist
+        parent = path
+        while parent and parent not in indexed.paths:
+            parent = parent.rpartition('.')[0]
+        raise ConfigQueryError(404, f'No node at {doc_id}/{path}', {
+            'deepest_match': parent,
+            'children': indexed.children(parent)[:50]
+        })
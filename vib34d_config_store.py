@@ -0,0 +1,540 @@
+#!/usr/bin/env python3
+"""
+VIB34D Config Store
+Write side of the config API for the editor dashboard. Each accepted
+patch (RFC 6902 JSON Patch or RFC 7396 merge patch) is validated against
+the document's schema, appended to a journal and held in memory; bursts
+of slider updates to one document coalesce into a single debounced write
+
+Writes go to a temp file that is fsynced and renamed over the original,
+and then the validator and path index are updated directly with the new
+bytes. On startup, recover() replays journaled patches that never
+reached disk.
+"""
+
+import copy
+import json
+import os
+import tempfile
+import threading
+import time
+
+from vib34d_config_index import ConfigQueryError, document_id, encode_node
+from vib34d_schema import DOCUMENT_SCHEMAS, validate_value
+
+DEFAULT_DEBOUNCE = 0.25
+# A continuous drag still reaches disk at least this often
+MAX_WRITE_DELAY = 2.0
+MAX_PATCH_BYTES = 1024 * 1024
+# Accepted request bodies and the patch kind each implies; plain JSON is
+# a JSON Patch when it is an array, else a merge patch
+PATCH_CONTENT_TYPES = {
+    'application/json': None,
+    'application/json-patch+json': 'json-patch',
+    'application/merge-patch+json': 'merge-patch'
+}
+# A failed write (disk full, read-only mount) is retried this often
+WRITE_RETRY_DELAY = 5.0
+JOURNAL_PATH = os.path.join('.vib34d-cache', 'config-journal.jsonl')
+
+# Read once at import, while nothing else can race on the process umask
+_UMASK = os.umask(0)
+os.umask(_UMASK)
+
+
+# ----------------------------------------------------------------------
+# JSON Patch (RFC 6902) and merge patch (RFC 7396)
+# ----------------------------------------------------------------------
+
+def parse_pointer(pointer):
+    """RFC 6901 pointer -> list of reference tokens"""
+    if pointer == '':
+        return []
+    if not isinstance(pointer, str) or not pointer.startswith('/'):
+        raise ConfigQueryError(400, f'Invalid JSON pointer: {pointer!r}')
+    return [token.replace('~1', '/').replace('~0', '~') for token in pointer[1:].split('/')]
+
+
+def pointer_from_dotted(path):
+    """themes.hypercube.parameters -> /themes/hypercube/parameters"""
+    tokens = [token for token in path.strip('.').split('.') if token]
+    return ''.join('/' + token.replace('~', '~0').replace('/', '~1') for token in tokens)
+
+
+def _child(container, token, pointer):
+    if isinstance(container, dict) and token in container:
+        return container[token]
+    if isinstance(container, list) and token.isdigit() and int(token) < len(container):
+        return container[int(token)]
+    raise ConfigQueryError(409, f'No node at {pointer}')
+
+
+def _resolve(document, tokens, pointer):
+    node = document
+    for token in tokens:
+        node = _child(node, token, pointer)
+    return node
+
+
+def _add(document, pointer, value):
+    tokens = parse_pointer(pointer)
+    if not tokens:
+        return value
+    parent = _resolve(document, tokens[:-1], pointer)
+    key = tokens[-1]
+    if isinstance(parent, dict):
+        parent[key] = value
+    elif isinstance(parent, list):
+        if key == '-':
+            parent.append(value)
+        elif key.isdigit() and int(key) <= len(parent):
+            parent.insert(int(key), value)
+        else:
+            raise ConfigQueryError(409, f'Array index out of range at {pointer}')
+    else:
+        raise ConfigQueryError(409, f'Cannot add below a scalar at {pointer}')
+    return document
+
+
+def _remove(document, pointer):
+    tokens = parse_pointer(pointer)
+    if not tokens:
+        raise ConfigQueryError(400, 'Cannot remove the document root')
+    parent = _resolve(document, tokens[:-1], pointer)
+    value = _child(parent, tokens[-1], pointer)
+    if isinstance(parent, dict):
+        del parent[tokens[-1]]
+    else:
+        del parent[int(tokens[-1])]
+    return document, value
+
+
+def apply_json_patch(document, operations, prefix=''):
+    """New document with RFC 6902 operations applied in order (pointers are relative to prefix)"""
+    if not isinstance(operations, list):
+        raise ConfigQueryError(400, 'JSON Patch must be an array of operations')
+    document = copy.deepcopy(document)
+    for operation in operations:
+        if not isinstance(operation, dict) or 'op' not in operation or 'path' not in operation:
+            raise ConfigQueryError(400, 'Each JSON Patch operation needs "op" and "path"')
+        op = operation['op']
+        path = prefix + operation['path']
+        if op in ('add', 'replace', 'test') and 'value' not in operation:
+            raise ConfigQueryError(400, f'"{op}" at {path} needs a "value"')
+        if op == 'add':
+            document = _add(document, path, copy.deepcopy(operation['value']))
+        elif op == 'remove':
+            document, _ = _remove(document, path)
+        elif op == 'replace':
+            tokens = parse_pointer(path)
+            if not tokens:
+                document = copy.deepcopy(operation['value'])
+                continue
+            parent = _resolve(document, tokens[:-1], path)
+            _child(parent, tokens[-1], path)
+            # Assign in place so object keys keep their order
+            parent[int(tokens[-1]) if isinstance(parent, list) else tokens[-1]] = copy.deepcopy(operation['value'])
+        elif op in ('move', 'copy'):
+            source = prefix + operation.get('from', '')
+            if op == 'move':
+                if path.startswith(source + '/'):
+                    raise ConfigQueryError(400, f'Cannot move {source} into its own child {path}')
+                document, value = _remove(document, source)
+            else:
+                value = copy.deepcopy(_resolve(document, parse_pointer(source), source))
+            document = _add(document, path, value)
+        elif op == 'test':
+            if _resolve(document, parse_pointer(path), path) != operation['value']:
+                raise ConfigQueryError(409, f'Test failed at {path}')
+        else:
+            raise ConfigQueryError(400, f'Unknown JSON Patch op: {op}')
+    return document
+
+
+def apply_merge_patch(target, patch):
+    """RFC 7396: objects merge recursively, null deletes, anything else replaces"""
+    if not isinstance(patch, dict):
+        return copy.deepcopy(patch)
+    result = dict(target) if isinstance(target, dict) else {}
+    for key, value in patch.items():
+        if value is None:
+            result.pop(key, None)
+        else:
+            result[key] = apply_merge_patch(result.get(key), value)
+    return result
+
+
+def apply_patch(document, kind, patch, pointer=''):
+    if kind == 'json-patch':
+        return apply_json_patch(document, patch, pointer)
+    if not pointer:
+        return apply_merge_patch(document, patch)
+    tokens = parse_pointer(pointer)
+    document = copy.deepcopy(document)
+    parent = _resolve(document, tokens[:-1], pointer)
+    merged = apply_merge_patch(_child(parent, tokens[-1], pointer), patch)
+    parent[int(tokens[-1]) if isinstance(parent, list) else tokens[-1]] = merged
+    return document
+
+
+def _encode(value, depth):
+    if isinstance(value, dict) and value:
+        inner = '  ' * (depth + 1)
+        items = [f'{inner}{json.dumps(key, ensure_ascii=False)}: {_encode(child, depth + 1)}'
+                 for key, child in value.items()]
+        return '{\n' + ',\n'.join(items) + '\n' + '  ' * depth + '}'
+    if isinstance(value, list) and any(isinstance(child, (dict, list)) for child in value):
+        inner = '  ' * (depth + 1)
+        return '[\n' + ',\n'.join(inner + _encode(child, depth + 1) for child in value) + '\n' + '  ' * depth + ']'
+    # Scalars, empty containers and scalar-only arrays stay on one line
+    return json.dumps(value, ensure_ascii=False, separators=(', ', ': '))
+
+
+def serialize_document(value, trailing_newline=False):
+    """Two-space indent with scalar arrays inline, like the checked-in files"""
+    return (_encode(value, 0) + ('\n' if trailing_newline else '')).encode('utf-8')
+
+
+_DECODER = json.JSONDecoder()
+_WHITESPACE = ' \t\r\n'
+
+
+def _skip(text, pos):
+    while pos < len(text) and text[pos] in _WHITESPACE:
+        pos += 1
+    return pos
+
+
+def parse_spans(text, pos=0):
+    """(node, end): node is (start, end, children); object children are (key, key start, node) tuples"""
+    pos = _skip(text, pos)
+    start = pos
+    if text[pos] == '{':
+        children = []
+        pos = _skip(text, pos + 1)
+        while text[pos] != '}':
+            key_start = pos
+            key, pos = _DECODER.raw_decode(text, pos)
+            pos = _skip(text, _skip(text, pos) + 1)
+            child, pos = parse_spans(text, pos)
+            children.append((key, key_start, child))
+            pos = _skip(text, pos)
+            if text[pos] == ',':
+                pos = _skip(text, pos + 1)
+        return (start, pos + 1, children), pos + 1
+    if text[pos] == '[':
+        children = []
+        pos = _skip(text, pos + 1)
+        while text[pos] != ']':
+            child, pos = parse_spans(text, pos)
+            children.append(child)
+            pos = _skip(text, pos)
+            if text[pos] == ',':
+                pos = _skip(text, pos + 1)
+        return (start, pos + 1, children), pos + 1
+    _, end = _DECODER.raw_decode(text, pos)
+    return (start, end, None), end
+
+
+def _same(a, b):
+    # json.dumps keeps 1 vs 1.0 vs true and key order distinct
+    return json.dumps(a) == json.dumps(b)
+
+
+def _indent_at(text, pos):
+    line_start = text.rfind('\n', 0, pos) + 1
+    line = text[line_start:pos]
+    return len(line) - len(line.lstrip(' '))
+
+
+def _object_edits(text, members, old, new, edits):
+    """Member-level edits when kept keys stay in order and new keys are appended; False otherwise"""
+    kept = [key for key in old if key in new]
+    added = [key for key in new if key not in old]
+    if not kept or list(new)[:len(kept)] != kept or len(kept) + len(added) != len(new):
+        return False
+    last_kept = max(index for index, (key, _, _) in enumerate(members) if key in new)
+    for index, (key, key_start, node) in enumerate(members):
+        if key in new:
+            _edits(text, node, old[key], new[key], edits)
+        elif index < last_kept:
+            # Up to the next member's key, taking the comma and line break with it
+            edits.append((key_start, members[index + 1][1], ''))
+    anchor = members[last_kept][2][1]
+    if last_kept < len(members) - 1:
+        edits.append((anchor, members[-1][2][1], ''))
+    indent = _indent_at(text, members[last_kept][1])
+    for key in added:
+        edits.append((anchor, anchor, f',\n{" " * indent}{json.dumps(key, ensure_ascii=False)}: '
+                                      f'{_encode(new[key], indent // 2)}'))
+    return True
+
+
+def _edits(text, node, old, new, edits):
+    start, end, children = node
+    if _same(old, new):
+        return
+    if isinstance(children, list) and isinstance(old, dict) and isinstance(new, dict):
+        if _object_edits(text, children, old, new, edits):
+            return
+    elif isinstance(children, list) and isinstance(old, list) and isinstance(new, list) and len(old) == len(new):
+        for child, old_item, new_item in zip(children, old, new):
+            _edits(text, child, old_item, new_item, edits)
+        return
+    edits.append((start, end, _encode(new, _indent_at(text, start) // 2)))
+
+
+def render_document(text, old, new):
+    """Splice only the changed subtrees of new into the original text, keeping its formatting"""
+    try:
+        node, _ = parse_spans(text)
+    except (ValueError, IndexError):
+        return serialize_document(new, text.endswith('\n'))
+    edits = []
+    _edits(text, node, old, new, edits)
+    # Later spans first; at a shared start, deletions before insertions
+    for start, end, replacement in sorted(edits, key=lambda edit: (edit[0], edit[1]), reverse=True):
+        text = text[:start] + replacement + text[end:]
+    data = text.encode('utf-8')
+    return data if _same(json.loads(data), new) else serialize_document(new, text.endswith('\n'))
+
+
+def atomic_write(path, data):
+    """Write through a fsynced temp file in the same directory, then rename over path, keeping its mode"""
+    directory = os.path.dirname(path) or '.'
+    try:
+        mode = os.stat(path).st_mode & 0o7777
+    except FileNotFoundError:
+        mode = 0o644 & ~_UMASK
+    handle, temp_path = tempfile.mkstemp(dir=directory, prefix=f'.{os.path.basename(path)}.')
+    try:
+        with os.fdopen(handle, 'wb') as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        # mkstemp creates 0600, and os.replace keeps the temp file's mode
+        os.chmod(temp_path, mode)
+        os.replace(temp_path, path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.unlink(temp_path)
+        raise
+
+
+# ----------------------------------------------------------------------
+# Store
+# ----------------------------------------------------------------------
+
+class ConfigWriteStore:
+    """Debounced, journaled writes for the schema-backed config/preset documents"""
+
+    def __init__(self, validator, index, root='.', debounce=DEFAULT_DEBOUNCE, journal_path=JOURNAL_PATH):
+        self.validator = validator
+        self.index = index
+        self.root = root
+        self.debounce = debounce
+        self.journal_path = os.path.join(root, journal_path)
+        self.documents = {document_id(document): document for document in DOCUMENT_SCHEMAS}
+        self.lock = threading.RLock()
+        self.pending = {}
+        self.timers = {}
+        self.revision = 0
+        self.stats = {'patches': 0, 'writes': 0, 'coalesced': 0, 'recovered': 0, 'failed_writes': 0}
+        self.last_error = None
+
+    def _document(self, doc_id):
+        document = self.documents.get(doc_id)
+        if document is None:
+            raise ConfigQueryError(404, f'Unknown config document: {doc_id}', {'documents': sorted(self.documents)})
+        return document
+
+    def _current(self, doc_id):
+        """Latest value: the pending one if a write is queued, else the file"""
+        if doc_id in self.pending:
+            return self.pending[doc_id]['value']
+        document = self._document(doc_id)
+        try:
+            value, result = self.validator.validate_file(document)
+        except OSError:
+            raise ConfigQueryError(404, f'Config document not found: {document}')
+        if value is None:
+            raise ConfigQueryError(422, f'{document} is not valid JSON', {'errors': result['errors']})
+        return value
+
+    # ------------------------------------------------------------------
+    # Journal
+    # ------------------------------------------------------------------
+
+    def _journal(self, record):
+        os.makedirs(os.path.dirname(self.journal_path), exist_ok=True)
+        with open(self.journal_path, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(record, separators=(',', ':')) + '\n')
+            f.flush()
+            os.fsync(f.fileno())
+
+    def _read_journal(self):
+        records = []
+        try:
+            with open(self.journal_path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        records.append(json.loads(line))
+                    except json.JSONDecodeError:
+                        # Torn final line from a crash mid-append
+                        break
+        except OSError:
+            pass
+        return records
+
+    def recover(self):
+        """Replay journaled patches that were acknowledged but never written"""
+        with self.lock:
+            records = self._read_journal()
+            committed = {}
+            for record in records:
+                if 'commit' in record:
+                    committed[record['commit']] = max(committed.get(record['commit'], 0), record['revision'])
+            replayed = {}
+            for record in records:
+                if 'patch' not in record or record['revision'] <= committed.get(record['document'], 0):
+                    continue
+                self.revision = max(self.revision, record['revision'])
+                base = replayed.get(record['document'])
+                try:
+                    base = base if base is not None else self._current(record['document'])
+                    replayed[record['document']] = apply_patch(base, record['kind'], record['patch'],
+                                                               record.get('pointer', ''))
+                except ConfigQueryError:
+                    continue
+                self.stats['recovered'] += 1
+            for doc_id, value in replayed.items():
+                self.pending[doc_id] = {'value': value, 'revision': self.revision, 'since': time.monotonic()}
+                self.flush(doc_id)
+            if not self.pending and os.path.exists(self.journal_path):
+                os.remove(self.journal_path)
+            return sorted(replayed)
+
+    # ------------------------------------------------------------------
+    # Writes
+    # ------------------------------------------------------------------
+
+    def patch(self, doc_id, kind, patch, pointer='', flush=False):
+        """Apply one patch in memory and schedule the write; returns the acknowledgement"""
+        with self.lock:
+            document = self._document(doc_id)
+            value = apply_patch(self._current(doc_id), kind, patch, pointer)
+            result = validate_value(document, value)
+            if not result['valid']:
+                raise ConfigQueryError(422, f'Patched {document} fails validation', {'errors': result['errors']})
+
+            self.revision += 1
+            self._journal({'revision': self.revision, 'document': doc_id, 'kind': kind,
+                           'pointer': pointer, 'patch': patch})
+            entry = self.pending.get(doc_id)
+            if entry:
+                self.stats['coalesced'] += 1
+            self.pending[doc_id] = {
+                'value': value,
+                'revision': self.revision,
+                'since': entry['since'] if entry else time.monotonic()
+            }
+            self.stats['patches'] += 1
+            self._install(doc_id, value)
+
+            if flush:
+                self.flush(doc_id)
+            else:
+                self._schedule(doc_id)
+            return {
+                'document': document,
+                'revision': self.revision,
+                'etag': encode_node(value)[1],
+                'pending': doc_id in self.pending
+            }
+
+    def _install(self, doc_id, value):
+        """Readers see the accepted value right away; the file catches up on flush"""
+        document = self.documents[doc_id]
+        self.validator.set_pending(document, value)
+        try:
+            stat = os.stat(os.path.join(self.root, document))
+        except OSError:
+            return
+        # Keyed to the file as it is now, so the index keeps this value until the file changes
+        self.index.install(doc_id, value, (stat.st_mtime_ns, stat.st_size))
+
+    def _schedule(self, doc_id):
+        timer = self.timers.pop(doc_id, None)
+        if timer:
+            timer.cancel()
+        waited = time.monotonic() - self.pending[doc_id]['since']
+        self._start_timer(doc_id, max(0.0, min(self.debounce, MAX_WRITE_DELAY - waited)))
+
+    def _start_timer(self, doc_id, delay):
+        timer = threading.Timer(delay, self._timed_flush, [doc_id])
+        timer.daemon = True
+        self.timers[doc_id] = timer
+        timer.start()
+
+    def _timed_flush(self, doc_id):
+        try:
+            self.flush(doc_id)
+        except OSError as e:
+            # flush() already queued the retry
+            print(f"⚠️ Config write for {doc_id} failed, retrying in {WRITE_RETRY_DELAY:g}s: {e}")
+
+    def flush(self, doc_id):
+        """Write one document now if it has pending changes"""
+        with self.lock:
+            timer = self.timers.pop(doc_id, None)
+            if timer:
+                timer.cancel()
+            entry = self.pending.pop(doc_id, None)
+            if entry is None:
+                return False
+            document = self.documents[doc_id]
+            path = os.path.join(self.root, document)
+            try:
+                with open(path, 'rb') as f:
+                    text = f.read().decode('utf-8')
+                old_value = json.loads(text)
+            except (OSError, ValueError):
+                data = serialize_document(entry['value'])
+            else:
+                data = render_document(text, old_value, entry['value'])
+            try:
+                atomic_write(path, data)
+            except OSError as e:
+                # Keep it queued and try again; the journal still holds it if we never recover
+                self.pending[doc_id] = entry
+                self.stats['failed_writes'] += 1
+                self.last_error = f'{document}: {e}'
+                self._start_timer(doc_id, WRITE_RETRY_DELAY)
+                raise
+            self.last_error = None
+            self._journal({'commit': doc_id, 'revision': entry['revision']})
+            self.stats['writes'] += 1
+
+            # Hand the new bytes to the caches instead of letting them re-read the file
+            self.validator.store(document, data, entry['value'])
+            self.validator.set_pending(document, None)
+            stat = os.stat(path)
+            self.index.install(doc_id, entry['value'], (stat.st_mtime_ns, stat.st_size))
+
+            if not self.pending:
+                os.remove(self.journal_path)
+            return True
+
+    def flush_all(self):
+        with self.lock:
+            return [doc_id for doc_id in list(self.pending) if self.flush(doc_id)]
+
+    def describe(self):
+        with self.lock:
+            return {
+                'pending': sorted(self.pending),
+                'revision': self.revision,
+                'debounce_ms': int(self.debounce * 1000),
+                'last_error': self.last_error,
+                **self.stats
+            }
@@ -0,0 +1,244 @@
+#!/usr/bin/env python3
+"""
+VIB34D Delta Packages
+Builds patch archives holding only the files that changed between two
+package manifests, and applies them to a deployed tree with verification
+
+Usage:
+    python3 vib34d_delta.py create <old-manifest.json> <new-package-dir> [-o patch.zip]
+    python3 vib34d_delta.py apply <patch.zip> <deployed-package-dir>
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+import zipfile
+from pathlib import Path
+
+DELTA_INFO = 'delta.json'
+DELTA_FILES = 'files/'
+MANIFEST_NAME = 'package-manifest.json'
+
+# Read once at import, while nothing else can race on the process umask
+_UMASK = os.umask(0)
+os.umask(_UMASK)
+
+
+class DeltaError(Exception):
+    """Raised when a delta cannot be created or applied safely"""
+
+
+def file_checksum(path):
+    """MD5 checksum, matching the packager's manifest checksums"""
+    digest = hashlib.md5()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def diff_manifests(old_manifest, new_manifest):
+    """Classify files as added, changed, removed or unchanged by checksum"""
+    old_files = old_manifest.get('files', {})
+    new_files = new_manifest.get('files', {})
+    added = sorted(path for path in new_files if path not in old_files)
+    removed = sorted(path for path in old_files if path not in new_files)
+    changed = sorted(
+        path for path in new_files
+        if path in old_files and new_files[path]['checksum'] != old_files[path]['checksum']
+    )
+    unchanged = sorted(
+        path for path in new_files
+        if path in old_files and new_files[path]['checksum'] == old_files[path]['checksum']
+    )
+    return {'added': added, 'changed': changed, 'removed': removed, 'unchanged': unchanged}
+
+
+def create_delta_package(old_manifest, package_dir, output_path):
+    """Write a patch archive turning the old manifest's tree into package_dir"""
+    package_dir = Path(package_dir)
+    with open(package_dir / MANIFEST_NAME, 'r') as f:
+        new_manifest = json.load(f)
+
+    diff = diff_manifests(old_manifest, new_manifest)
+    old_files = old_manifest.get('files', {})
+    info = {
+        'format': 'vib34d-delta',
+        'version': 1,
+        'from': old_manifest.get('created'),
+        'to': new_manifest.get('created'),
+        'added': diff['added'],
+        'changed': diff['changed'],
+        'removed': diff['removed'],
+        # What the deployed tree must contain before patching
+        'base_checksums': {
+            path: old_files[path]['checksum'] for path in diff['changed'] + diff['removed']
+        },
+        'target_manifest': new_manifest
+    }
+
+    payload_bytes = 0
+    with zipfile.ZipFile(output_path, 'w', zipfile.ZIP_DEFLATED) as archive:
+        for path in diff['added'] + diff['changed']:
+            archive.write(package_dir / path, DELTA_FILES + path)
+            payload_bytes += (package_dir / path).stat().st_size
+        archive.writestr(DELTA_INFO, json.dumps(info, indent=2))
+        # Ship the apply step with the patch so edge hosts need nothing else
+        archive.write(Path(__file__).resolve(), 'vib34d_delta.py')
+
+    return {
+        'path': str(output_path),
+        'added': len(diff['added']),
+        'changed': len(diff['changed']),
+        'removed': len(diff['removed']),
+        'unchanged': len(diff['unchanged']),
+        'payload_bytes': payload_bytes,
+        'archive_bytes': Path(output_path).stat().st_size
+    }
+
+
+def verify_tree(target_dir, manifest):
+    """Return the paths whose content does not match the manifest"""
+    target_dir = Path(target_dir)
+    mismatches = []
+    for path, entry in manifest.get('files', {}).items():
+        file_path = target_dir / path
+        if not file_path.is_file() or file_checksum(file_path) != entry['checksum']:
+            mismatches.append(path)
+    return mismatches
+
+
+def _check_paths(target_dir, paths):
+    """Raise DeltaError for any absolute path or one that resolves outside target_dir"""
+    root = os.path.realpath(target_dir)
+    unsafe = [
+        path for path in paths
+        if os.path.isabs(path) or os.path.commonpath([root, os.path.realpath(os.path.join(root, path))]) != root
+    ]
+    if unsafe:
+        raise DeltaError(f'Delta paths outside the deployed tree: {", ".join(sorted(unsafe)[:10])}')
+
+
+def _file_mode(entry, dest):
+    """Permission bits for a patched file: the archived mode, else the replaced file's, else 0644 less umask"""
+    mode = (entry.external_attr >> 16) & 0o7777
+    if mode:
+        return mode
+    try:
+        return dest.stat().st_mode & 0o7777
+    except FileNotFoundError:
+        return 0o644 & ~_UMASK
+
+
+def _atomic_write(source, dest, mode):
+    dest.parent.mkdir(parents=True, exist_ok=True)
+    handle, temp_path = tempfile.mkstemp(dir=dest.parent, prefix=f'.{dest.name}.')
+    try:
+        with os.fdopen(handle, 'wb') as out, open(source, 'rb') as src:
+            shutil.copyfileobj(src, out)
+        # mkstemp creates 0600, and os.replace keeps the temp file's mode
+        os.chmod(temp_path, mode)
+        os.replace(temp_path, dest)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.unlink(temp_path)
+        raise
+
+
+def apply_delta_package(patch_path, target_dir):
+    """Apply a patch archive in place, then verify against the target manifest"""
+    target_dir = Path(target_dir)
+
+    with zipfile.ZipFile(patch_path) as archive:
+        info = json.loads(archive.read(DELTA_INFO))
+        if info.get('format') != 'vib34d-delta':
+            raise DeltaError(f'{patch_path} is not a VIB34D delta package')
+
+        # delta.json is untrusted input: check every path before anything is read or written
+        _check_paths(target_dir, set(info['added'] + info['changed'] + info['removed'])
+                     | set(info['base_checksums']) | set(info['target_manifest']['files']))
+
+        # Refuse to patch a tree that has drifted from the delta's base
+        drifted = [
+            path for path, checksum in info['base_checksums'].items()
+            if not (target_dir / path).is_file() or file_checksum(target_dir / path) != checksum
+        ]
+        if drifted:
+            raise DeltaError(f'Deployed tree does not match delta base: {", ".join(drifted[:10])}')
+
+        with tempfile.TemporaryDirectory() as staging:
+            for path in info['added'] + info['changed']:
+                archive.extract(DELTA_FILES + path, staging)
+            staged = Path(staging) / DELTA_FILES
+
+            expected = info['target_manifest']['files']
+            for path in info['added'] + info['changed']:
+                if file_checksum(staged / path) != expected[path]['checksum']:
+                    raise DeltaError(f'Corrupt delta payload: {path}')
+
+            for path in info['added'] + info['changed']:
+                _atomic_write(staged / path, target_dir / path,
+                              _file_mode(archive.getinfo(DELTA_FILES + path), target_dir / path))
+
+    for path in info['removed']:
+        file_path = target_dir / path
+        if file_path.exists():
+            file_path.unlink()
+
+    mismatches = verify_tree(target_dir, info['target_manifest'])
+    if mismatches:
+        raise DeltaError(f'Patched tree does not match target manifest: {", ".join(mismatches[:10])}')
+
+    manifest_path = target_dir / MANIFEST_NAME
+    with open(manifest_path.with_suffix('.json.tmp'), 'w') as f:
+        json.dump(info['target_manifest'], f, indent=2)
+    os.replace(manifest_path.with_suffix('.json.tmp'), manifest_path)
+
+    return {
+        'added': len(info['added']),
+        'changed': len(info['changed']),
+        'removed': len(info['removed']),
+        'verified_files': len(info['target_manifest']['files'])
+    }
+
+
+def main():
+    """Command line entry point"""
+    parser = argparse.ArgumentParser(description='VIB34D delta package tool')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    create = commands.add_parser('create', help='Create a delta from an old manifest to a new package')
+    create.add_argument('old_manifest')
+    create.add_argument('package_dir')
+    create.add_argument('-o', '--output', default=f'vib34d-dashboard-delta-{int(time.time())}.zip')
+
+    apply = commands.add_parser('apply', help='Apply a delta to a deployed package')
+    apply.add_argument('patch')
+    apply.add_argument('target_dir')
+
+    args = parser.parse_args()
+
+    try:
+        if args.command == 'create':
+            with open(args.old_manifest, 'r') as f:
+                old_manifest = json.load(f)
+            result = create_delta_package(old_manifest, args.package_dir, args.output)
+            print(f'✅ Delta package: {result["path"]} ({result["archive_bytes"]:,} bytes)')
+            print(f'   +{result["added"]} added, ~{result["changed"]} changed, '
+                  f'-{result["removed"]} removed, {result["unchanged"]} unchanged')
+        else:
+            result = apply_delta_package(args.patch, args.target_dir)
+            print(f'✅ Delta applied: +{result["added"]} ~{result["changed"]} -{result["removed"]}, '
+                  f'{result["verified_files"]} files verified')
+    except (DeltaError, OSError, KeyError, json.JSONDecodeError) as e:
+        print(f'❌ {e}')
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,296 @@
+#!/usr/bin/env python3
+"""
+VIB34D Event Dispatch Compiler
+Flattens event-reaction-manifest.json and comprehensive-event-manifest.json
+into dense integer-keyed tables (event id -> ordered reaction ids, reaction
+id -> target ids) so the client dispatches each event with array lookups
+instead of walking the nested manifests
+"""
+
+import gzip
+import hashlib
+import json
+import os
+import threading
+
+DISPATCH_INPUTS = [
+    'config/event-reaction-manifest.json',
+    'config/comprehensive-event-manifest.json'
+]
+
+# Bit flags packed per event
+EVENT_FLAGS = {
+    'bubbling': 1,
+    'capturable': 2,
+    'throttled': 4,
+    'debounced': 8,
+    'preventDefault': 16,
+    'blocking': 32,
+    'passive': 64,
+    'active': 128
+}
+
+
+class Interner:
+    """Assigns dense ids in first-seen order"""
+
+    def __init__(self):
+        self.ids = {}
+        self.names = []
+
+    def __call__(self, name):
+        if name not in self.ids:
+            self.ids[name] = len(self.names)
+            self.names.append(name)
+        return self.ids[name]
+
+
+def _is_event_definition(value):
+    return isinstance(value, dict) and any(
+        key in value for key in ('defaultReactions', 'category', 'effects', 'bubbling'))
+
+
+def _event_groups(manifest, key):
+    """Yield (event name, definition) from {event: def} or {group: {event: def}} sections"""
+    for name, value in (manifest.get(key) or {}).items():
+        if _is_event_definition(value):
+            yield name, value
+        elif isinstance(value, dict):
+            for child_name, definition in value.items():
+                if _is_event_definition(definition):
+                    yield child_name, definition
+
+
+def find_cycles(edges):
+    """Strongly connected components with more than one node (or a self loop)"""
+    index = {}
+    lowlink = {}
+    on_stack = set()
+    stack = []
+    cycles = []
+    counter = 0
+
+    for start in list(edges):
+        if start in index:
+            continue
+        work = [(start, iter(edges.get(start, ())))]
+        index[start] = lowlink[start] = counter
+        counter += 1
+        stack.append(start)
+        on_stack.add(start)
+        while work:
+            node, children = work[-1]
+            advanced = False
+            for child in children:
+                if child not in index:
+                    index[child] = lowlink[child] = counter
+                    counter += 1
+                    stack.append(child)
+                    on_stack.add(child)
+                    work.append((child, iter(edges.get(child, ()))))
+                    advanced = True
+                    break
+                if child in on_stack:
+                    lowlink[node] = min(lowlink[node], index[child])
+            if advanced:
+                continue
+            work.pop()
+            if work:
+                parent = work[-1][0]
+                lowlink[parent] = min(lowlink[parent], lowlink[node])
+            if lowlink[node] == index[node]:
+                component = []
+                while True:
+                    member = stack.pop()
+                    on_stack.discard(member)
+                    component.append(member)
+                    if member == node:
+                        break
+                if len(component) > 1 or node in edges.get(node, ()):
+                    cycles.append(sorted(component))
+    return cycles
+
+
+def compile_dispatch(documents):
+    """Build the dispatch artifact from {document path: parsed JSON}"""
+    reaction_manifest = (documents.get('config/event-reaction-manifest.json') or {}).get('eventReactionManifest', {})
+    comprehensive = (documents.get('config/comprehensive-event-manifest.json') or {}).get('vib3EventManifest', {})
+
+    events = Interner()
+    reactions = Interner()
+    targets = Interner()
+    dispatch = {}
+    flags = {}
+    timing = {}
+    effect_targets = {}
+    auto_reverse = {}
+
+    # Events and their ordered default reactions
+    for key in ('userInputEvents', 'systemEvents', 'applicationEvents'):
+        for name, definition in _event_groups(reaction_manifest.get('eventTypes', {}), key):
+            event_id = events(name)
+            ordered = dispatch.setdefault(event_id, [])
+            for reaction in definition.get('defaultReactions', []):
+                reaction_id = reactions(reaction)
+                if reaction_id not in ordered:
+                    ordered.append(reaction_id)
+            for flag, bit in EVENT_FLAGS.items():
+                if definition.get(flag) is True:
+                    flags[event_id] = flags.get(event_id, 0) | bit
+            for field in ('throttleRate', 'debounceDelay'):
+                if field in definition:
+                    timing.setdefault(event_id, {})[field] = definition[field]
+
+    for category in ('passiveEvents', 'activeEvents'):
+        bit = EVENT_FLAGS['passive' if category == 'passiveEvents' else 'active']
+        for name, definition in _event_groups(comprehensive, category):
+            event_id = events(name)
+            dispatch.setdefault(event_id, [])
+            flags[event_id] = flags.get(event_id, 0) | bit
+            scopes = [targets(scope) for scope in (definition.get('effects') or {})]
+            if scopes:
+                effect_targets[event_id] = scopes
+            reverse = (definition.get('autoReverse') or {}).get('trigger')
+            if reverse:
+                auto_reverse[event_id] = events(reverse)
+                dispatch.setdefault(auto_reverse[event_id], [])
+
+    # Reaction definitions: targets, timing, and what triggers them
+    definitions = {}
+    for group in (reaction_manifest.get('reactionDefinitions') or {}).values():
+        for name, definition in (group or {}).items():
+            if isinstance(definition, dict):
+                definitions[name] = definition
+                reactions(name)
+
+    # Sequences and shortcut combos from behaviorPatterns
+    sequences = []
+    shortcuts = {}
+    for name, pattern in ((reaction_manifest.get('behaviorPatterns') or {}).get('interactionSequences') or {}).items():
+        if isinstance(pattern.get('reaction'), str):
+            sequences.append([[events(event) for event in pattern.get('sequence', [])], reactions(pattern['reaction'])])
+        for key, reaction in (pattern.get('reactions') or {}).items():
+            shortcuts[key] = reactions(reaction)
+
+    # Preventable rules
+    prevents = {}
+    for rule in ((comprehensive.get('eventRelationships') or {}).get('preventable') or {}).get('rules', []):
+        if rule.get('event'):
+            prevents[events(rule['event'])] = [events(event) for event in rule.get('prevents', [])]
+
+    reaction_targets = []
+    durations = []
+    for reaction_id, name in enumerate(reactions.names):
+        definition = definitions.get(name, {})
+        names = definition.get('targets') or list(definition.get('effects') or {})
+        reaction_targets.append([targets(target) for target in names])
+        durations.append(definition.get('duration', definition.get('totalDuration')))
+
+    # Graph over ('e', name) / ('r', name) nodes for cycle and reachability checks
+    edges = {}
+    for event_id, ordered in dispatch.items():
+        edges.setdefault(('e', events.names[event_id]), set()).update(('r', reactions.names[r]) for r in ordered)
+    for event_id, reverse_id in auto_reverse.items():
+        edges.setdefault(('e', events.names[event_id]), set()).add(('e', events.names[reverse_id]))
+    for name in reactions.names:
+        if name in events.ids:
+            # A reaction named like an event re-dispatches that event
+            edges.setdefault(('r', name), set()).add(('e', name))
+    triggered = set()
+    for name, definition in definitions.items():
+        for trigger in definition.get('triggers', []):
+            source = ('r', trigger) if trigger in reactions.ids else ('e', trigger) if trigger in events.ids else None
+            if source:
+                edges.setdefault(source, set()).add(('r', name))
+            triggered.add(name)
+    for sequence, reaction_id in sequences:
+        triggered.add(reactions.names[reaction_id])
+    triggered.update(reactions.names[reaction_id] for reaction_id in shortcuts.values())
+
+    reachable = set()
+    frontier = [('e', name) for name in events.names]
+    while frontier:
+        node = frontier.pop()
+        if node in reachable:
+            continue
+        reachable.add(node)
+        frontier.extend(edges.get(node, ()))
+
+    cycles = [[f'{kind}:{name}' for kind, name in component] for component in find_cycles(edges)]
+    unreachable = sorted(name for name in definitions if ('r', name) not in reachable and name not in triggered)
+    undefined = sorted(name for name in reactions.names if name not in definitions)
+
+    artifact = {
+        'format': 'vib34d-dispatch',
+        'version': 1,
+        'events': events.names,
+        'reactions': reactions.names,
+        'targets': targets.names,
+        # dispatch[eventId] -> reaction ids in firing order
+        'dispatch': [dispatch.get(event_id, []) for event_id in range(len(events.names))],
+        'eventFlags': [flags.get(event_id, 0) for event_id in range(len(events.names))],
+        'flagBits': EVENT_FLAGS,
+        'eventTiming': {str(event_id): value for event_id, value in sorted(timing.items())},
+        'effectTargets': [effect_targets.get(event_id, []) for event_id in range(len(events.names))],
+        'autoReverse': [auto_reverse.get(event_id, -1) for event_id in range(len(events.names))],
+        'prevents': [prevents.get(event_id, []) for event_id in range(len(events.names))],
+        'reactionTargets': reaction_targets,
+        'reactionDuration': durations,
+        'reactionDefined': [1 if name in definitions else 0 for name in reactions.names],
+        'sequences': sequences,
+        'shortcuts': shortcuts
+    }
+    diagnostics = {
+        'events': len(events.names),
+        'reactions': len(reactions.names),
+        'targets': len(targets.names),
+        'cycles': cycles,
+        'unreachable_reactions': unreachable,
+        'undefined_reactions': undefined
+    }
+    return artifact, diagnostics
+
+
+def load_dispatch_documents(root, validator=None):
+    documents = {}
+    for document in DISPATCH_INPUTS:
+        pending = validator.pending_value(document) if validator else None
+        if pending is not None:
+            documents[document] = pending
+            continue
+        path = os.path.join(root, document)
+        if os.path.exists(path):
+            with open(path, 'r') as f:
+                documents[document] = json.load(f)
+    return documents
+
+
+class DispatchTableCache:
+    """Recompiles the dispatch tables only when a manifest changes, on disk or as an accepted config write"""
+
+    def __init__(self, root='.', validator=None):
+        self.root = root
+        self.validator = validator
+        self.lock = threading.Lock()
+        self.signature = None
+        self.compiled = None
+
+    def _signature(self):
+        signature = []
+        for document in DISPATCH_INPUTS:
+            path = os.path.join(self.root, document)
+            signature.append(os.stat(path).st_mtime_ns if os.path.exists(path) else None)
+        signature.append(self.validator.generation if self.validator else None)
+        return tuple(signature)
+
+    def get(self):
+        """(json bytes, gzip bytes, etag, diagnostics)"""
+        with self.lock:
+            signature = self._signature()
+            if signature != self.signature:
+                artifact, diagnostics = compile_dispatch(load_dispatch_documents(self.root, self.validator))
+                body = json.dumps(artifact, separators=(',', ':')).encode('utf-8')
+                etag = '"' + hashlib.sha1(body).hexdigest()[:20] + '"'
+                self.compiled = (body, gzip.compress(body, 9, mtime=0), etag, diagnostics)
+                self.signature = signature
+            return self.compiled
@@ -0,0 +1,306 @@
+#!/usr/bin/env python3
+"""
+VIB34D Geometry Engine
+Builds vertices, edges and triangles for the eight dashboard geometries
+as real 4D meshes with vectorized NumPy, so weak GPUs can render meshes
+instead of evaluating the lattice shaders per pixel
+
+NumPy is optional: without it GEOMETRY_AVAILABLE is False and callers
+should report the feature as unavailable.
+"""
+
+import functools
+import hashlib
+import itertools
+
+try:
+    import numpy as np
+    GEOMETRY_AVAILABLE = True
+except ImportError:
+    np = None
+    GEOMETRY_AVAILABLE = False
+
+GEOMETRY_TYPES = ['hypercube', 'tetrahedron', 'sphere', 'torus', 'kleinbottle', 'fractal', 'wave', 'crystal']
+DEFAULT_RESOLUTION = 24
+MIN_RESOLUTION = 4
+MAX_RESOLUTION = 128
+WELD_DECIMALS = 6
+
+
+class GeometryError(ValueError):
+    """Raised for unknown geometry types or unusable resolutions"""
+
+
+# ----------------------------------------------------------------------
+# Mesh helpers
+# ----------------------------------------------------------------------
+
+def _grid_topology(nu, nv):
+    """Edges and triangles of an (nu + 1) x (nv + 1) vertex grid"""
+    index = np.arange((nu + 1) * (nv + 1)).reshape(nu + 1, nv + 1)
+    a, b, c, d = index[:-1, :-1], index[1:, :-1], index[1:, 1:], index[:-1, 1:]
+    faces = np.concatenate([
+        np.stack([a, b, c], axis=-1).reshape(-1, 3),
+        np.stack([a, c, d], axis=-1).reshape(-1, 3)
+    ])
+    edges = np.concatenate([
+        np.stack([index[:-1, :], index[1:, :]], axis=-1).reshape(-1, 2),
+        np.stack([index[:, :-1], index[:, 1:]], axis=-1).reshape(-1, 2)
+    ])
+    return edges, faces
+
+
+def _triangle_topology(n):
+    """Barycentric weights and triangles of a triangle split n times per side"""
+    i, j = np.meshgrid(np.arange(n + 1), np.arange(n + 1), indexing='ij')
+    keep = i + j <= n
+    i, j = i[keep], j[keep]
+    weights = np.stack([n - i - j, i, j], axis=-1) / n
+    lookup = -np.ones((n + 1, n + 1), dtype=np.int64)
+    lookup[i, j] = np.arange(len(i))
+
+    up = (i + j + 1 <= n)
+    down = (i + j + 2 <= n)
+    faces = np.concatenate([
+        np.stack([lookup[i[up], j[up]], lookup[i[up] + 1, j[up]], lookup[i[up], j[up] + 1]], axis=-1),
+        np.stack([lookup[i[down] + 1, j[down]], lookup[i[down] + 1, j[down] + 1], lookup[i[down], j[down] + 1]], axis=-1)
+    ])
+    return weights, faces
+
+
+def _merge(chunks):
+    """Concatenate (vertices, edges, faces) chunks, offsetting their indices"""
+    vertices, edges, faces = [], [], []
+    offset = 0
+    for chunk_vertices, chunk_edges, chunk_faces in chunks:
+        vertices.append(chunk_vertices)
+        edges.append(chunk_edges + offset)
+        faces.append(chunk_faces + offset)
+        offset += len(chunk_vertices)
+    return np.concatenate(vertices), np.concatenate(edges), np.concatenate(faces)
+
+
+def _weld(vertices, edges, faces):
+    """Merge coincident vertices (closing seams) and drop duplicate/degenerate primitives"""
+    keys = np.round(vertices, WELD_DECIMALS) + 0.0
+    unique, inverse = np.unique(keys, axis=0, return_inverse=True)
+    inverse = inverse.reshape(-1)
+    edges = np.sort(inverse[edges], axis=1)
+    edges = np.unique(edges[edges[:, 0] != edges[:, 1]], axis=0)
+    faces = inverse[faces]
+    distinct = (faces[:, 0] != faces[:, 1]) & (faces[:, 1] != faces[:, 2]) & (faces[:, 0] != faces[:, 2])
+    return unique, edges, faces[distinct]
+
+
+def _surface(fn, nu, nv, u_range, v_range):
+    """Sample a parametric 4D surface, seams included (welding closes them)"""
+    u = np.linspace(u_range[0], u_range[1], nu + 1)
+    v = np.linspace(v_range[0], v_range[1], nv + 1)
+    uu, vv = np.meshgrid(u, v, indexing='ij')
+    vertices = fn(uu, vv).reshape(-1, 4)
+    edges, faces = _grid_topology(nu, nv)
+    return vertices, edges, faces
+
+
+def _patches(corners, polygons, weights, faces):
+    """Tessellate every polygon with shared interpolation weights and triangles"""
+    points = np.einsum('pk,fkd->fpd', weights, corners[np.asarray(polygons)])
+    offsets = (np.arange(len(polygons)) * points.shape[1])[:, None, None]
+    # Wireframe edges come from the polytope's own edges, not the tessellation
+    return points.reshape(-1, 4), np.empty((0, 2), dtype=np.int64), (faces[None] + offsets).reshape(-1, 3)
+
+
+def _polytope_mesh(corners, edge_pairs, triangles, quads, subdivisions):
+    """Tessellate polytope faces and subdivide its edges"""
+    chunks = []
+
+    if len(triangles):
+        weights, faces = _triangle_topology(subdivisions)
+        chunks.append(_patches(corners, triangles, weights, faces))
+
+    if len(quads):
+        s = np.linspace(0.0, 1.0, subdivisions + 1)
+        ss, tt = np.meshgrid(s, s, indexing='ij')
+        weights = np.stack([(1 - ss) * (1 - tt), ss * (1 - tt), ss * tt, (1 - ss) * tt], axis=-1).reshape(-1, 4)
+        chunks.append(_patches(corners, quads, weights, _grid_topology(subdivisions, subdivisions)[1]))
+
+    # Polytope edges as polylines so vertex-shader morphing can bend them
+    t = np.linspace(0.0, 1.0, subdivisions + 1)[None, :, None]
+    pairs = np.asarray(edge_pairs)
+    points = corners[pairs[:, 0]][:, None, :] * (1 - t) + corners[pairs[:, 1]][:, None, :] * t
+    segment = np.stack([np.arange(subdivisions), np.arange(1, subdivisions + 1)], axis=-1)
+    offsets = (np.arange(len(pairs)) * (subdivisions + 1))[:, None, None]
+    chunks.append((points.reshape(-1, 4), (segment[None] + offsets).reshape(-1, 2),
+                   np.empty((0, 3), dtype=np.int64)))
+
+    return _weld(*_merge(chunks))
+
+
+def _adjacency(corners, distance_squared):
+    gaps = ((corners[:, None, :] - corners[None, :, :]) ** 2).sum(-1)
+    return np.isclose(gaps, distance_squared)
+
+
+# ----------------------------------------------------------------------
+# Geometries
+# ----------------------------------------------------------------------
+
+def build_hypercube(resolution):
+    """Tesseract: 16 vertices, 32 edges, 24 square faces"""
+    corners = np.array(list(itertools.product((-1.0, 1.0), repeat=4))) * 0.5
+    edges = np.argwhere(np.triu(_adjacency(corners, 1.0)))
+    quads = []
+    for a, b in itertools.combinations(range(4), 2):
+        fixed = [axis for axis in range(4) if axis not in (a, b)]
+        for signs in itertools.product((0, 1), repeat=2):
+            quad = []
+            for bit_a, bit_b in ((0, 0), (1, 0), (1, 1), (0, 1)):
+                bits = [0] * 4
+                bits[a], bits[b] = bit_a, bit_b
+                bits[fixed[0]], bits[fixed[1]] = signs
+                quad.append(int(''.join(map(str, bits)), 2))
+            quads.append(quad)
+    return _polytope_mesh(corners, edges, [], quads, max(1, resolution // 4))
+
+
+def _simplex_corners():
+    """Regular 5-cell, edge length sqrt(2)"""
+    r5 = np.sqrt(5.0)
+    return np.array([
+        [1, 1, 1, -1 / r5], [1, -1, -1, -1 / r5], [-1, 1, -1, -1 / r5], [-1, -1, 1, -1 / r5], [0, 0, 0, r5 - 1 / r5]
+    ]) / 2.0
+
+
+def build_tetrahedron(resolution):
+    """5-cell (4-simplex): 5 vertices, 10 edges, 10 triangles"""
+    corners = _simplex_corners()
+    edges = list(itertools.combinations(range(5), 2))
+    triangles = list(itertools.combinations(range(5), 3))
+    return _polytope_mesh(corners, edges, triangles, [], max(1, resolution // 4))
+
+
+def build_crystal(resolution):
+    """24-cell: 24 vertices, 96 edges, 96 triangles"""
+    corners = []
+    for a, b in itertools.combinations(range(4), 2):
+        for sa, sb in itertools.product((-1.0, 1.0), repeat=2):
+            vertex = [0.0] * 4
+            vertex[a], vertex[b] = sa, sb
+            corners.append(vertex)
+    corners = np.array(corners) / np.sqrt(2.0)
+    adjacent = _adjacency(corners, 1.0)
+    edges = np.argwhere(np.triu(adjacent))
+    i, j, k = np.nonzero(adjacent[:, :, None] & adjacent[None, :, :] & adjacent[:, None, :])
+    ordered = (i < j) & (j < k)
+    triangles = np.stack([i[ordered], j[ordered], k[ordered]], axis=-1)
+    return _polytope_mesh(corners, edges, triangles, [], max(1, resolution // 4))
+
+
+def build_sphere(resolution):
+    """Hypersphere S3 as nested Clifford tori (Hopf fibration shells)"""
+    shells = max(2, resolution // 16)
+    chunks = []
+    for eta in (np.arange(shells) + 0.5) / shells * (np.pi / 2):
+        def clifford(u, v, eta=eta):
+            return np.stack([np.cos(eta) * np.cos(u), np.cos(eta) * np.sin(u),
+                             np.sin(eta) * np.cos(v), np.sin(eta) * np.sin(v)], axis=-1)
+        chunks.append(_surface(clifford, resolution, resolution, (0, 2 * np.pi), (0, 2 * np.pi)))
+    return _weld(*_merge(chunks))
+
+
+def build_torus(resolution):
+    """Flat Clifford torus in 4D"""
+    def clifford(u, v):
+        return np.stack([np.cos(u), np.sin(u), np.cos(v), np.sin(v)], axis=-1) / np.sqrt(2.0)
+    return _weld(*_surface(clifford, resolution * 2, resolution, (0, 2 * np.pi), (0, 2 * np.pi)))
+
+
+def build_kleinbottle(resolution):
+    """Klein bottle embedded in 4D without self-intersection"""
+    def klein(u, v, big=0.6, small=0.25):
+        return np.stack([(big + small * np.cos(v)) * np.cos(u), (big + small * np.cos(v)) * np.sin(u),
+                         small * np.sin(v) * np.cos(u / 2), small * np.sin(v) * np.sin(u / 2)], axis=-1)
+    return _weld(*_surface(klein, resolution * 2, resolution, (0, 2 * np.pi), (0, 2 * np.pi)))
+
+
+def build_wave(resolution):
+    """Interference sheet displaced into z and w"""
+    def wave(u, v, k=2.0 * np.pi, amplitude=0.25):
+        return np.stack([u, v, amplitude * np.sin(k * u) * np.cos(k * v),
+                         amplitude * np.cos(k * (u + v))], axis=-1)
+    return _weld(*_surface(wave, resolution * 2, resolution * 2, (-1, 1), (-1, 1)))
+
+
+def build_fractal(resolution):
+    """Sierpinski pentatope: 5 ** depth half-scale copies of the 5-cell"""
+    depth = min(5, max(1, resolution // 8))
+    corners = _simplex_corners()
+    choices = np.indices((5,) * depth).reshape(depth, -1).T
+    scales = 0.5 ** (np.arange(depth) + 1)
+    offsets = (corners[choices] * scales[None, :, None]).sum(axis=1)
+    vertices = offsets[:, None, :] + corners[None, :, :] * 0.5 ** depth
+    pairs = np.array(list(itertools.combinations(range(5), 2)))
+    triples = np.array(list(itertools.combinations(range(5), 3)))
+    base = (np.arange(len(choices)) * 5)[:, None, None]
+    return _weld(vertices.reshape(-1, 4), (pairs[None] + base).reshape(-1, 2), (triples[None] + base).reshape(-1, 3))
+
+
+BUILDERS = {
+    'hypercube': build_hypercube,
+    'tetrahedron': build_tetrahedron,
+    'sphere': build_sphere,
+    'torus': build_torus,
+    'kleinbottle': build_kleinbottle,
+    'fractal': build_fractal,
+    'wave': build_wave,
+    'crystal': build_crystal
+}
+
+# ----------------------------------------------------------------------
+# Packed buffers
+# ----------------------------------------------------------------------
+
+def parse_resolution(value):
+    if value in (None, ''):
+        return DEFAULT_RESOLUTION
+    try:
+        resolution = int(value)
+    except (TypeError, ValueError):
+        raise GeometryError(f'Resolution must be an integer, got {value!r}')
+    if not MIN_RESOLUTION <= resolution <= MAX_RESOLUTION:
+        raise GeometryError(f'Resolution must be between {MIN_RESOLUTION} and {MAX_RESOLUTION}')
+    return resolution
+
+
+@functools.lru_cache(maxsize=32)
+def build_geometry(geometry, resolution=DEFAULT_RESOLUTION):
+    """(packed bytes, descriptor, etag) for one geometry at one resolution"""
+    if geometry not in BUILDERS:
+        raise GeometryError(f'Unknown geometry type: {geometry}')
+    vertices, edges, faces = BUILDERS[geometry](resolution)
+
+    vertex_bytes = vertices.astype('<f4').tobytes()
+    edge_bytes = edges.astype('<u4').tobytes()
+    face_bytes = faces.astype('<u4').tobytes()
+    data = vertex_bytes + edge_bytes + face_bytes
+
+    descriptor = {
+        'format': 'vib34d-geometry',
+        'version': 1,
+        'type': geometry,
+        'resolution': resolution,
+        'vertexCount': len(vertices),
+        'edgeCount': len(edges),
+        'faceCount': len(faces),
+        'bounds': {'min': vertices.min(axis=0).round(6).tolist(), 'max': vertices.max(axis=0).round(6).tolist()},
+        'endianness': 'little',
+        'byteLength': len(data),
+        'buffers': {
+            'vertices': {'dtype': 'float32', 'components': 4, 'byteOffset': 0, 'byteLength': len(vertex_bytes)},
+            'edges': {'dtype': 'uint32', 'components': 2, 'byteOffset': len(vertex_bytes),
+                      'byteLength': len(edge_bytes)},
+            'faces': {'dtype': 'uint32', 'components': 3, 'byteOffset': len(vertex_bytes) + len(edge_bytes),
+                      'byteLength': len(face_bytes)}
+        }
+    }
+    return data, descriptor, '"' + hashlib.sha1(data).hexdigest()[:20] + '"'
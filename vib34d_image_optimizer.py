@@ -0,0 +1,484 @@
+#!/usr/bin/env python3
+"""
+VIB34D Image Optimizer
+Lossless recompression for shipped PNG and GIF media, with a
+content-hash keyed result cache shared across builds. PNG filtering
+runs whole-image in NumPy when it is installed, in pure Python otherwise
+"""
+
+import hashlib
+import struct
+import zlib
+from itertools import repeat
+from operator import add, rshift, sub
+from pathlib import Path
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+PNG_SIGNATURE = b'\x89PNG\r\n\x1a\n'
+PNG_CHANNELS = {0: 1, 2: 3, 3: 1, 4: 2, 6: 4}
+
+# Indexing with a value in -255..510 yields it modulo 256
+# (negative list indices wrap around from the end)
+BYTE_MOD = list(range(256)) * 2
+# Signed magnitude of a filtered byte, for the minimum-sum heuristic
+SIGNED_ABS = [value if value < 128 else 256 - value for value in range(256)]
+
+# Without NumPy, Paeth filtering runs a Python loop per byte; skip it on very large images
+PAETH_MAX_BYTES = 4 * 1024 * 1024
+
+# Generated images (previews) are encoded once per request: one Up-filtered pass at this level
+FAST_FILTER = 2
+FAST_DEFLATE_LEVEL = 6
+
+GIF_KEEP_APPLICATIONS = (b'NETSCAPE2.0', b'ANIMEXTS1.0')
+
+
+class ImageFormatError(ValueError):
+    """Raised when image data cannot be parsed"""
+
+
+# ----------------------------------------------------------------------
+# PNG
+# ----------------------------------------------------------------------
+
+def read_png_chunks(data):
+    """Split PNG data into a list of (type, body) chunks"""
+    if data[:8] != PNG_SIGNATURE:
+        raise ImageFormatError('Not a PNG file')
+    chunks = []
+    pos = 8
+    while pos + 8 <= len(data):
+        length, chunk_type = struct.unpack('>I4s', data[pos:pos + 8])
+        chunks.append((chunk_type, data[pos + 8:pos + 8 + length]))
+        pos += 12 + length
+        if chunk_type == b'IEND':
+            break
+    return chunks
+
+
+def png_chunk(chunk_type, body):
+    return (struct.pack('>I', len(body)) + chunk_type + body
+            + struct.pack('>I', zlib.crc32(chunk_type + body) & 0xffffffff))
+
+
+def _paeth(a, b, c):
+    p = a + b - c
+    pa = abs(p - a)
+    pb = abs(p - b)
+    pc = abs(p - c)
+    if pa <= pb and pa <= pc:
+        return a
+    if pb <= pc:
+        return b
+    return c
+
+
+def _unfilter_numpy(raw, height, stride, bpp):
+    """Unfilter every row at once, sweeping the image one anti-diagonal at a time
+
+    Pixel (y, x) depends only on (y, x-1), (y-1, x) and (y-1, x-1), so all
+    pixels with the same x + y can be reconstructed together. Rows are
+    skewed right by their index so each anti-diagonal is one column.
+    """
+    data = np.frombuffer(raw, np.uint8, count=height * (stride + 1)).reshape(height, stride + 1)
+    types = data[:, 0]
+    if height and types.max() > 4:
+        raise ImageFormatError(f'Unknown PNG filter type {types.max()}')
+    width = stride // bpp
+
+    # Row 0 and the first two columns stay zero: the "previous row" and "left" of the image edges
+    y = np.arange(height)[:, None]
+    skew_rows, skew_cols = y + 1, np.arange(width)[None, :] + y + 2
+    filtered = np.zeros((height + 1, width + height + 2, bpp), np.int16)
+    filtered[skew_rows, skew_cols] = data[:, 1:].reshape(height, width, bpp)
+    pixels = np.zeros_like(filtered)
+    row_types = types.astype(np.int16)[:, None]
+
+    for column in range(2, width + height + 1):
+        lo, hi = max(0, column - 1 - width), min(height, column - 1)
+        a = pixels[lo + 1:hi + 1, column - 1]
+        b = pixels[lo:hi, column - 1]
+        c = pixels[lo:hi, column - 2]
+        t = row_types[lo:hi]
+        p = a + b - c
+        pa, pb, pc = np.abs(p - a), np.abs(p - b), np.abs(p - c)
+        paeth = np.where((pa <= pb) & (pa <= pc), a, np.where(pb <= pc, b, c))
+        predictor = np.select([t == 1, t == 2, t == 3, t == 4], [a, b, (a + b) >> 1, paeth], 0)
+        pixels[lo + 1:hi + 1, column] = (filtered[lo + 1:hi + 1, column] + predictor) & 0xff
+
+    image = pixels[skew_rows, skew_cols].astype(np.uint8).reshape(height, stride)
+    return [row.tobytes() for row in image]
+
+
+def unfilter_scanlines(raw, height, stride, bpp):
+    """Reverse PNG scanline filtering, returning the unfiltered rows"""
+    if np is not None and stride % bpp == 0:
+        return _unfilter_numpy(raw, height, stride, bpp)
+    rows = []
+    previous = bytes(stride)
+    pos = 0
+    for _ in range(height):
+        filter_type = raw[pos]
+        line = bytearray(raw[pos + 1:pos + 1 + stride])
+        pos += stride + 1
+        if filter_type == 1:
+            for i in range(bpp, stride):
+                line[i] = (line[i] + line[i - bpp]) & 0xff
+        elif filter_type == 2:
+            line = bytearray(map(BYTE_MOD.__getitem__, map(add, line, previous)))
+        elif filter_type == 3:
+            for i in range(stride):
+                left = line[i - bpp] if i >= bpp else 0
+                line[i] = (line[i] + ((left + previous[i]) >> 1)) & 0xff
+        elif filter_type == 4:
+            for i in range(bpp):
+                line[i] = (line[i] + previous[i]) & 0xff
+            for i in range(bpp, stride):
+                a, b, c = line[i - bpp], previous[i], previous[i - bpp]
+                pa, pb, pc = abs(b - c), abs(a - c), abs(a + b - c - c)
+                if pa <= pb and pa <= pc:
+                    line[i] = (line[i] + a) & 0xff
+                elif pb <= pc:
+                    line[i] = (line[i] + b) & 0xff
+                else:
+                    line[i] = (line[i] + c) & 0xff
+        elif filter_type != 0:
+            raise ImageFormatError(f'Unknown PNG filter type {filter_type}')
+        line = bytes(line)
+        rows.append(line)
+        previous = line
+    return rows
+
+
+def filter_scanline(filter_type, line, previous, bpp):
+    """Apply one PNG filter to a scanline (without the leading filter byte)"""
+    if filter_type == 0:
+        return line
+    if filter_type == 1:
+        return line[:bpp] + bytes(map(BYTE_MOD.__getitem__, map(sub, line[bpp:], line[:-bpp])))
+    if filter_type == 2:
+        return bytes(map(BYTE_MOD.__getitem__, map(sub, line, previous)))
+    if filter_type == 3:
+        left = bytes(bpp) + line[:-bpp]
+        predictor = map(rshift, map(add, left, previous), repeat(1))
+        return bytes(map(BYTE_MOD.__getitem__, map(sub, line, predictor)))
+    out = bytearray(len(line))
+    for i in range(len(line)):
+        if i >= bpp:
+            predictor = _paeth(line[i - bpp], previous[i], previous[i - bpp])
+        else:
+            predictor = previous[i]
+        out[i] = (line[i] - predictor) & 0xff
+    return bytes(out)
+
+
+def _filter_numpy(filter_types, rows, stride, bpp):
+    """{filter type: filtered rows} for the whole image in a few array operations"""
+    image = np.frombuffer(b''.join(rows), np.uint8).reshape(len(rows), stride).astype(np.int16)
+    above = np.zeros_like(image)
+    above[1:] = image[:-1]
+    left = np.zeros_like(image)
+    left[:, bpp:] = image[:, :-bpp]
+    above_left = np.zeros_like(image)
+    above_left[:, bpp:] = above[:, :-bpp]
+
+    per_filter = {}
+    for filter_type in filter_types:
+        if filter_type == 0:
+            predictor = 0
+        elif filter_type == 1:
+            predictor = left
+        elif filter_type == 2:
+            predictor = above
+        elif filter_type == 3:
+            predictor = (left + above) >> 1
+        else:
+            p = left + above - above_left
+            pa, pb, pc = np.abs(p - left), np.abs(p - above), np.abs(p - above_left)
+            predictor = np.where((pa <= pb) & (pa <= pc), left, np.where(pb <= pc, above, above_left))
+        filtered = ((image - predictor) & 0xff).astype(np.uint8)
+        per_filter[filter_type] = [row.tobytes() for row in filtered]
+    return per_filter
+
+
+def filter_rows(filter_types, rows, stride, bpp):
+    """{filter type: filtered rows (without filter bytes)} for each requested filter"""
+    if np is not None and rows:
+        return _filter_numpy(filter_types, rows, stride, bpp)
+    per_filter = {filter_type: [] for filter_type in filter_types}
+    previous = bytes(stride)
+    for line in rows:
+        for filter_type in filter_types:
+            per_filter[filter_type].append(filter_scanline(filter_type, line, previous, bpp))
+        previous = line
+    return per_filter
+
+
+def filter_candidates(rows, stride, bpp):
+    """Yield (strategy name, filtered image data) for each filter strategy"""
+    filter_types = [0, 1, 2, 3]
+    if np is not None or stride * len(rows) <= PAETH_MAX_BYTES:
+        filter_types.append(4)
+
+    per_filter = filter_rows(filter_types, rows, stride, bpp)
+
+    for filter_type in filter_types:
+        yield f'filter-{filter_type}', b''.join(
+            bytes((filter_type,)) + line for line in per_filter[filter_type]
+        )
+
+    adaptive = []
+    for index in range(len(rows)):
+        best_type = min(
+            filter_types,
+            key=lambda filter_type: sum(map(SIGNED_ABS.__getitem__, per_filter[filter_type][index]))
+        )
+        adaptive.append(bytes((best_type,)) + per_filter[best_type][index])
+    yield 'adaptive', b''.join(adaptive)
+
+
+def _deflate(data, strategy=zlib.Z_DEFAULT_STRATEGY):
+    compressor = zlib.compressobj(9, zlib.DEFLATED, 15, 9, strategy)
+    return compressor.compress(data) + compressor.flush()
+
+
+def compress_scanlines(rows, stride, bpp):
+    """Pick the filter strategy and deflate settings giving the smallest IDAT"""
+    # Rank strategies with a fast deflate, then spend level 9 on the top two
+    ranked = sorted(
+        filter_candidates(rows, stride, bpp),
+        key=lambda candidate: len(zlib.compress(candidate[1], 6))
+    )
+    best = None
+    for name, filtered in ranked[:2]:
+        for strategy in (zlib.Z_DEFAULT_STRATEGY, zlib.Z_FILTERED):
+            compressed = _deflate(filtered, strategy)
+            if best is None or len(compressed) < len(best[1]):
+                best = (name, compressed)
+    return best
+
+
+def _reduce_colors(rows, width, color_type, bit_depth, quantize):
+    """Losslessly drop opaque alpha and, when quantizing, convert to a palette"""
+    if bit_depth != 8 or color_type not in (2, 6):
+        return rows, color_type, None, None
+
+    channels = PNG_CHANNELS[color_type]
+    pixels = b''.join(rows)
+
+    if color_type == 6 and not pixels[3::4].strip(b'\xff'):
+        rgb = bytearray(len(pixels) // 4 * 3)
+        for c in range(3):
+            rgb[c::3] = pixels[c::4]
+        pixels = bytes(rgb)
+        color_type, channels = 2, 3
+        rows = [pixels[i:i + width * 3] for i in range(0, len(pixels), width * 3)]
+
+    if not quantize:
+        return rows, color_type, None, None
+
+    colors = set()
+    tuples = list(zip(*(pixels[c::channels] for c in range(channels))))
+    for start in range(0, len(tuples), 4096):
+        colors.update(tuples[start:start + 4096])
+        if len(colors) > 256:
+            return rows, color_type, None, None
+
+    # Translucent entries first so tRNS can stop at the last one
+    ordered = sorted(colors, key=lambda color: (color[3] if channels == 4 else 255, color))
+    index = {color: i for i, color in enumerate(ordered)}
+    palette = b''.join(bytes(color[:3]) for color in ordered)
+    transparency = None
+    if channels == 4:
+        alphas = bytes(color[3] for color in ordered).rstrip(b'\xff')
+        transparency = alphas or None
+
+    indexed = bytes(map(index.__getitem__, tuples))
+    rows = [indexed[i:i + width] for i in range(0, len(indexed), width)]
+    return rows, 3, palette, transparency
+
+
+def optimize_png(data, quantize=False, keep_chunks=(b'tRNS',)):
+    """Re-encode a PNG with the best filtering at maximum zlib level"""
+    chunks = read_png_chunks(data)
+    header = dict(chunks).get(b'IHDR')
+    if header is None:
+        raise ImageFormatError('PNG has no IHDR chunk')
+    width, height, bit_depth, color_type, _, _, interlace = struct.unpack('>IIBBBBB', header)
+    if interlace:
+        return data
+
+    channels = PNG_CHANNELS[color_type]
+    bits_per_pixel = channels * bit_depth
+    bpp = max(1, bits_per_pixel // 8)
+    stride = (width * bits_per_pixel + 7) // 8
+
+    raw = zlib.decompress(b''.join(body for chunk_type, body in chunks if chunk_type == b'IDAT'))
+    rows = unfilter_scanlines(raw, height, stride, bpp)
+
+    original_color_type = color_type
+    # A colour-keyed tRNS on truecolour images has no palette equivalent here
+    has_color_key = any(chunk_type == b'tRNS' for chunk_type, _ in chunks)
+    rows, color_type, palette, transparency = _reduce_colors(
+        rows, width, color_type, bit_depth, quantize and not has_color_key
+    )
+    channels = PNG_CHANNELS[color_type]
+    bpp = max(1, channels * bit_depth // 8)
+    stride = (width * channels * bit_depth + 7) // 8
+
+    _, idat = compress_scanlines(rows, stride, bpp)
+
+    output = [PNG_SIGNATURE, png_chunk(b'IHDR', struct.pack(
+        '>IIBBBBB', width, height, bit_depth, color_type, 0, 0, 0
+    ))]
+    if color_type == original_color_type:
+        # Unchanged layout: keep the original palette and whitelisted ancillaries
+        for chunk_type, body in chunks:
+            if chunk_type == b'PLTE' or chunk_type in keep_chunks:
+                output.append(png_chunk(chunk_type, body))
+    else:
+        if palette:
+            output.append(png_chunk(b'PLTE', palette))
+        if transparency:
+            output.append(png_chunk(b'tRNS', transparency))
+    output.append(png_chunk(b'IDAT', idat))
+    output.append(png_chunk(b'IEND', b''))
+    return b''.join(output)
+
+
+def png_image(width, height, idat, color_type=2, bit_depth=8):
+    """Wrap a compressed IDAT stream in a minimal PNG"""
+    return b''.join([
+        PNG_SIGNATURE,
+        png_chunk(b'IHDR', struct.pack('>IIBBBBB', width, height, bit_depth, color_type, 0, 0, 0)),
+        png_chunk(b'IDAT', idat),
+        png_chunk(b'IEND', b'')
+    ])
+
+
+def encode_png(width, height, rows, color_type=2, bit_depth=8):
+    """Encode unfiltered scanlines with one fixed filter and deflate pass
+
+    The filter search in compress_scanlines is for shipped media, which is
+    optimized once per build; this is the fast path for generated images.
+    """
+    channels = PNG_CHANNELS[color_type]
+    bpp = max(1, channels * bit_depth // 8)
+    stride = (width * channels * bit_depth + 7) // 8
+    lines = filter_rows([FAST_FILTER], rows, stride, bpp)[FAST_FILTER]
+    filtered = b''.join(bytes((FAST_FILTER,)) + line for line in lines)
+    return png_image(width, height, zlib.compress(filtered, FAST_DEFLATE_LEVEL), color_type, bit_depth)
+
+
+# ----------------------------------------------------------------------
+# GIF
+# ----------------------------------------------------------------------
+
+def _skip_sub_blocks(data, pos):
+    while True:
+        size = data[pos]
+        pos += 1
+        if size == 0:
+            return pos
+        pos += size
+
+
+def optimize_gif(data):
+    """Strip comment, plain-text and non-loop application blocks from a GIF"""
+    if data[:6] not in (b'GIF87a', b'GIF89a'):
+        raise ImageFormatError('Not a GIF file')
+    flags = data[10]
+    pos = 13
+    if flags & 0x80:
+        pos += 3 * (2 << (flags & 0x07))
+    output = [data[:pos]]
+
+    while pos < len(data):
+        block = data[pos]
+        if block == 0x3B:
+            output.append(b'\x3b')
+            break
+        if block == 0x21:
+            label = data[pos + 1]
+            end = _skip_sub_blocks(data, pos + 2)
+            keep = label == 0xF9
+            if label == 0xFF:
+                keep = data[pos + 3:pos + 14] in GIF_KEEP_APPLICATIONS
+            if keep:
+                output.append(data[pos:end])
+            pos = end
+        elif block == 0x2C:
+            image_flags = data[pos + 9]
+            start = pos
+            pos += 10
+            if image_flags & 0x80:
+                pos += 3 * (2 << (image_flags & 0x07))
+            pos = _skip_sub_blocks(data, pos + 1)
+            output.append(data[start:pos])
+        else:
+            raise ImageFormatError(f'Unexpected GIF block 0x{block:02x}')
+    return b''.join(output)
+
+
+# ----------------------------------------------------------------------
+# Cached optimizer
+# ----------------------------------------------------------------------
+
+class ImageOptimizer:
+    """Optimizes PNG/GIF files, caching results by content hash"""
+
+    def __init__(self, cache_dir=None, quantize=False):
+        self.cache_dir = Path(cache_dir) if cache_dir else None
+        self.quantize = quantize
+        if self.cache_dir:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+
+    def _cache_key(self, data, suffix):
+        options = f'v1:quantize={int(self.quantize)}:{suffix}'.encode('ascii')
+        return hashlib.sha256(options + data).hexdigest()
+
+    def optimize_bytes(self, data, suffix):
+        if suffix == '.png':
+            optimized = optimize_png(data, quantize=self.quantize)
+        elif suffix == '.gif':
+            optimized = optimize_gif(data)
+        else:
+            return data
+        return optimized if len(optimized) < len(data) else data
+
+    def optimize_file(self, path):
+        """Rewrite a file in place when a smaller encoding exists"""
+        path = Path(path)
+        suffix = path.suffix.lower()
+        with open(path, 'rb') as f:
+            data = f.read()
+
+        key = self._cache_key(data, suffix)
+        cached_path = self.cache_dir / f'{key}{suffix}' if self.cache_dir else None
+        cached = cached_path is not None and cached_path.exists()
+        if cached:
+            with open(cached_path, 'rb') as f:
+                optimized = f.read()
+        else:
+            optimized = self.optimize_bytes(data, suffix)
+            if cached_path is not None:
+                with open(cached_path, 'wb') as f:
+                    f.write(optimized)
+                # Optimized output is a fixed point, so re-runs on it are free too
+                with open(self.cache_dir / f'{self._cache_key(optimized, suffix)}{suffix}', 'wb') as f:
+                    f.write(optimized)
+
+        if len(optimized) < len(data):
+            with open(path, 'wb') as f:
+                f.write(optimized)
+
+        return {
+            'original_bytes': len(data),
+            'optimized_bytes': min(len(optimized), len(data)),
+            'saved_bytes': max(0, len(data) - len(optimized)),
+            'cached': cached
+        }
@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+"""
+VIB34D Rotation Keyframes
+Precomputes a theme's 4D rotation chain and projection as a timeline of
+Float32 matrices in one vectorized NumPy batch, so clients interpolate
+keyframes instead of rebuilding rotXW * rotYZ * rotZW * rotYW per pixel
+
+Chains mirror core/GeometryManager.js with the audio uniforms at zero;
+projections mirror core/ProjectionManager.js. NumPy is optional, as in
+vib34d_geometry.
+"""
+
+import functools
+import hashlib
+
+try:
+    import numpy as np
+    KEYFRAMES_AVAILABLE = True
+except ImportError:
+    np = None
+    KEYFRAMES_AVAILABLE = False
+
+DEFAULT_DURATION = 10.0
+MAX_DURATION = 120.0
+DEFAULT_FPS = 30
+MAX_FPS = 120
+PROJECTIONS = ['perspective', 'orthographic', 'stereographic']
+
+# Matrix index pairs for each rotation plane (GLSL rotXW etc.)
+PLANES = {'XY': (0, 1), 'XZ': (0, 2), 'YZ': (1, 2), 'XW': (0, 3), 'YW': (1, 3), 'ZW': (2, 3)}
+
+# Shader geometry -> (baseSpeed factor, terms left to right); each term is
+# (plane, time coefficient, morph coefficient): angle = t * k * baseSpeed + morph * m
+ROTATION_CHAINS = {
+    'hypercube': (1.0, [
+        ('YW', -0.22, 0.3),
+        ('XW', 0.33, 0.45),
+        ('YZ', 0.28 * 1.1, 0.0),
+        ('ZW', 0.25 * 0.9, 0.0)
+    ]),
+    'hypersphere': (0.85, [
+        ('XW', 0.38 * 1.05, 0.0),
+        ('YZ', 0.31, 0.6),
+        ('YW', -0.24 * 0.95, 0.0)
+    ]),
+    'hypertetrahedron': (1.15, [
+        ('XW', 0.28 * 0.95, 0.0),
+        ('YW', 0.36 * 1.05, 0.4 * 1.05),
+        ('ZW', 0.32, 0.0)
+    ])
+}
+
+# Dashboard themes without a dedicated shader fall back to the hypercube
+# chain, as GeometryManager.getGeometry does
+THEME_CHAINS = {'tetrahedron': 'hypertetrahedron', 'sphere': 'hypersphere'}
+
+# Floats per keyframe: time, 4 angles, rotation mat4, projective mat4 + offset vec4
+KEYFRAME_STRIDE = 1 + 4 + 16 + 16 + 4
+
+
+class KeyframeError(ValueError):
+    """Raised for unknown themes or projections and unusable timeline options"""
+
+
+def chain_for_theme(theme):
+    return THEME_CHAINS.get(theme, 'hypercube')
+
+
+def theme_profile(visuals, theme):
+    """(rotationSpeed, morphFactor) from visuals.json themes[theme].parameters"""
+    themes = (visuals or {}).get('themes') or {}
+    if theme not in themes:
+        raise KeyframeError(f'Unknown theme: {theme}')
+    parameters = themes[theme].get('parameters') or {}
+    return float(parameters.get('rotationSpeed', 0.5)), float(parameters.get('morphFactor', 0.5))
+
+
+def parse_timeline_options(query):
+    """(duration, fps, projection) from parsed query parameters"""
+    def first(name):
+        return (query.get(name) or [None])[0]
+
+    try:
+        duration = float(first('duration') or DEFAULT_DURATION)
+        fps = int(first('fps') or DEFAULT_FPS)
+    except ValueError:
+        raise KeyframeError('duration must be a number and fps an integer')
+    if not 0 < duration <= MAX_DURATION:
+        raise KeyframeError(f'duration must be in (0, {MAX_DURATION:g}] seconds')
+    if not 1 <= fps <= MAX_FPS:
+        raise KeyframeError(f'fps must be between 1 and {MAX_FPS}')
+    projection = first('projection') or PROJECTIONS[0]
+    if projection not in PROJECTIONS:
+        raise KeyframeError(f'Unknown projection: {projection}')
+    return duration, fps, projection
+
+
+def rotation_matrices(plane, angles):
+    """(F, 4, 4) rotations in one plane, same convention as the GLSL helpers"""
+    i, j = PLANES[plane]
+    c, s = np.cos(angles), np.sin(angles)
+    matrices = np.broadcast_to(np.eye(4), (len(angles), 4, 4)).copy()
+    matrices[:, i, i] = c
+    matrices[:, j, j] = c
+    matrices[:, i, j] = s
+    matrices[:, j, i] = -s
+    return matrices
+
+
+def chain_matrices(chain, rotation_speed, morph, times):
+    """(angles (F, 4), rotations (F, 4, 4)) of one chain at each time"""
+    base_factor, terms = ROTATION_CHAINS[chain]
+    base_speed = rotation_speed * base_factor
+    angles = np.zeros((len(times), 4))
+    rotation = np.broadcast_to(np.eye(4), (len(times), 4, 4)).copy()
+    for index, (plane, time_coefficient, morph_coefficient) in enumerate(terms):
+        angles[:, index] = times * time_coefficient * base_speed + morph * morph_coefficient
+        rotation = rotation @ rotation_matrices(plane, angles[:, index])
+    return angles, rotation
+
+
+def projection_parameters(projection, morph):
+    """Projective map h = A * p + b, then mix(h.xyz / max(minW, h.w), p.xyz, orthoMix)"""
+    def smoothstep(x):
+        x = min(1.0, max(0.0, x))
+        return x * x * (3.0 - 2.0 * x)
+
+    if projection == 'perspective':
+        distance = max(0.2, 2.5 * (1.0 + morph * 0.4))
+        return {'mode': projection, 'distance': distance, 'scale': distance, 'offsetW': distance,
+                'minW': 0.1, 'orthoMix': 0.0}
+    if projection == 'orthographic':
+        # Orthographic blends toward a fixed 2.5 perspective as morph rises
+        return {'mode': projection, 'distance': 2.5, 'scale': 2.5, 'offsetW': 2.5,
+                'minW': 0.1, 'orthoMix': 1.0 - smoothstep(morph)}
+    pole = -1.5
+    return {'mode': projection, 'poleW': pole, 'scale': -pole, 'offsetW': -pole,
+            'minW': 0.001, 'orthoMix': smoothstep(morph * 0.8)}
+
+
+@functools.lru_cache(maxsize=64)
+def build_timeline(chain, rotation_speed, morph, duration=DEFAULT_DURATION, fps=DEFAULT_FPS,
+                   projection='perspective'):
+    """(Float32 bytes, descriptor, etag) for one rotation profile"""
+    if chain not in ROTATION_CHAINS:
+        raise KeyframeError(f'Unknown rotation chain: {chain}')
+    if projection not in PROJECTIONS:
+        raise KeyframeError(f'Unknown projection: {projection}')
+    frames = int(round(duration * fps)) + 1
+    times = np.arange(frames, dtype=np.float64) / fps
+    angles, rotation = chain_matrices(chain, rotation_speed, morph, times)
+
+    params = projection_parameters(projection, morph)
+    scale = np.diag([params['scale']] * 3 + [1.0])
+    projective = scale @ rotation
+    offset = np.zeros((frames, 4))
+    offset[:, 3] = params['offsetW']
+
+    # Matrices are written column-major so they upload straight to a GLSL mat4
+    keyframes = np.concatenate([
+        times[:, None],
+        angles,
+        rotation.transpose(0, 2, 1).reshape(frames, 16),
+        projective.transpose(0, 2, 1).reshape(frames, 16),
+        offset
+    ], axis=1).astype('<f4')
+    data = keyframes.tobytes()
+
+    descriptor = {
+        'format': 'vib34d-keyframes',
+        'version': 1,
+        'chain': chain,
+        'planes': [plane for plane, _, _ in ROTATION_CHAINS[chain][1]],
+        'rotationSpeed': rotation_speed,
+        'morphFactor': morph,
+        'duration': duration,
+        'fps': fps,
+        'frameCount': frames,
+        'projection': params,
+        'endianness': 'little',
+        'byteLength': len(data),
+        'stride': KEYFRAME_STRIDE,
+        'layout': {
+            'time': {'offset': 0, 'components': 1},
+            'angles': {'offset': 1, 'components': 4},
+            'rotation': {'offset': 5, 'components': 16, 'order': 'column-major'},
+            'projective': {'offset': 21, 'components': 16, 'order': 'column-major'},
+            'projectiveOffset': {'offset': 37, 'components': 4}
+        }
+    }
+    return data, descriptor, '"' + hashlib.sha1(data).hexdigest()[:20] + '"'
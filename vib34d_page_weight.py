@@ -0,0 +1,200 @@
+#!/usr/bin/env python3
+"""
+VIB34D Page Weight
+Crawls each entry page on its own through the asset graph and reports
+what a cold load costs: request count, raw and gzip transfer bytes, and
+the waterfall depth, i.e. how many dependent round trips (page -> script
+-> import -> fetch) it takes before the last file is even requested.
+Per-page budgets in page-budgets.json turn the report into a build gate.
+
+Usage:
+    python3 vib34d_page_weight.py [page.html ...] [--root DIR] [--budgets page-budgets.json] [--json report.json]
+"""
+
+import argparse
+import gzip
+import importlib.util
+import json
+import os
+import sys
+from collections import deque
+from pathlib import Path
+
+from vib34d_asset_graph import AssetGraph
+
+BUDGETS_FILE = 'page-budgets.json'
+
+# Budget key -> page report field it caps
+BUDGET_METRICS = {
+    'max_requests': 'requests',
+    'max_raw_bytes': 'raw_bytes',
+    'max_transfer_bytes': 'transfer_bytes',
+    'max_waterfall_depth': 'waterfall_depth'
+}
+
+# What a server compressing on the fly typically sends
+GZIP_LEVEL = 6
+
+
+class BudgetError(Exception):
+    """Raised when the budgets file is unreadable or names an unknown metric"""
+
+
+def load_budgets(path=BUDGETS_FILE):
+    """{'default': {...}, 'pages': {page: {...}}}, or None when there is no budgets file"""
+    if not os.path.exists(path):
+        return None
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            budgets = json.load(f)
+    except (OSError, json.JSONDecodeError) as e:
+        raise BudgetError(f'Cannot read {path}: {e}')
+    for scope, limits in [('default', budgets.get('default', {}))] + list(budgets.get('pages', {}).items()):
+        unknown = sorted(set(limits) - set(BUDGET_METRICS))
+        if unknown:
+            raise BudgetError(f'{path}: unknown budget {unknown[0]!r} for {scope} '
+                              f'(expected {", ".join(BUDGET_METRICS)})')
+    return budgets
+
+
+def budget_for(budgets, page):
+    if not budgets:
+        return {}
+    return {**budgets.get('default', {}), **budgets.get('pages', {}).get(page, {})}
+
+
+class PageWeightAnalyzer:
+    """Per-page cold-load cost; file sizes are measured once and shared across pages"""
+
+    def __init__(self, root):
+        self.root = Path(root)
+        self.sizes = {}
+
+    def _size(self, relative):
+        """(raw bytes, gzip bytes)"""
+        if relative not in self.sizes:
+            with open(self.root / relative, 'rb') as f:
+                data = f.read()
+            self.sizes[relative] = (len(data), len(gzip.compress(data, GZIP_LEVEL, mtime=0)))
+        return self.sizes[relative]
+
+    def analyze(self, page):
+        graph = AssetGraph(self.root)
+        graph.crawl([page])
+        if page not in graph.reachable:
+            return {'page': page, 'error': 'Entry page not found'}
+
+        # A file can only be requested once whatever references it has arrived
+        level = {page: 0}
+        parent = {page: None}
+        queue = deque([page])
+        while queue:
+            relative = queue.popleft()
+            for target in sorted(graph.edges.get(relative, ())):
+                if target not in level:
+                    level[target] = level[relative] + 1
+                    parent[target] = relative
+                    queue.append(target)
+
+        waterfall = []
+        by_type = {}
+        raw_total = transfer_total = 0
+        for relative in sorted(level, key=lambda name: (level[name], name)):
+            raw, transfer = self._size(relative)
+            raw_total += raw
+            transfer_total += transfer
+            if level[relative] == len(waterfall):
+                waterfall.append({'level': level[relative], 'requests': 0, 'transfer_bytes': 0})
+            waterfall[-1]['requests'] += 1
+            waterfall[-1]['transfer_bytes'] += transfer
+            kind = by_type.setdefault(Path(relative).suffix.lower() or '(none)',
+                                      {'requests': 0, 'raw_bytes': 0, 'transfer_bytes': 0})
+            kind['requests'] += 1
+            kind['raw_bytes'] += raw
+            kind['transfer_bytes'] += transfer
+
+        # Deepest file, heaviest first on ties, and the chain that discovers it
+        deepest = max(level, key=lambda name: (level[name], self._size(name)[1]))
+        critical_path = []
+        while deepest is not None:
+            critical_path.append(deepest)
+            deepest = parent[deepest]
+        critical_path.reverse()
+
+        return {
+            'page': page,
+            'requests': len(level),
+            'raw_bytes': raw_total,
+            'transfer_bytes': transfer_total,
+            'waterfall_depth': len(waterfall),
+            'critical_path': critical_path,
+            'critical_path_transfer_bytes': sum(self._size(name)[1] for name in critical_path),
+            'waterfall': waterfall,
+            'by_type': dict(sorted(by_type.items(), key=lambda item: -item[1]['transfer_bytes'])),
+            'missing': sorted({target for _, target in graph.missing}),
+            'external': sorted(graph.external)
+        }
+
+    def report(self, pages, budgets=None):
+        """{'pages': {page: report + budget}, 'violations': [...]}"""
+        result = {'pages': {}, 'violations': []}
+        for page in pages:
+            page_report = self.analyze(page)
+            limits = budget_for(budgets, page)
+            page_report['budget'] = limits
+            if 'error' in page_report:
+                if limits:
+                    result['violations'].append(f'{page}: {page_report["error"]}')
+            else:
+                for key, limit in limits.items():
+                    actual = page_report[BUDGET_METRICS[key]]
+                    if actual > limit:
+                        result['violations'].append(
+                            f'{page}: {BUDGET_METRICS[key]} {actual:,} exceeds budget {limit:,}')
+            result['pages'][page] = page_report
+        return result
+
+
+def main():
+    """Command line entry point"""
+    parser = argparse.ArgumentParser(description='VIB34D page weight and waterfall budget analyzer')
+    parser.add_argument('pages', nargs='*', help='Entry pages (default: the packager entry pages)')
+    parser.add_argument('--root', default='.')
+    parser.add_argument('--budgets', default=BUDGETS_FILE)
+    parser.add_argument('--json', metavar='PATH', help='Also write the full report as JSON')
+    args = parser.parse_args()
+
+    pages = args.pages
+    if not pages:
+        # The packager's file name has a dash, so load it by path
+        spec = importlib.util.spec_from_file_location(
+            'create_production_package', os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                                      'create-production-package.py'))
+        packager = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(packager)
+        pages = packager.DEFAULT_ENTRY_PAGES
+
+    try:
+        budgets = load_budgets(os.path.join(args.root, args.budgets))
+    except BudgetError as e:
+        print(f'❌ {e}')
+        sys.exit(1)
+    result = PageWeightAnalyzer(args.root).report(pages, budgets)
+    for page, page_report in result['pages'].items():
+        if 'error' in page_report:
+            print(f'   ❌ {page}: {page_report["error"]}')
+            continue
+        print(f'   📄 {page}: {page_report["requests"]} requests, '
+              f'{page_report["raw_bytes"] / 1024:.1f} KB raw / {page_report["transfer_bytes"] / 1024:.1f} KB gzip, '
+              f'waterfall depth {page_report["waterfall_depth"]}')
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(result, f, indent=2)
+        print(f'📄 Report: {args.json}')
+    for violation in result['violations']:
+        print(f'   ❌ Over budget: {violation}')
+    sys.exit(1 if result['violations'] else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""
+VIB34D Parameter Buffer Compiler
+Compiles theme and geometry parameters into one little-endian Float32
+buffer plus a small JSON index, so clients can upload uniforms straight
+from an ArrayBuffer without parsing JSON
+"""
+
+import json
+import math
+import os
+import re
+import struct
+import threading
+
+# (section name, source document, top-level key holding one record per entry)
+PARAMETER_SECTIONS = [
+    ('themes', 'config/visuals.json', 'themes'),
+    ('geometries', 'presets/visual-styles.json', 'geometries'),
+    ('presetStyles', 'presets/visual-styles.json', 'presetStyles')
+]
+
+BUFFER_ALIGNMENT = 16
+HEX_COLOR_RE = re.compile(r'^#(?:[0-9a-fA-F]{6}|[0-9a-fA-F]{8})$')
+
+
+def _color_to_floats(value):
+    """#rrggbb or #rrggbbaa to normalized RGBA floats"""
+    channels = [int(value[i:i + 2], 16) / 255.0 for i in range(1, len(value), 2)]
+    if len(channels) == 3:
+        channels.append(1.0)
+    return channels
+
+
+def flatten_numeric(value, prefix=''):
+    """Map dotted paths to float lists for every numeric leaf of a record"""
+    fields = {}
+    if isinstance(value, bool):
+        fields[prefix] = [1.0 if value else 0.0]
+    elif isinstance(value, (int, float)):
+        fields[prefix] = [float(value)]
+    elif isinstance(value, str) and HEX_COLOR_RE.match(value):
+        fields[prefix] = _color_to_floats(value)
+    elif isinstance(value, list) and value and all(
+            isinstance(item, (int, float)) and not isinstance(item, bool) for item in value):
+        fields[prefix] = [float(item) for item in value]
+    elif isinstance(value, dict):
+        for key, child in value.items():
+            fields.update(flatten_numeric(child, f'{prefix}.{key}' if prefix else key))
+    return fields
+
+
+def compile_section(records):
+    """Lay records out as fixed-stride rows; absent fields are NaN"""
+    flattened = {name: flatten_numeric(record) for name, record in records.items()
+                 if isinstance(record, dict)}
+
+    sizes = {}
+    for fields in flattened.values():
+        for path, floats in fields.items():
+            sizes[path] = max(sizes.get(path, 0), len(floats))
+
+    layout = {}
+    stride = 0
+    for path in sorted(sizes):
+        layout[path] = {'offset': stride, 'size': sizes[path]}
+        stride += sizes[path]
+
+    values = []
+    for name, fields in flattened.items():
+        row = [math.nan] * stride
+        for path, floats in fields.items():
+            offset = layout[path]['offset']
+            row[offset:offset + len(floats)] = floats
+        values.extend(row)
+
+    return values, {
+        'count': len(flattened),
+        'stride': stride,
+        'records': list(flattened),
+        'fields': layout
+    }
+
+
+def compile_parameter_buffer(documents):
+    """Build (buffer bytes, index) from {document path: parsed JSON}"""
+    chunks = []
+    sections = {}
+    byte_offset = 0
+
+    for section, document, key in PARAMETER_SECTIONS:
+        records = (documents.get(document) or {}).get(key)
+        if not isinstance(records, dict):
+            continue
+        values, layout = compile_section(records)
+        data = struct.pack(f'<{len(values)}f', *values)
+        padding = (-len(data)) % BUFFER_ALIGNMENT
+        chunks.append(data + bytes(padding))
+        sections[section] = {'source': document, 'byteOffset': byte_offset, **layout}
+        byte_offset += len(data) + padding
+
+    buffer = b''.join(chunks)
+    index = {
+        'format': 'vib34d-parameters',
+        'version': 1,
+        'dtype': 'float32',
+        'endianness': 'little',
+        'missing': 'NaN',
+        'byteLength': len(buffer),
+        'sections': sections
+    }
+    return buffer, index
+
+
+def load_parameter_documents(root, validator=None):
+    documents = {}
+    for _, document, _ in PARAMETER_SECTIONS:
+        pending = validator.pending_value(document) if validator else None
+        if pending is not None:
+            documents[document] = pending
+            continue
+        path = os.path.join(root, document)
+        if document not in documents and os.path.exists(path):
+            with open(path, 'r') as f:
+                documents[document] = json.load(f)
+    return documents
+
+
+class ParameterBufferCache:
+    """Recompiles the parameter buffer only when a source document changes, on disk or as an accepted config write"""
+
+    def __init__(self, root='.', validator=None):
+        self.root = root
+        self.validator = validator
+        self.lock = threading.Lock()
+        self.signature = None
+        self.buffer = b''
+        self.index = {}
+
+    def _signature(self):
+        signature = []
+        for _, document, _ in PARAMETER_SECTIONS:
+            path = os.path.join(self.root, document)
+            signature.append(os.stat(path).st_mtime_ns if os.path.exists(path) else None)
+        signature.append(self.validator.generation if self.validator else None)
+        return tuple(signature)
+
+    def get(self):
+        with self.lock:
+            signature = self._signature()
+            if signature != self.signature:
+                self.buffer, self.index = compile_parameter_buffer(load_parameter_documents(self.root, self.validator))
+                self.signature = signature
+            return self.buffer, self.index
@@ -0,0 +1,257 @@
+#!/usr/bin/env python3
+"""
+VIB34D Preset Resolver
+Applies the config/preset inheritance rules once on the server and
+memoizes the fully merged configuration for each hypercube face and
+visualizer role, ready to send as precompressed JSON
+
+Layers, lowest priority first:
+    1. behavior.json vib34dGeometries[geometry].defaultParameters
+    2. visuals.json themes[geometry]
+    3. theme-collections.json section -> visual-styles presetStyles[style]
+       and reactivity-presets (legacy presets follow their mappedTo link)
+    4. visual-styles.json visualizerTypes[role]
+    5. scroll-physics profile for the role, with _extends resolved
+    6. navigation-config edge mappings (bezel role only)
+"""
+
+import copy
+import gzip
+import hashlib
+import json
+import os
+import threading
+
+from vib34d_config_index import ConfigQueryError
+
+# Face index -> geometry/theme key, in the order the dashboard lays out its 8 faces
+FACE_GEOMETRIES = ['hypercube', 'tetrahedron', 'sphere', 'torus', 'kleinbottle', 'fractal', 'wave', 'crystal']
+ROLES = ['board', 'background', 'content', 'highlight', 'accent', 'bezel']
+ROLE_SCROLL_PROFILES = {'board': 'pageScroll', 'content': 'cardContentScroll'}
+
+RESOLVER_INPUTS = [
+    'config/visuals.json',
+    'config/behavior.json',
+    'config/content.json',
+    'presets/theme-collections.json',
+    'presets/visual-styles.json',
+    'presets/reactivity-presets.json',
+    'presets/scroll-physics-presets.json',
+    'presets/navigation-config.json'
+]
+
+
+def deep_merge(base, override):
+    """Recursive merge; a scalar over a {value: ...} wrapper sets its value"""
+    if isinstance(base, dict) and isinstance(override, dict):
+        merged = dict(base)
+        for key, value in override.items():
+            merged[key] = deep_merge(base[key], value) if key in base else copy.deepcopy(value)
+        return merged
+    if isinstance(base, dict) and 'value' in base and not isinstance(override, (dict, list)):
+        return {**base, 'value': override}
+    return copy.deepcopy(override)
+
+
+def resolve_extends(profiles, name, root, seen=()):
+    """Flatten a scroll profile's _extends chain (names may point at top-level keys)"""
+    if name in seen:
+        raise ConfigQueryError(422, f'Circular _extends chain: {" -> ".join(seen + (name,))}')
+    profile = profiles.get(name, root.get(name))
+    if not isinstance(profile, dict):
+        return {}
+    parent = profile.get('_extends')
+    own = {key: value for key, value in profile.items() if key != '_extends'}
+    return deep_merge(resolve_extends(profiles, parent, root, seen + (name,)), own) if parent else own
+
+
+class PresetResolver:
+    """Memoized per face/role resolution, invalidated when any input changes"""
+
+    def __init__(self, validator, root='.'):
+        self.validator = validator
+        self.root = root
+        self.lock = threading.Lock()
+        self.signature = None
+        self.documents = {}
+        self.resolved = {}
+
+    # ------------------------------------------------------------------
+    # Inputs
+    # ------------------------------------------------------------------
+
+    def _signature(self):
+        signature = []
+        for document in RESOLVER_INPUTS:
+            try:
+                stat = os.stat(os.path.join(self.root, document))
+                signature.append((stat.st_mtime_ns, stat.st_size))
+            except OSError:
+                signature.append(None)
+        # Accepted config writes are served before they reach disk
+        signature.append(self.validator.generation)
+        return tuple(signature)
+
+    def _refresh(self):
+        """Reload inputs and drop every memoized result if anything changed"""
+        signature = self._signature()
+        if signature == self.signature:
+            return
+        documents = {}
+        for document, state in zip(RESOLVER_INPUTS, signature):
+            if state is None:
+                continue
+            value, result = self.validator.validate_file(document)
+            if not result['valid']:
+                raise ConfigQueryError(422, f'{document} failed validation', {'errors': result['errors']})
+            documents[document] = value
+        self.documents = documents
+        self.resolved = {}
+        self.signature = signature
+
+    def _doc(self, document, *keys):
+        value = self.documents.get(document) or {}
+        for key in keys:
+            value = value.get(key) if isinstance(value, dict) else None
+        return value if value is not None else {}
+
+    # ------------------------------------------------------------------
+    # Resolution
+    # ------------------------------------------------------------------
+
+    def collections(self):
+        return list(self._doc('presets/theme-collections.json'))
+
+    def section_name(self, face):
+        for mapping in self._doc('presets/navigation-config.json', 'edgeMappings').values():
+            if mapping.get('targetFaceIndexForVisuals') == face:
+                return mapping.get('targetSectionName')
+        return self._doc('config/content.json', 'sections', str(face)).get('name')
+
+    def face_index(self, face):
+        """Accept a face index or a section name (case-insensitive)"""
+        if str(face).isdigit() and int(face) < len(FACE_GEOMETRIES):
+            return int(face)
+        for index in range(len(FACE_GEOMETRIES)):
+            name = self.section_name(index)
+            if name and name.lower() == str(face).lower():
+                return index
+        raise ConfigQueryError(404, f'Unknown face: {face}', {'faces': self.faces()})
+
+    def faces(self):
+        return [
+            {'face': index, 'geometry': geometry, 'section': self.section_name(index)}
+            for index, geometry in enumerate(FACE_GEOMETRIES)
+        ]
+
+    def _reactivity(self, name):
+        presets = self._doc('presets/reactivity-presets.json')
+        legacy = presets.get('legacyPresets', {}).get(name)
+        if legacy:
+            behavior = presets.get('interactionBehaviors', {}).get(legacy.get('mappedTo'), {})
+            return deep_merge(behavior, {'name': legacy.get('name'), 'description': legacy.get('description'),
+                                         'preset': name, 'parameters': legacy.get('parameters', {})})
+        behavior = presets.get('interactionBehaviors', {}).get(name)
+        return deep_merge(behavior, {'preset': name}) if behavior else None
+
+    def _resolve(self, face, role, collection):
+        geometry = FACE_GEOMETRIES[face]
+        section = self.section_name(face)
+        sources = []
+
+        # 1-2. Geometry defaults, then the face's theme
+        parameters = dict(self._doc('config/behavior.json', 'vib34dGeometries', geometry, 'defaultParameters'))
+        if parameters:
+            sources.append(f'behavior.vib34dGeometries.{geometry}')
+        theme = self._doc('config/visuals.json', 'themes', geometry)
+        if theme:
+            parameters = deep_merge(parameters, theme.get('parameters', {}))
+            sources.append(f'visuals.themes.{geometry}')
+
+        # 3. Theme collection section -> preset style + reactivity
+        style = reactivity = layout = None
+        section_config = self._doc('presets/theme-collections.json', collection, 'sections', section or '')
+        if section_config:
+            sources.append(f'theme-collections.{collection}.sections.{section}')
+            layout = section_config.get('layout')
+            style = self._doc('presets/visual-styles.json', 'presetStyles', section_config.get('style', ''))
+            if style:
+                parameters = deep_merge(parameters, style.get('parameters', {}))
+                sources.append(f'visual-styles.presetStyles.{section_config["style"]}')
+            reactivity = self._reactivity(section_config.get('reactivity'))
+            if reactivity:
+                sources.append(f'reactivity-presets.{section_config["reactivity"]}')
+
+        # 4. Role layer
+        layer = self._doc('presets/visual-styles.json', 'visualizerTypes', role)
+        if layer:
+            sources.append(f'visual-styles.visualizerTypes.{role}')
+
+        # 5. Scroll physics for roles that scroll
+        scroll = None
+        profile = ROLE_SCROLL_PROFILES.get(role)
+        physics = self._doc('presets/scroll-physics-presets.json')
+        if profile and physics:
+            scroll = resolve_extends(physics.get('profiles', {}), profile, physics)
+            sources.append(f'scroll-physics-presets.profiles.{profile}')
+
+        # 6. Bezels carry the navigation edges and drag parameters
+        navigation = None
+        if role == 'bezel':
+            nav = self._doc('presets/navigation-config.json')
+            navigation = {
+                'parameters': {
+                    name: entry.get('value') for name, entry in nav.get('navigationParameters', {}).items()
+                },
+                'edges': nav.get('edgeMappings', {}),
+                'interactionEvents': nav.get('interactionEvents', {})
+            }
+            sources.append('navigation-config')
+
+        return {
+            'face': face,
+            'section': section,
+            'geometry': geometry,
+            'role': role,
+            'collection': collection,
+            'theme': {key: value for key, value in theme.items() if key != 'parameters'},
+            'parameters': parameters,
+            'style': style or None,
+            'reactivity': reactivity,
+            'layout': layout,
+            'layer': layer or None,
+            'scroll': scroll,
+            'navigation': navigation,
+            'sources': sources
+        }
+
+    def get(self, face, role, collection=None):
+        """(json bytes, gzip bytes, etag) for one face/role, memoized"""
+        with self.lock:
+            self._refresh()
+            face = self.face_index(face)
+            if role not in ROLES:
+                raise ConfigQueryError(404, f'Unknown role: {role}', {'roles': ROLES})
+            collections = self.collections()
+            collection = collection or (collections[0] if collections else None)
+            if collections and collection not in collections:
+                raise ConfigQueryError(404, f'Unknown theme collection: {collection}',
+                                       {'collections': collections})
+
+            key = (face, role, collection)
+            if key not in self.resolved:
+                body = json.dumps(self._resolve(face, role, collection), separators=(',', ':')).encode('utf-8')
+                etag = '"' + hashlib.sha1(body).hexdigest()[:20] + '"'
+                self.resolved[key] = (body, gzip.compress(body, 9, mtime=0), etag)
+            return self.resolved[key]
+
+    def describe(self):
+        with self.lock:
+            self._refresh()
+            return {
+                'faces': self.faces(),
+                'roles': ROLES,
+                'collections': self.collections(),
+                'inputs': [document for document in RESOLVER_INPUTS if document in self.documents],
+                'memoized': len(self.resolved)
+            }
@@ -0,0 +1,360 @@
+#!/usr/bin/env python3
+"""
+VIB34D Preview Renderer
+CPU reference implementation of the lattice fragment shaders in
+core/GeometryManager.js and core/ShaderManager.js, evaluated with NumPy
+over a whole pixel grid at once. Renders still PNG previews (or short
+frame strips) for a visuals.json theme, cached on disk, so clients that
+cannot afford 33 WebGL contexts still get real imagery
+
+Audio uniforms are zero, matching a silent page. NumPy is optional, as in
+vib34d_geometry.
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+import zlib
+
+from vib34d_image_optimizer import FAST_DEFLATE_LEVEL, FAST_FILTER, png_image
+from vib34d_keyframes import KEYFRAMES_AVAILABLE, PROJECTIONS, ROTATION_CHAINS, chain_for_theme, chain_matrices
+
+if KEYFRAMES_AVAILABLE:
+    import numpy as np
+    from vib34d_keyframes import rotation_matrices
+
+PREVIEW_AVAILABLE = KEYFRAMES_AVAILABLE
+PREVIEW_VERSION = 2
+
+DEFAULT_SIZE = 256
+MIN_SIZE = 16
+MAX_SIZE = 512
+MAX_FRAMES = 16
+MAX_TIME = 3600.0
+MAX_FPS = 60
+# Pixels rendered per request across all frames: 256x256x16 or 512x512x4
+MAX_PIXELS = 1024 * 1024
+# The cache evicts least recently served previews beyond this size
+MAX_CACHE_BYTES = 64 * 1024 * 1024
+
+# core/HypercubeCore.js DEFAULT_STATE, overridden by the theme's parameters
+DEFAULT_UNIFORMS = {
+    'dimensions': 4.0, 'morphFactor': 0.5, 'rotationSpeed': 0.2, 'universeModifier': 1.0,
+    'patternIntensity': 1.0, 'gridDensity': 8.0, 'lineThickness': 0.03, 'shellWidth': 0.025,
+    'tetraThickness': 0.035, 'glitchIntensity': 0.0, 'colorShift': 0.0,
+    'primaryColor': [1.0, 0.2, 0.8], 'secondaryColor': [0.2, 1.0, 1.0], 'backgroundColor': [0.05, 0.0, 0.2]
+}
+# visuals.json names that differ from the core state keys
+THEME_PARAMETER_ALIASES = {'dimension': 'dimensions'}
+
+
+class PreviewError(ValueError):
+    """Raised for unknown themes/geometries and unusable render options"""
+
+
+def theme_uniforms(visuals, theme):
+    """Core defaults overlaid with one theme's parameters and colors"""
+    themes = (visuals or {}).get('themes') or {}
+    if theme not in themes:
+        raise PreviewError(f'Unknown theme: {theme}')
+    uniforms = dict(DEFAULT_UNIFORMS)
+    for name, value in (themes[theme].get('parameters') or {}).items():
+        name = THEME_PARAMETER_ALIASES.get(name, name)
+        if name in uniforms and isinstance(value, (int, float)):
+            uniforms[name] = float(value)
+    if themes[theme].get('baseColor'):
+        uniforms['primaryColor'] = themes[theme]['baseColor']
+    if themes[theme].get('accentColor'):
+        uniforms['secondaryColor'] = themes[theme]['accentColor']
+    return uniforms
+
+
+def parse_preview_options(query, theme):
+    """{geometry, width, height, time, frames, fps, projection} from parsed query parameters"""
+    def first(name, default=None):
+        return (query.get(name) or [default])[0]
+
+    try:
+        width = int(first('width', DEFAULT_SIZE))
+        height = int(first('height', width))
+        time = float(first('time', 0.0))
+        frames = int(first('frames', 1))
+        fps = float(first('fps', 10.0))
+    except ValueError:
+        raise PreviewError('width, height and frames must be integers; time and fps numbers')
+    if not (MIN_SIZE <= width <= MAX_SIZE and MIN_SIZE <= height <= MAX_SIZE):
+        raise PreviewError(f'width and height must be between {MIN_SIZE} and {MAX_SIZE}')
+    if not 0 <= time <= MAX_TIME:
+        raise PreviewError(f'time must be between 0 and {MAX_TIME:g} seconds')
+    if not 1 <= frames <= MAX_FRAMES or not 0 < fps <= MAX_FPS:
+        raise PreviewError(f'frames must be between 1 and {MAX_FRAMES}, fps in (0, {MAX_FPS}]')
+    if width * height * frames > MAX_PIXELS:
+        raise PreviewError(f'width * height * frames must be at most {MAX_PIXELS}')
+    # Snap to whole frame rates and to their frame grid, so nearby requests share one cached render
+    fps = max(1, round(fps))
+    time = round(time * fps) / fps
+    # Unknown geometry names fall back to hypercube, as GeometryManager.getGeometry does
+    geometry = (first('geometry') or chain_for_theme(theme)).lower()
+    geometry = geometry if geometry in ROTATION_CHAINS else 'hypercube'
+    projection = first('projection', PROJECTIONS[0])
+    if projection not in PROJECTIONS:
+        raise PreviewError(f'Unknown projection: {projection}')
+    return {'geometry': geometry, 'width': width, 'height': height, 'time': time,
+            'frames': frames, 'fps': fps, 'projection': projection}
+
+
+# ----------------------------------------------------------------------
+# GLSL built-ins
+# ----------------------------------------------------------------------
+
+def _smoothstep(edge0, edge1, x):
+    t = np.clip((x - edge0) / (edge1 - edge0), 0.0, 1.0)
+    return t * t * (3.0 - 2.0 * t)
+
+
+def _mix(a, b, t):
+    return a * (1.0 - t) + b * t
+
+
+def _normalize(v):
+    return v / np.linalg.norm(v, axis=-1, keepdims=True)
+
+
+def _rgb2hsv(c):
+    r, g, b = c[..., 0], c[..., 1], c[..., 2]
+    step_bg = (g >= b)[..., None]
+    p = np.where(step_bg, np.stack([g, b, np.zeros_like(r), np.full_like(r, -1.0 / 3.0)], -1),
+                 np.stack([b, g, np.full_like(r, -1.0), np.full_like(r, 2.0 / 3.0)], -1))
+    step_pr = (r >= p[..., 0])[..., None]
+    q = np.where(step_pr, np.stack([r, p[..., 1], p[..., 2], p[..., 0]], -1),
+                 np.stack([p[..., 0], p[..., 1], p[..., 3], r], -1))
+    d = q[..., 0] - np.minimum(q[..., 3], q[..., 1])
+    e = 1e-10
+    return np.stack([np.abs(q[..., 2] + (q[..., 3] - q[..., 1]) / (6.0 * d + e)), d / (q[..., 0] + e), q[..., 0]], -1)
+
+
+def _hsv2rgb(c):
+    k = np.array([1.0, 2.0 / 3.0, 1.0 / 3.0])
+    p = np.abs(_fract(c[..., :1] + k) * 6.0 - 3.0)
+    return c[..., 2:3] * _mix(1.0, np.clip(p - 1.0, 0.0, 1.0), c[..., 1:2])
+
+
+def _fract(x):
+    return x - np.floor(x)
+
+
+# ----------------------------------------------------------------------
+# core/ProjectionManager.js project4Dto3D
+# ----------------------------------------------------------------------
+
+def project_4d_to_3d(p4d, projection, u):
+    xyz, w = p4d[..., :3], p4d[..., 3:]
+    if projection == 'perspective':
+        distance = max(0.2, 2.5 * (1.0 + u['morphFactor'] * 0.4))
+        return xyz * (distance / np.maximum(0.1, distance + w))
+    if projection == 'orthographic':
+        perspective = xyz * (2.5 / np.maximum(0.1, 2.5 + w))
+        return _mix(xyz, perspective, _smoothstep(0.0, 1.0, u['morphFactor']))
+    pole = -1.5
+    denominator = w - pole
+    near = np.abs(denominator) < 0.001
+    projected = xyz * (-pole / np.where(near, 1.0, denominator))
+    projected = np.where(near, _normalize(xyz + 0.001) * 1000.0, projected)
+    return _mix(projected, xyz, _smoothstep(0.0, 1.0, u['morphFactor'] * 0.8))
+
+
+# ----------------------------------------------------------------------
+# core/GeometryManager.js calculateLattice
+# ----------------------------------------------------------------------
+
+def _rotate(p, w_coord, rotation):
+    return np.concatenate([p, w_coord[..., None]], -1) @ rotation.T
+
+
+def _hypercube_lattice(p, u, t, rotation, projection):
+    density = max(0.1, u['gridDensity'])
+    thickness = max(0.002, u['lineThickness'])
+
+    def grid(q, speed):
+        distance = np.abs(_fract(q * density * 0.5 + t * speed) - 0.5)
+        return _smoothstep(0.5, 0.5 - thickness, distance.max(-1))
+
+    lattice = grid(p, 0.01)
+    dim_factor = _smoothstep(3.0, 4.5, u['dimensions'])
+    if dim_factor > 0.01:
+        w_coord = (np.sin(p[..., 0] * 1.4 - p[..., 1] * 0.7 + p[..., 2] * 1.5 + t * 0.25)
+                   * np.cos(np.linalg.norm(p, axis=-1) * 1.1 - t * 0.35)
+                   * dim_factor * (0.4 + u['morphFactor'] * 0.6))
+        projected = project_4d_to_3d(_rotate(p, w_coord, rotation), projection, u)
+        lattice = _mix(lattice, grid(projected, 0.015), _smoothstep(0.0, 1.0, u['morphFactor']))
+    return np.power(lattice, 1.0 / max(0.1, u['universeModifier']))
+
+
+def _hypersphere_lattice(p, u, t, rotation, projection):
+    density = max(0.1, u['gridDensity'] * 0.7)
+    shell_width = max(0.005, u['shellWidth'])
+
+    def shells(radius):
+        phase = radius * density * 6.28318 - t * u['rotationSpeed'] * 0.8
+        return _smoothstep(1.0 - shell_width, 1.0, 0.5 + 0.5 * np.sin(phase))
+
+    radius = np.linalg.norm(p, axis=-1)
+    lattice = shells(radius)
+    dim_factor = _smoothstep(3.0, 4.5, u['dimensions'])
+    if dim_factor > 0.01:
+        w_coord = (np.cos(radius * 2.5 - t * 0.55)
+                   * np.sin(p[..., 0] * 1.0 + p[..., 1] * 1.3 - p[..., 2] * 0.7 + t * 0.2)
+                   * dim_factor * (0.5 + u['morphFactor'] * 0.5))
+        projected = project_4d_to_3d(_rotate(p, w_coord, rotation), projection, u)
+        lattice = _mix(lattice, shells(np.linalg.norm(projected, axis=-1)), _smoothstep(0.0, 1.0, u['morphFactor']))
+    return np.power(np.maximum(0.0, lattice), max(0.1, u['universeModifier']))
+
+
+def _hypertetrahedron_lattice(p, u, t, rotation, projection):
+    density = max(0.1, u['gridDensity'] * 0.65)
+    thickness = max(0.003, u['tetraThickness'])
+    normals = _normalize(np.array([[1, 1, 1], [-1, -1, 1], [-1, 1, -1], [1, -1, -1]], dtype=np.float64))
+
+    def planes(q, speed):
+        cell = _fract(q * density * 0.5 + 0.5 + t * speed) - 0.5
+        return 1.0 - _smoothstep(0.0, thickness, np.abs(cell @ normals.T).min(-1))
+
+    lattice = planes(p, 0.005)
+    dim_factor = _smoothstep(3.0, 4.5, u['dimensions'])
+    if dim_factor > 0.01:
+        w_coord = (np.cos(p[..., 0] * 1.8 - p[..., 1] * 1.5 + p[..., 2] * 1.2 + t * 0.24)
+                   * np.sin(np.linalg.norm(p, axis=-1) * 1.4 + t * 0.18)
+                   * dim_factor * (0.45 + u['morphFactor'] * 0.55))
+        projected = project_4d_to_3d(_rotate(p, w_coord, rotation), projection, u)
+        lattice = _mix(lattice, planes(projected, 0.008), _smoothstep(0.0, 1.0, u['morphFactor']))
+    return np.power(np.maximum(0.0, lattice), max(0.1, u['universeModifier']))
+
+
+LATTICES = {
+    'hypercube': _hypercube_lattice,
+    'hypersphere': _hypersphere_lattice,
+    'hypertetrahedron': _hypertetrahedron_lattice
+}
+
+
+# ----------------------------------------------------------------------
+# Base fragment shader main()
+# ----------------------------------------------------------------------
+
+def render_frame(geometry, u, width, height, t, projection='perspective'):
+    """(height, width, 3) uint8 frame, top row first"""
+    lattice_fn = LATTICES[geometry]
+    rotation = chain_matrices(geometry, u['rotationSpeed'], u['morphFactor'], np.array([t]))[1][0]
+    background = np.array(u['backgroundColor'], dtype=np.float64)
+    primary = np.array(u['primaryColor'], dtype=np.float64)
+
+    # v_uv runs bottom-up in GL; PNG rows run top-down
+    x = (np.arange(width) + 0.5) / width
+    y = 1.0 - (np.arange(height) + 0.5) / height
+    aspect = np.array([width / height, 1.0])
+    uv = (np.stack(np.meshgrid(x, y), -1) * 2.0 - 1.0) * aspect
+
+    cam_y = t * 0.05 * u['rotationSpeed']
+    cam_x = np.sin(t * 0.03 * u['rotationSpeed']) * 0.15
+    cam = (rotation_matrices('XY', np.array([cam_x])) @ rotation_matrices('YZ', np.array([cam_y])))[0][:3, :3]
+
+    def lattice_color(screen_uv):
+        ray = _normalize(np.concatenate([screen_uv, np.ones(screen_uv.shape[:-1] + (1,))], -1)) @ cam.T
+        point = ray * 1.5
+        lattice = lattice_fn(point, u, t, rotation, projection)[..., None]
+        color = _mix(background, primary, lattice)
+        if abs(u['colorShift']) > 0.01:
+            hsv = _rgb2hsv(color)
+            hsv[..., 0] = _fract(hsv[..., 0] + u['colorShift'] * 0.5)
+            color = _hsv2rgb(hsv)
+        return color, point
+
+    color, point = lattice_color(uv)
+    color = color * (0.8 + u['patternIntensity'] * 0.7)
+    if u['glitchIntensity'] > 0.001:
+        glitch = (u['glitchIntensity'] * (0.5 + 0.5 * np.sin(t * 8.0 + point[..., 1] * 10.0)))[..., None]
+        offset_r = np.stack([np.full_like(point[..., 0], np.cos(t * 25.0)),
+                             np.sin(t * 18.0 + point[..., 0] * 5.0)], -1) * glitch * 0.2 * aspect
+        offset_b = np.stack([np.sin(t * 19.0 + point[..., 1] * 6.0),
+                             np.full_like(point[..., 0], np.cos(t * 28.0))], -1) * glitch * 0.15 * aspect
+        color_r, _ = lattice_color(uv + offset_r / aspect)
+        color_b, _ = lattice_color(uv + offset_b / aspect)
+        color = np.stack([color_r[..., 0], color[..., 1], color_b[..., 2]], -1)
+        color = color * (0.8 + u['patternIntensity'] * 0.7)
+    color = np.power(np.clip(color, 0.0, 1.5), 0.9)
+    return (np.clip(color, 0.0, 1.0) * 255.0 + 0.5).astype(np.uint8)
+
+
+def render_preview(u, options):
+    """PNG bytes; several frames are stacked top to bottom as one strip"""
+    frames = [
+        render_frame(options['geometry'], u, options['width'], options['height'],
+                     options['time'] + index / options['fps'], options['projection'])
+        for index in range(options['frames'])
+    ]
+    image = np.concatenate(frames, axis=0).reshape(len(frames) * options['height'], -1)
+    # The image optimizer's fixed Up filter, vectorized: uint8 subtraction wraps modulo 256
+    filtered = np.empty((image.shape[0], image.shape[1] + 1), dtype=np.uint8)
+    filtered[:, 0] = FAST_FILTER
+    filtered[0, 1:] = image[0]
+    filtered[1:, 1:] = image[1:] - image[:-1]
+    return png_image(options['width'], image.shape[0], zlib.compress(filtered.tobytes(), FAST_DEFLATE_LEVEL))
+
+
+class PreviewCache:
+    """Rendered previews on disk, keyed by theme uniforms and render options, capped at max_bytes"""
+
+    def __init__(self, cache_dir, max_bytes=MAX_CACHE_BYTES):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+
+    def key(self, theme, u, options):
+        payload = json.dumps([PREVIEW_VERSION, theme, u, options], sort_keys=True).encode('utf-8')
+        return hashlib.sha256(payload).hexdigest()[:32]
+
+    def get(self, visuals, theme, options):
+        """(png bytes, etag, cached)"""
+        u = theme_uniforms(visuals, theme)
+        key = self.key(theme, u, options)
+        path = os.path.join(self.cache_dir, f'{key}.png')
+        try:
+            with open(path, 'rb') as f:
+                png = f.read()
+            # mtime is the LRU clock; atime is unreliable on noatime mounts
+            os.utime(path)
+            return png, f'"{key}"', True
+        except FileNotFoundError:
+            pass
+
+        png = render_preview(u, options)
+        os.makedirs(self.cache_dir, exist_ok=True)
+        # Concurrent renders of the same key race harmlessly to the same bytes
+        handle, temp_path = tempfile.mkstemp(dir=self.cache_dir, suffix='.tmp')
+        with os.fdopen(handle, 'wb') as f:
+            f.write(png)
+        os.replace(temp_path, path)
+        self.evict()
+        return png, f'"{key}"', False
+
+    def evict(self):
+        """Remove least recently served previews until the cache fits in max_bytes; returns bytes freed"""
+        entries = []
+        for name in os.listdir(self.cache_dir):
+            if name.endswith('.png'):
+                try:
+                    stat = os.stat(os.path.join(self.cache_dir, name))
+                except FileNotFoundError:
+                    continue
+                entries.append((stat.st_mtime_ns, stat.st_size, name))
+        total = sum(size for _, size, _ in entries)
+        freed = 0
+        for _, size, name in sorted(entries):
+            if total - freed <= self.max_bytes:
+                break
+            try:
+                os.remove(os.path.join(self.cache_dir, name))
+            except FileNotFoundError:
+                pass
+            freed += size
+        return freed
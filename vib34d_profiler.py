@@ -0,0 +1,203 @@
+#!/usr/bin/env python3
+"""
+VIB34D Live Profiler
+Samples every thread's Python stack with sys._current_frames() for a few
+seconds and folds the samples into collapsed stacks ("a;b;c count"),
+ready for flamegraph.pl or speedscope; plus tracemalloc snapshots with a
+diff against the previous one. Both run inside the live server process.
+
+Sampling costs one frame walk per thread per tick, so nothing is slowed
+down outside the profiling window.
+"""
+
+import hmac
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+
+DEFAULT_SECONDS = 5.0
+MAX_SECONDS = 60.0
+DEFAULT_HZ = 100
+MAX_HZ = 1000
+DEFAULT_TOP = 25
+MEMORY_GROUPS = ['lineno', 'filename', 'traceback']
+ADMIN_TOKEN_ENV = 'VIB34D_ADMIN_TOKEN'
+ADMIN_TOKEN_HEADER = 'X-Admin-Token'
+LOOPBACK_ADDRESSES = {'127.0.0.1', '::1', '::ffff:127.0.0.1'}
+LOOPBACK_HOSTS = {'localhost', '127.0.0.1', '[::1]'}
+
+
+class ProfilerError(Exception):
+    """Raised with an HTTP status for bad options or a profile already running"""
+
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+def _loopback_host(host, port):
+    """Whether a Host header names this server by a loopback name and its bound port"""
+    if ':' not in host or host.endswith(']'):
+        name, host_port = host, '80'
+    else:
+        name, _, host_port = host.rpartition(':')
+    return name.lower() in LOOPBACK_HOSTS and host_port == str(port)
+
+
+def admin_allowed(client_address, headers, port, token=None):
+    """With an admin token configured it must match; otherwise only same-origin loopback callers"""
+    token = os.environ.get(ADMIN_TOKEN_ENV) if token is None else token
+    if token:
+        supplied = headers.get(ADMIN_TOKEN_HEADER) or ''
+        if supplied.startswith('Bearer '):
+            supplied = supplied[len('Bearer '):]
+        return hmac.compare_digest(supplied.encode('utf-8'), token.encode('utf-8'))
+    if client_address[0] not in LOOPBACK_ADDRESSES:
+        return False
+    # Origin and Host both come from the client: under DNS rebinding they name the attacker's
+    # domain, so Host must be a loopback name before it can vouch for Origin
+    host = headers.get('Host') or ''
+    if not _loopback_host(host, port):
+        return False
+    # The dashboard allows any origin, so refuse other sites running in a local browser
+    origin = headers.get('Origin')
+    return origin is None or origin == f'http://{host}'
+
+
+def _frame_label(code):
+    return f'{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})'
+
+
+def parse_profile_options(query):
+    """(seconds, hz) from parsed query parameters"""
+    def first(name, default):
+        return (query.get(name) or [default])[0]
+
+    try:
+        seconds = float(first('seconds', DEFAULT_SECONDS))
+        hz = int(first('hz', DEFAULT_HZ))
+    except ValueError:
+        raise ProfilerError(400, 'seconds must be a number and hz an integer')
+    if not 0 < seconds <= MAX_SECONDS:
+        raise ProfilerError(400, f'seconds must be in (0, {MAX_SECONDS:g}]')
+    if not 1 <= hz <= MAX_HZ:
+        raise ProfilerError(400, f'hz must be between 1 and {MAX_HZ}')
+    return seconds, hz
+
+
+class StackSampler:
+    """One sampling run at a time across all threads except the caller's"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+
+    def sample(self, seconds, hz):
+        """{'stacks': Counter of collapsed stacks, 'samples', 'threads', 'elapsed'}"""
+        if not self.lock.acquire(blocking=False):
+            raise ProfilerError(409, 'A profile is already running')
+        try:
+            own = threading.get_ident()
+            interval = 1.0 / hz
+            stacks = Counter()
+            labels = {}
+            seen = set()
+            ticks = 0
+            started = time.perf_counter()
+            deadline = started + seconds
+            while True:
+                names = {thread.ident: thread.name for thread in threading.enumerate()}
+                for ident, frame in sys._current_frames().items():
+                    if ident == own:
+                        continue
+                    path = []
+                    while frame is not None:
+                        code = frame.f_code
+                        label = labels.get(code)
+                        if label is None:
+                            label = labels[code] = _frame_label(code)
+                        path.append(label)
+                        frame = frame.f_back
+                    path.append(names.get(ident, f'thread-{ident}'))
+                    stacks[';'.join(reversed(path))] += 1
+                    seen.add(ident)
+                ticks += 1
+                now = time.perf_counter()
+                if now >= deadline:
+                    break
+                time.sleep(min(interval, deadline - now))
+            return {
+                'stacks': stacks,
+                'samples': ticks,
+                'threads': len(seen),
+                'elapsed': time.perf_counter() - started
+            }
+        finally:
+            self.lock.release()
+
+
+def collapsed_stacks(stacks):
+    """Brendan Gregg's folded format, heaviest stacks first"""
+    return ''.join(f'{stack} {count}\n' for stack, count in stacks.most_common())
+
+
+class MemoryTracker:
+    """tracemalloc top allocations, diffed against the snapshot taken by the previous call"""
+
+    def __init__(self, frames=1):
+        self.frames = frames
+        self.lock = threading.Lock()
+        self.previous = None
+
+    def _statistic(self, stat, group):
+        where = [f'{frame.filename}:{frame.lineno}' for frame in stat.traceback]
+        entry = {
+            'where': where if group == 'traceback' else where[0],
+            'size': stat.size,
+            'count': stat.count
+        }
+        if hasattr(stat, 'size_diff'):
+            entry['size_diff'] = stat.size_diff
+            entry['count_diff'] = stat.count_diff
+        return entry
+
+    def snapshot(self, top=DEFAULT_TOP, group='lineno'):
+        if group not in MEMORY_GROUPS:
+            raise ProfilerError(400, f'group must be one of {", ".join(MEMORY_GROUPS)}')
+        with self.lock:
+            started = not tracemalloc.is_tracing()
+            if started:
+                tracemalloc.start(self.frames)
+                self.previous = None
+            snapshot = tracemalloc.take_snapshot().filter_traces([
+                tracemalloc.Filter(False, tracemalloc.__file__),
+                tracemalloc.Filter(False, '<frozen importlib._bootstrap>')
+            ])
+            current, peak = tracemalloc.get_traced_memory()
+            result = {
+                'tracing_started': started,
+                'traced_bytes': current,
+                'peak_bytes': peak,
+                'overhead_bytes': tracemalloc.get_tracemalloc_memory(),
+                'group': group,
+                'top': [self._statistic(stat, group) for stat in snapshot.statistics(group)[:top]],
+                'diff': None
+            }
+            if self.previous is not None:
+                result['diff'] = [self._statistic(stat, group)
+                                  for stat in snapshot.compare_to(self.previous, group)[:top]]
+            self.previous = snapshot
+            return result
+
+    def tracing(self):
+        return tracemalloc.is_tracing()
+
+    def stop(self):
+        """Stop tracing so allocations run at full speed again"""
+        with self.lock:
+            was_tracing = tracemalloc.is_tracing()
+            tracemalloc.stop()
+            self.previous = None
+            return was_tracing
@@ -0,0 +1,276 @@
+#!/usr/bin/env python3
+"""
+VIB34D Traffic Replay
+Turns server access logs into a timestamped request trace and replays it
+against a running server at 1x or accelerated speed. Requests logged in
+the same instant are fired together, so the replay keeps the original
+burst concurrency. Reports latency distributions per route group.
+
+Understands http.server's common log lines (server_8080.log etc.), the
+production server's log_message lines, and the JSON-lines request log
+written with VIB34D_SLOW_REQUEST_MS=0.
+
+Usage:
+    python3 vib34d_replay.py trace <log>... [-o trace.json]
+    python3 vib34d_replay.py replay <log or trace.json>... [--target http://localhost:8080]
+                             [--speed 10] [--max-gap 5] [--max-concurrency 64] [--json report.json]
+"""
+
+import argparse
+import calendar
+import http.client
+import json
+import os
+import re
+import sys
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlparse
+
+# 127.0.0.1 - - [28/Jun/2025 04:16:12] "GET /core/ShaderManager.js HTTP/1.1" 200 -
+COMMON_LOG_RE = re.compile(
+    r'^\S+ \S+ \S+ \[(?P<time>\d{2}/\w{3}/\d{4}:?\s?\d{2}:\d{2}:\d{2})[^\]]*\] '
+    r'"(?P<method>[A-Z]+) (?P<path>\S+) HTTP/[\d.]+" (?P<status>\d{3})')
+# [2025-06-28 04:16:12] "GET /api/config HTTP/1.1" 200 -
+PRODUCTION_LOG_RE = re.compile(
+    r'^\[(?P<time>\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2})\] '
+    r'"(?P<method>[A-Z]+) (?P<path>\S+) HTTP/[\d.]+" (?P<status>\d{3})')
+TIME_FORMATS = ['%d/%b/%Y %H:%M:%S', '%d/%b/%Y:%H:%M:%S', '%Y-%m-%d %H:%M:%S', '%Y-%m-%dT%H:%M:%S']
+
+# Bodies aren't logged, so only requests that can be replayed verbatim are sent
+REPLAYABLE_METHODS = {'GET', 'HEAD'}
+QUANTILES = [0.5, 0.9, 0.95, 0.99]
+DEFAULT_MAX_GAP = 5.0
+DEFAULT_MAX_CONCURRENCY = 64
+REQUEST_TIMEOUT = 30
+
+
+class ReplayError(Exception):
+    """Raised when no usable trace can be built or the target is unreachable"""
+
+
+def _parse_time(text):
+    for time_format in TIME_FORMATS:
+        try:
+            # Log times are local wall clock; only differences matter
+            return float(calendar.timegm(time.strptime(text, time_format)))
+        except ValueError:
+            continue
+    return None
+
+
+def parse_log_line(line):
+    """{'time', 'method', 'path', 'status', 'duration_ms'} or None for non-request lines"""
+    line = line.strip()
+    if line.startswith('{'):
+        try:
+            entry = json.loads(line)
+        except json.JSONDecodeError:
+            return None
+        if not isinstance(entry, dict) or 'method' not in entry or 'path' not in entry:
+            return None
+        start = entry.get('start')
+        if start is None and entry.get('time'):
+            start = _parse_time(entry['time'])
+        if start is None:
+            return None
+        return {'time': float(start), 'method': entry['method'], 'path': entry['path'],
+                'status': entry.get('status'), 'duration_ms': entry.get('total_ms')}
+    match = COMMON_LOG_RE.match(line) or PRODUCTION_LOG_RE.match(line)
+    if not match:
+        return None
+    start = _parse_time(match.group('time'))
+    if start is None:
+        return None
+    return {'time': start, 'method': match.group('method'), 'path': match.group('path'),
+            'status': int(match.group('status')), 'duration_ms': None}
+
+
+def load_trace(paths, max_gap=DEFAULT_MAX_GAP):
+    """Requests from every log in time order, each with a replay 'offset' in seconds
+
+    Each file is its own session; idle stretches longer than max_gap (and
+    the jumps between files) are squeezed down to max_gap.
+    """
+    requests = []
+    for path in paths:
+        with open(path, 'r', encoding='utf-8', errors='replace') as f:
+            if path.endswith('.json') and f.read(1) == '{':
+                f.seek(0)
+                trace = json.load(f)
+                requests.extend(trace.get('requests', []))
+                continue
+            f.seek(0)
+            session = [request for request in map(parse_log_line, f) if request]
+        session.sort(key=lambda request: request['time'])
+        offset = requests[-1]['offset'] + max_gap if requests else 0.0
+        previous = session[0]['time'] if session else None
+        for request in session:
+            offset += min(request['time'] - previous, max_gap)
+            previous = request['time']
+            requests.append({**request, 'offset': round(offset, 3), 'source': os.path.basename(path)})
+    if not requests:
+        raise ReplayError('No request lines found in the given logs')
+    return requests
+
+
+def route_group(path):
+    """Coarse bucket for reporting: /api/<name>, a file extension, or the page itself"""
+    path = urlparse(path).path
+    if path.startswith('/api/'):
+        return '/api/' + path[len('/api/'):].split('/')[0].split('.')[0]
+    extension = os.path.splitext(path)[1].lower()
+    return extension or 'page'
+
+
+def distribution(values):
+    """Exact quantiles over one route group's latencies in milliseconds"""
+    if not values:
+        return None
+    values = sorted(values)
+    summary = {'count': len(values), 'mean': round(sum(values) / len(values), 3),
+               'min': round(values[0], 3), 'max': round(values[-1], 3)}
+    for q in QUANTILES:
+        summary[f'p{int(q * 100)}'] = round(values[min(len(values) - 1, int(q * len(values)))], 3)
+    return summary
+
+
+def _send(target, request):
+    """One request on a fresh connection; latency covers the full body"""
+    connection_class = http.client.HTTPSConnection if target.scheme == 'https' else http.client.HTTPConnection
+    connection = connection_class(target.hostname, target.port, timeout=REQUEST_TIMEOUT)
+    started = time.perf_counter()
+    try:
+        connection.request(request['method'], request['path'], headers={'X-Trace-Id': 'replay'})
+        response = connection.getresponse()
+        size = len(response.read())
+        return {'status': response.status, 'bytes': size, 'latency_ms': (time.perf_counter() - started) * 1000}
+    except (OSError, http.client.HTTPException) as e:
+        return {'status': None, 'error': str(e), 'bytes': 0, 'latency_ms': (time.perf_counter() - started) * 1000}
+    finally:
+        connection.close()
+
+
+def replay(requests, target, speed=1.0, max_concurrency=DEFAULT_MAX_CONCURRENCY, progress=None):
+    """Replay on the original schedule divided by speed; returns the report dict"""
+    target = urlparse(target)
+    if target.scheme not in ('http', 'https') or not target.hostname:
+        raise ReplayError(f'Target must be an http(s) URL, got {target.geturl()!r}')
+    replayable = [request for request in requests if request['method'] in REPLAYABLE_METHODS]
+    skipped = len(requests) - len(replayable)
+    results = []
+    lock = threading.Lock()
+
+    def run(request, scheduled):
+        lag = (time.perf_counter() - scheduled) * 1000
+        result = _send(target, request)
+        result.update(lag_ms=lag, request=request)
+        with lock:
+            results.append(result)
+            if progress and len(results) % 100 == 0:
+                progress(len(results), len(replayable))
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=max_concurrency) as pool:
+        for request in replayable:
+            scheduled = started + request['offset'] / speed
+            delay = scheduled - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            pool.submit(run, request, scheduled)
+    elapsed = time.perf_counter() - started
+
+    groups = {}
+    for result in results:
+        groups.setdefault(route_group(result['request']['path']), []).append(result)
+
+    def summarize(group):
+        logged = [result['request']['duration_ms'] for result in group
+                  if result['request'].get('duration_ms') is not None]
+        return {
+            'requests': len(group),
+            'errors': sum(1 for result in group if result['status'] is None or result['status'] >= 500),
+            'status_changed': sum(1 for result in group if result['request'].get('status') is not None
+                                  and result['status'] != result['request']['status']),
+            'bytes': sum(result['bytes'] for result in group),
+            'latency_ms': distribution([result['latency_ms'] for result in group]),
+            'logged_latency_ms': distribution(logged),
+            'start_lag_ms': distribution([result['lag_ms'] for result in group])
+        }
+
+    return {
+        'target': target.geturl(),
+        'speed': speed,
+        'max_concurrency': max_concurrency,
+        'trace_seconds': replayable[-1]['offset'] if replayable else 0.0,
+        'elapsed_seconds': round(elapsed, 3),
+        'requests_per_second': round(len(results) / elapsed, 2) if elapsed else None,
+        'peak_burst': max(Counter(request['offset'] for request in replayable).values(), default=0),
+        'skipped_methods': skipped,
+        'overall': summarize(results),
+        'groups': {name: summarize(group) for name, group in sorted(groups.items())}
+    }
+
+
+def _print_report(report):
+    print(f'✅ Replayed {report["overall"]["requests"]} requests against {report["target"]} '
+          f'in {report["elapsed_seconds"]}s ({report["requests_per_second"]} req/s, '
+          f'speed {report["speed"]:g}x, peak burst {report["peak_burst"]})')
+    if report['skipped_methods']:
+        print(f'   ⏭️ Skipped {report["skipped_methods"]} requests with unreplayable methods')
+    print(f'   {"group":<24}{"count":>7}{"errors":>8}{"p50":>10}{"p95":>10}{"p99":>10}{"max":>10}')
+    for name, group in [('overall', report['overall'])] + list(report['groups'].items()):
+        latency = group['latency_ms'] or {}
+        print(f'   {name:<24}{group["requests"]:>7}{group["errors"]:>8}'
+              + ''.join(f'{latency.get(key, 0):>10.2f}' for key in ('p50', 'p95', 'p99', 'max')))
+
+
+def main():
+    """Command line entry point"""
+    parser = argparse.ArgumentParser(description='VIB34D traffic replay tool')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    trace = commands.add_parser('trace', help='Parse logs into a request trace')
+    trace.add_argument('logs', nargs='+')
+    trace.add_argument('-o', '--output', default='trace.json')
+    trace.add_argument('--max-gap', type=float, default=DEFAULT_MAX_GAP,
+                       help='Longest idle stretch kept, in seconds')
+
+    run = commands.add_parser('replay', help='Replay logs or a trace against a server')
+    run.add_argument('logs', nargs='+')
+    run.add_argument('--target', default='http://localhost:8080')
+    run.add_argument('--speed', type=float, default=1.0, help='Time compression factor, e.g. 10 for 10x')
+    run.add_argument('--max-gap', type=float, default=DEFAULT_MAX_GAP,
+                     help='Longest idle stretch kept, in seconds')
+    run.add_argument('--max-concurrency', type=int, default=DEFAULT_MAX_CONCURRENCY)
+    run.add_argument('--json', metavar='PATH', help='Also write the full report as JSON')
+
+    args = parser.parse_args()
+
+    try:
+        requests = load_trace(args.logs, args.max_gap)
+        if args.command == 'trace':
+            with open(args.output, 'w') as f:
+                json.dump({'format': 'vib34d-trace', 'version': 1, 'requests': requests}, f, indent=2)
+            print(f'✅ Trace: {args.output} ({len(requests)} requests over {requests[-1]["offset"]:.1f}s)')
+            return
+        if args.speed <= 0 or args.max_concurrency < 1:
+            raise ReplayError('--speed must be positive and --max-concurrency at least 1')
+        print(f'🔁 Replaying {len(requests)} requests ({requests[-1]["offset"]:.1f}s of traffic) '
+              f'at {args.speed:g}x...')
+        report = replay(requests, args.target, args.speed, args.max_concurrency,
+                        progress=lambda done, total: print(f'   {done}/{total}'))
+        _print_report(report)
+        if args.json:
+            with open(args.json, 'w') as f:
+                json.dump(report, f, indent=2)
+            print(f'📄 Report: {args.json}')
+    except (ReplayError, OSError, json.JSONDecodeError) as e:
+        print(f'❌ {e}')
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,272 @@
+#!/usr/bin/env python3
+"""
+VIB34D Real-User Monitoring
+Aggregates client frame-time beacons into a ring of per-minute slots.
+Each slot holds one streaming quantile sketch per metric for every
+geometry, role, face and canvas seen, so ingestion only bumps bucket
+counters and memory stays bounded however many samples arrive.
+
+Beacon body (sendBeacon-friendly; any Content-Type):
+    {"samples": [{"face": 0, "canvas": "board-0", "geometry": "hypercube",
+                  "role": "board", "fps": 58.4, "frameTimes": [16.1, 17.3],
+                  "shaderCompileMs": 12.5, "contextLost": 0}, ...]}
+"""
+
+import json
+import math
+import threading
+import time
+
+from vib34d_keyframes import ROTATION_CHAINS
+from vib34d_shaders import THEME_GEOMETRIES
+
+# Registered geometries (keyframe rotation chains) plus the theme names the shaders alias them by
+GEOMETRIES = set(ROTATION_CHAINS) | set(THEME_GEOMETRIES)
+ROLES = ['board', 'background', 'content', 'highlight', 'accent', 'bezel']
+FACES = 8
+MAX_CANVASES = 64
+MAX_BEACON_BYTES = 64 * 1024
+MAX_SAMPLES_PER_BEACON = 256
+MAX_FRAME_TIMES = 1024
+
+SLOT_SECONDS = 60
+SLOT_COUNT = 60
+DEFAULT_WINDOW_MINUTES = 15
+DIMENSIONS = ['geometry', 'role', 'face', 'canvas']
+QUANTILES = [0.5, 0.9, 0.95, 0.99]
+
+# Sketched metric -> beacon field; frameTimes may also be a single number
+SKETCHED_METRICS = {'fps': 'fps', 'frame_ms': 'frameTimes', 'shader_compile_ms': 'shaderCompileMs'}
+
+# Relative error of every reported quantile
+SKETCH_ACCURACY = 0.01
+SKETCH_MIN_VALUE = 1e-3
+OTHER = 'other'
+
+
+class RumError(ValueError):
+    """Raised for beacons that are not JSON or exceed the size limits"""
+
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+class QuantileSketch:
+    """Log-bucketed quantile sketch (DDSketch): buckets grow with the value range, not the sample count"""
+
+    __slots__ = ('buckets', 'count', 'total', 'min', 'max', 'zeros')
+
+    gamma = (1 + SKETCH_ACCURACY) / (1 - SKETCH_ACCURACY)
+    log_gamma = math.log(gamma)
+
+    def __init__(self):
+        self.buckets = {}
+        self.count = 0
+        self.total = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+        self.zeros = 0
+
+    @classmethod
+    def bucket_of(cls, value):
+        """Bucket index, or None for values that count as zero"""
+        return math.ceil(math.log(value) / cls.log_gamma) if value > SKETCH_MIN_VALUE else None
+
+    def add(self, value, index=False):
+        """Count one value; pass its bucket_of() index when adding it to several sketches"""
+        if index is False:
+            index = self.bucket_of(value)
+        self.count += 1
+        self.total += value
+        if value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+        if index is None:
+            self.zeros += 1
+        else:
+            self.buckets[index] = self.buckets.get(index, 0) + 1
+
+    def merge(self, other):
+        for index, count in other.buckets.items():
+            self.buckets[index] = self.buckets.get(index, 0) + count
+        self.count += other.count
+        self.total += other.total
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        self.zeros += other.zeros
+
+    def quantile(self, q):
+        if not self.count:
+            return None
+        rank = q * (self.count - 1)
+        seen = self.zeros
+        if rank < seen:
+            return 0.0
+        for index in sorted(self.buckets):
+            seen += self.buckets[index]
+            if rank < seen:
+                # Bucket midpoint, clamped to the exact extremes
+                value = 2 * self.gamma ** index / (self.gamma + 1)
+                return min(self.max, max(self.min, value))
+        return self.max
+
+    def summary(self):
+        if not self.count:
+            return None
+        summary = {'count': self.count, 'mean': round(self.total / self.count, 3),
+                   'min': round(self.min, 3), 'max': round(self.max, 3)}
+        for q in QUANTILES:
+            summary[f'p{int(q * 100)}'] = round(self.quantile(q), 3)
+        return summary
+
+
+class Series:
+    """Every metric for one dimension value within one slot"""
+
+    __slots__ = ('samples', 'context_lost', 'sketches')
+
+    def __init__(self):
+        self.samples = 0
+        self.context_lost = 0
+        self.sketches = {metric: QuantileSketch() for metric in SKETCHED_METRICS}
+
+    def merge(self, other):
+        self.samples += other.samples
+        self.context_lost += other.context_lost
+        for metric, sketch in other.sketches.items():
+            self.sketches[metric].merge(sketch)
+
+    def summary(self):
+        summary = {'samples': self.samples, 'context_lost': self.context_lost}
+        for metric, sketch in self.sketches.items():
+            summary[metric] = sketch.summary()
+        return summary
+
+
+def _number(value):
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        return None
+    return float(value) if math.isfinite(value) and value >= 0 else None
+
+
+def parse_beacon(body):
+    """Sample dicts from a beacon body"""
+    if len(body) > MAX_BEACON_BYTES:
+        raise RumError(413, f'Beacon larger than {MAX_BEACON_BYTES} bytes')
+    try:
+        payload = json.loads(body or b'null')
+    except (json.JSONDecodeError, UnicodeDecodeError) as e:
+        raise RumError(400, f'Invalid JSON beacon: {e}')
+    samples = payload.get('samples') if isinstance(payload, dict) else payload
+    if not isinstance(samples, list):
+        raise RumError(400, 'Beacon must be {"samples": [...]} or a list of samples')
+    if len(samples) > MAX_SAMPLES_PER_BEACON:
+        raise RumError(413, f'At most {MAX_SAMPLES_PER_BEACON} samples per beacon')
+    return samples
+
+
+class RumAggregator:
+    """Ring of SLOT_COUNT slots of SLOT_SECONDS each; a slot is cleared when the ring wraps onto it"""
+
+    def __init__(self, slot_seconds=SLOT_SECONDS, slot_count=SLOT_COUNT):
+        self.slot_seconds = slot_seconds
+        self.slot_count = slot_count
+        self.lock = threading.Lock()
+        self.slots = [None] * slot_count
+        self.canvases = set()
+        self.ingested = 0
+        self.rejected = 0
+
+    def _dimension_values(self, sample):
+        geometry = sample.get('geometry')
+        role = sample.get('role')
+        face = sample.get('face')
+        canvas = sample.get('canvas')
+        if not isinstance(canvas, str):
+            canvas = None
+        elif canvas not in self.canvases and len(self.canvases) < MAX_CANVASES:
+            self.canvases.add(canvas)
+        return {
+            # Beacons are untrusted JSON: a list or dict here is unhashable, not just unknown
+            'geometry': geometry if isinstance(geometry, str) and geometry in GEOMETRIES else OTHER,
+            'role': role if isinstance(role, str) and role in ROLES else OTHER,
+            'face': str(face) if type(face) is int and 0 <= face < FACES else OTHER,
+            'canvas': canvas if canvas in self.canvases else OTHER
+        }
+
+    def _slot(self, now):
+        number = int(now // self.slot_seconds)
+        position = number % self.slot_count
+        slot = self.slots[position]
+        if slot is None or slot[0] != number:
+            slot = self.slots[position] = (number, {})
+        return slot[1]
+
+    def _parse_sample(self, sample):
+        """(context lost count, {metric: [(value, bucket)]}, dimension values), or None to reject"""
+        if not isinstance(sample, dict):
+            return None
+        values = {}
+        for metric, field in SKETCHED_METRICS.items():
+            raw = sample.get(field)
+            raw = raw[:MAX_FRAME_TIMES] if isinstance(raw, list) else [raw]
+            values[metric] = [(number, QuantileSketch.bucket_of(number))
+                              for number in map(_number, raw) if number is not None]
+        lost = sample.get('contextLost')
+        lost = 1 if lost is True else int(_number(lost) or 0)
+        if not lost and not any(values.values()):
+            return None
+        return lost, values, self._dimension_values(sample)
+
+    def ingest(self, samples, now=None):
+        """Fold samples into the current slot; returns (accepted, rejected)"""
+        with self.lock:
+            # Parse the whole beacon first so a bad sample can't leave it half folded in
+            parsed = [self._parse_sample(sample) for sample in samples]
+            accepted = [entry for entry in parsed if entry is not None]
+            series_by_key = self._slot(time.time() if now is None else now)
+            for lost, values, dimensions in accepted:
+                for key in [('all', 'all')] + list(dimensions.items()):
+                    series = series_by_key.get(key)
+                    if series is None:
+                        series = series_by_key[key] = Series()
+                    series.samples += 1
+                    series.context_lost += lost
+                    for metric, numbers in values.items():
+                        sketch = series.sketches[metric]
+                        for number, index in numbers:
+                            sketch.add(number, index)
+            self.ingested += len(accepted)
+            self.rejected += len(parsed) - len(accepted)
+        return len(accepted), len(parsed) - len(accepted)
+
+    def view(self, window_minutes=DEFAULT_WINDOW_MINUTES, dimensions=('geometry', 'role'), now=None):
+        """Merged summaries over the last window_minutes, overall and per dimension value"""
+        now = time.time() if now is None else now
+        newest = int(now // self.slot_seconds)
+        oldest = newest - max(1, int(math.ceil(window_minutes * 60 / self.slot_seconds))) + 1
+        merged = {}
+        with self.lock:
+            for slot in self.slots:
+                if slot is None or not oldest <= slot[0] <= newest:
+                    continue
+                for key, series in slot[1].items():
+                    if key[0] != 'all' and key[0] not in dimensions:
+                        continue
+                    if key not in merged:
+                        merged[key] = Series()
+                    merged[key].merge(series)
+            ingested, rejected = self.ingested, self.rejected
+        overall = merged.get(('all', 'all'))
+        view = {
+            'window_seconds': (newest - oldest + 1) * self.slot_seconds,
+            'ingested': ingested,
+            'rejected': rejected,
+            'overall': overall.summary() if overall else None
+        }
+        for dimension in dimensions:
+            view[dimension] = {value: series.summary()
+                               for (name, value), series in sorted(merged.items()) if name == dimension}
+        return view
@@ -0,0 +1,666 @@
+#!/usr/bin/env python3
+"""
+VIB34D Document Schemas
+JSON Schema (draft-07 subset) definitions for the config and preset
+documents, compiled once into plain Python validator closures. Results
+are memoized by document content hash so unchanged files validate for free
+"""
+
+import hashlib
+import json
+import os
+import re
+import threading
+from collections import OrderedDict
+
+MAX_ERRORS = 50
+
+# ----------------------------------------------------------------------
+# Shared definitions
+# ----------------------------------------------------------------------
+
+NUMBER = {'type': 'number'}
+UNIT_NUMBER = {'type': 'number', 'minimum': 0, 'maximum': 1}
+RGB_COLOR = {'type': 'array', 'items': UNIT_NUMBER, 'minItems': 3, 'maxItems': 4}
+HEX_COLOR = {'type': 'string', 'pattern': r'^#(?:[0-9a-fA-F]{3}|[0-9a-fA-F]{6}|[0-9a-fA-F]{8})$'}
+VERSION = {'type': 'string', 'pattern': r'^\d+\.\d+\.\d+$'}
+NUMERIC_MAP = {'type': 'object', 'additionalProperties': NUMBER}
+RANGE = {
+    'type': 'object',
+    'required': ['min', 'max'],
+    'properties': {'min': NUMBER, 'max': NUMBER, 'default': NUMBER}
+}
+VISUAL_PARAMETERS = {
+    'type': 'object',
+    'properties': {
+        'dimension': {'type': 'number', 'minimum': 3, 'maximum': 4},
+        'morphFactor': {'type': 'number', 'minimum': 0},
+        'gridDensity': {'type': 'number', 'exclusiveMinimum': 0},
+        'rotationSpeed': {'type': 'number', 'minimum': 0},
+        'glitchIntensity': {'type': 'number', 'minimum': 0}
+    }
+}
+
+# ----------------------------------------------------------------------
+# Document schemas, keyed by path relative to the dashboard root
+# ----------------------------------------------------------------------
+
+VISUALS_SCHEMA = {
+    'type': 'object',
+    'required': ['version', 'themes'],
+    'properties': {
+        'version': VERSION,
+        'currentTheme': {'type': 'string'},
+        'themes': {
+            'type': 'object',
+            'minProperties': 1,
+            'additionalProperties': {
+                'type': 'object',
+                'required': ['name', 'baseColor', 'accentColor', 'parameters'],
+                'properties': {
+                    'name': {'type': 'string', 'minLength': 1},
+                    'baseColor': RGB_COLOR,
+                    'accentColor': RGB_COLOR,
+                    'parameters': {**VISUAL_PARAMETERS, 'additionalProperties': NUMBER},
+                    'cssVariables': {
+                        'type': 'object',
+                        'propertyNames': {'pattern': r'^--[\w-]+$'},
+                        'additionalProperties': {'type': 'string'}
+                    },
+                    'shaderUniforms': {
+                        'type': 'object',
+                        'propertyNames': {'pattern': r'^u_\w+$'},
+                        'additionalProperties': {
+                            'anyOf': [NUMBER, {'type': 'array', 'items': NUMBER, 'minItems': 2, 'maxItems': 4}]
+                        }
+                    }
+                }
+            }
+        }
+    }
+}
+
+BEHAVIOR_SCHEMA = {
+    'type': 'object',
+    'required': ['version', 'interactions', 'presets'],
+    'properties': {
+        'version': VERSION,
+        'interactions': {
+            'type': 'object',
+            'additionalProperties': {
+                'type': 'object',
+                'required': ['enabled'],
+                'properties': {
+                    'enabled': {'type': 'boolean'},
+                    'transitionDuration': {'type': 'number', 'minimum': 0},
+                    'duration': {'type': 'number', 'minimum': 0}
+                }
+            }
+        },
+        'presets': {
+            'type': 'object',
+            'additionalProperties': {
+                'type': 'object',
+                'required': ['parameters'],
+                'properties': {
+                    'description': {'type': 'string'},
+                    'parameters': {**VISUAL_PARAMETERS, 'additionalProperties': NUMBER},
+                    'section': {'type': 'integer', 'minimum': 0},
+                    'theme': {'type': 'string'},
+                    'ecosystemReactivity': {'type': 'boolean'},
+                    'canvasPoolLimit': {'type': 'integer', 'minimum': 1}
+                }
+            }
+        },
+        'vib34dGeometries': {
+            'type': 'object',
+            'additionalProperties': {
+                'type': 'object',
+                'required': ['displayName', 'defaultParameters'],
+                'properties': {
+                    'displayName': {'type': 'string'},
+                    'defaultParameters': {**VISUAL_PARAMETERS, 'additionalProperties': NUMBER},
+                    'colorProfile': {'type': 'string'}
+                }
+            }
+        },
+        'agentAPI': {
+            'type': 'object',
+            'properties': {
+                'enabled': {'type': 'boolean'},
+                'validation': {
+                    'type': 'object',
+                    'properties': {
+                        'parameterRanges': {'type': 'object', 'additionalProperties': RANGE},
+                        'geometryTypes': {'type': 'array', 'items': {'type': 'string'}, 'minItems': 1}
+                    }
+                },
+                'permissions': {'type': 'object', 'additionalProperties': {'type': 'boolean'}}
+            }
+        }
+    }
+}
+
+CONTENT_SCHEMA = {
+    'type': 'object',
+    'required': ['sections'],
+    'properties': {
+        'version': VERSION,
+        'currentSection': {'type': 'integer', 'minimum': 0},
+        'sections': {
+            'type': 'object',
+            'propertyNames': {'pattern': r'^\d+$'},
+            'additionalProperties': {
+                'type': 'object',
+                'required': ['name', 'cards'],
+                'properties': {
+                    'name': {'type': 'string', 'minLength': 1},
+                    'theme': {'type': 'string'},
+                    'cards': {
+                        'type': 'array',
+                        'items': {
+                            'type': 'object',
+                            'required': ['id', 'title'],
+                            'properties': {
+                                'id': {'type': 'string', 'minLength': 1},
+                                'title': {'type': 'string'},
+                                'content': {'type': 'string'},
+                                'position': {
+                                    'type': 'object',
+                                    'properties': {'x': NUMBER, 'y': NUMBER}
+                                },
+                                'reactivity': {
+                                    'type': 'object',
+                                    'properties': {
+                                        'parameterChanges': NUMERIC_MAP,
+                                        'relationships': NUMERIC_MAP
+                                    }
+                                }
+                            }
+                        }
+                    },
+                    'backgroundProperties': {
+                        'type': 'object',
+                        'properties': {
+                            'geometry': {'type': 'string'},
+                            'responsiveness': NUMBER,
+                            'baseColor': RGB_COLOR
+                        }
+                    }
+                }
+            }
+        },
+        'vib3Configuration': {'type': 'object', 'additionalProperties': {'type': 'boolean'}}
+    }
+}
+
+DASHBOARD_CONFIG_SCHEMA = {
+    'type': 'object',
+    'required': ['editorDashboard'],
+    'properties': {
+        'editorDashboard': {
+            'type': 'object',
+            'required': ['version'],
+            'properties': {'version': VERSION}
+        }
+    }
+}
+
+EVENT_REACTION_MANIFEST_SCHEMA = {
+    'type': 'object',
+    'required': ['eventReactionManifest'],
+    'properties': {
+        'eventReactionManifest': {
+            'type': 'object',
+            'required': ['version', 'eventTypes', 'reactionDefinitions'],
+            'properties': {
+                'version': VERSION,
+                'layerManagement': {'type': 'object'},
+                'eventTypes': {'type': 'object', 'additionalProperties': {'type': 'object'}},
+                'reactionDefinitions': {
+                    'type': 'object',
+                    'additionalProperties': {'type': 'object', 'additionalProperties': {'type': 'object'}}
+                }
+            }
+        }
+    }
+}
+
+COMPREHENSIVE_EVENT_MANIFEST_SCHEMA = {
+    'type': 'object',
+    'required': ['vib3EventManifest'],
+    'properties': {
+        'vib3EventManifest': {
+            'type': 'object',
+            'required': ['version', 'passiveEvents', 'activeEvents'],
+            'properties': {
+                'version': VERSION,
+                'passiveEvents': {'type': 'object', 'additionalProperties': {'type': 'object'}},
+                'activeEvents': {'type': 'object', 'additionalProperties': {'type': 'object'}}
+            }
+        }
+    }
+}
+
+EDITOR_DASHBOARD_PRESET_SCHEMA = {
+    'type': 'object',
+    'required': ['editorDashboard'],
+    'properties': {
+        'editorDashboard': {
+            'type': 'object',
+            'required': ['version'],
+            'properties': {
+                'version': VERSION,
+                'masterControls': {'type': 'object', 'additionalProperties': {'type': 'object'}},
+                'pageRelations': {'type': 'object', 'additionalProperties': {'type': 'object'}}
+            }
+        }
+    }
+}
+
+NAVIGATION_CONFIG_SCHEMA = {
+    'type': 'object',
+    'required': ['navigationParameters', 'edgeMappings'],
+    'properties': {
+        'navigationParameters': {
+            'type': 'object',
+            'additionalProperties': {
+                'type': 'object',
+                'required': ['value'],
+                'properties': {'value': NUMBER, 'min': NUMBER, 'max': NUMBER, 'unit': {'type': 'string'}}
+            }
+        },
+        'edgeMappings': {
+            'type': 'object',
+            'propertyNames': {'enum': ['left', 'right', 'up', 'down']},
+            'additionalProperties': {
+                'type': 'object',
+                'required': ['targetSectionName', 'targetFaceIndexForVisuals'],
+                'properties': {
+                    'targetSectionName': {'type': 'string'},
+                    'homeMasterSectionKey': {'type': 'integer', 'minimum': 0},
+                    'targetFaceIndexForVisuals': {'type': 'integer', 'minimum': 0, 'maximum': 7}
+                }
+            }
+        }
+    }
+}
+
+REACTIVITY_PRESETS_SCHEMA = {
+    'type': 'object',
+    'required': ['interactionBehaviors'],
+    'properties': {
+        '_metadata': {'type': 'object', 'properties': {'version': VERSION}},
+        'interactionBehaviors': {
+            'type': 'object',
+            'additionalProperties': {
+                'type': 'object',
+                'required': ['name', 'event'],
+                'properties': {
+                    'name': {'type': 'string'},
+                    'event': {'type': 'string'},
+                    'continuous': {'type': 'boolean'},
+                    'target': {'type': 'object'},
+                    'ecosystem': {'type': 'array'}
+                }
+            }
+        },
+        'legacyPresets': {
+            'type': 'object',
+            'additionalProperties': {
+                'type': 'object',
+                'required': ['name', 'mappedTo'],
+                'properties': {'mappedTo': {'type': 'string'}, 'parameters': {'type': 'object'}}
+            }
+        }
+    }
+}
+
+SCROLL_PHYSICS_SCHEMA = {
+    'type': 'object',
+    'required': ['defaultProfile', 'profiles'],
+    'properties': {
+        '_metadata': {'type': 'object', 'properties': {'version': VERSION}},
+        'defaultProfile': {'type': 'object'},
+        'profiles': {
+            'type': 'object',
+            'additionalProperties': {
+                'type': 'object',
+                'properties': {'_extends': {'type': 'string'}}
+            }
+        }
+    }
+}
+
+THEME_COLLECTIONS_SCHEMA = {
+    'type': 'object',
+    'minProperties': 1,
+    'additionalProperties': {
+        'type': 'object',
+        'required': ['name', 'version'],
+        'properties': {
+            'name': {'type': 'string'},
+            'version': VERSION,
+            'target': {'type': 'string'},
+            'sections': {'type': 'object', 'additionalProperties': {'type': 'object'}}
+        }
+    }
+}
+
+VISUAL_STYLES_SCHEMA = {
+    'type': 'object',
+    'required': ['geometries', 'presetStyles'],
+    'properties': {
+        '_metadata': {'type': 'object', 'properties': {'version': VERSION}},
+        'geometries': {
+            'type': 'object',
+            'additionalProperties': {
+                'type': 'object',
+                'required': ['id', 'name', 'shaderFunction'],
+                'properties': {
+                    'id': {'type': 'number', 'minimum': 0},
+                    'name': {'type': 'string'},
+                    'shaderFunction': {'type': 'string', 'pattern': r'^[A-Za-z_]\w*$'},
+                    'parameters': {'type': 'object'},
+                    'colorRecommendations': {'type': 'object', 'additionalProperties': HEX_COLOR}
+                }
+            }
+        },
+        'presetStyles': {
+            'type': 'object',
+            'additionalProperties': {
+                'type': 'object',
+                'required': ['name', 'geometry', 'parameters'],
+                'properties': {
+                    'name': {'type': 'string'},
+                    'geometry': {'type': 'string'},
+                    'parameters': {'type': 'object', 'properties': {'baseColor': HEX_COLOR}}
+                }
+            }
+        },
+        'visualizerTypes': {
+            'type': 'object',
+            'additionalProperties': {
+                'type': 'object',
+                'required': ['role'],
+                'properties': {
+                    'role': {'type': 'string'},
+                    'layerDepth': {'type': 'integer'},
+                    'opacity': UNIT_NUMBER,
+                    'blendMode': {'type': 'string'}
+                }
+            }
+        },
+        'parameterRanges': {'type': 'object', 'additionalProperties': RANGE}
+    }
+}
+
+DOCUMENT_SCHEMAS = {
+    'config/visuals.json': VISUALS_SCHEMA,
+    'config/behavior.json': BEHAVIOR_SCHEMA,
+    'config/content.json': CONTENT_SCHEMA,
+    'config/dashboard-config.json': DASHBOARD_CONFIG_SCHEMA,
+    'config/event-reaction-manifest.json': EVENT_REACTION_MANIFEST_SCHEMA,
+    'config/comprehensive-event-manifest.json': COMPREHENSIVE_EVENT_MANIFEST_SCHEMA,
+    'presets/editor-dashboard-config.json': EDITOR_DASHBOARD_PRESET_SCHEMA,
+    'presets/navigation-config.json': NAVIGATION_CONFIG_SCHEMA,
+    'presets/reactivity-presets.json': REACTIVITY_PRESETS_SCHEMA,
+    'presets/scroll-physics-presets.json': SCROLL_PHYSICS_SCHEMA,
+    'presets/theme-collections.json': THEME_COLLECTIONS_SCHEMA,
+    'presets/visual-styles.json': VISUAL_STYLES_SCHEMA
+}
+
+# ----------------------------------------------------------------------
+# Schema compiler
+# ----------------------------------------------------------------------
+
+def _is_number(value):
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+TYPE_CHECKS = {
+    'object': lambda value: isinstance(value, dict),
+    'array': lambda value: isinstance(value, list),
+    'string': lambda value: isinstance(value, str),
+    'boolean': lambda value: isinstance(value, bool),
+    'null': lambda value: value is None,
+    'number': _is_number,
+    'integer': lambda value: _is_number(value) and float(value).is_integer()
+}
+
+
+def _pointer(path, key):
+    """Extend a JSON Pointer (RFC 6901) with one more token"""
+    return f'{path}/{str(key).replace("~", "~0").replace("/", "~1")}'
+
+
+def compile_schema(schema):
+    """Turn a schema dict into validate(value, path, errors) -> None"""
+    checks = []
+
+    if 'type' in schema:
+        names = schema['type'] if isinstance(schema['type'], list) else [schema['type']]
+        type_checks = [TYPE_CHECKS[name] for name in names]
+        expected = ' or '.join(names)
+
+        def check_type(value, path, errors):
+            if not any(check(value) for check in type_checks):
+                errors.append((path, f'expected {expected}, got {type(value).__name__}'))
+                return False
+            return True
+        checks.append(check_type)
+
+    if 'enum' in schema:
+        allowed = schema['enum']
+
+        def check_enum(value, path, errors):
+            if value not in allowed:
+                errors.append((path, f'{value!r} is not one of {allowed}'))
+        checks.append(check_enum)
+
+    if any(key in schema for key in ('minimum', 'maximum', 'exclusiveMinimum')):
+        minimum = schema.get('minimum')
+        maximum = schema.get('maximum')
+        exclusive_minimum = schema.get('exclusiveMinimum')
+
+        def check_range(value, path, errors):
+            if not _is_number(value):
+                return
+            if minimum is not None and value < minimum:
+                errors.append((path, f'{value} is below the minimum {minimum}'))
+            if maximum is not None and value > maximum:
+                errors.append((path, f'{value} is above the maximum {maximum}'))
+            if exclusive_minimum is not None and value <= exclusive_minimum:
+                errors.append((path, f'{value} must be greater than {exclusive_minimum}'))
+        checks.append(check_range)
+
+    if 'pattern' in schema or 'minLength' in schema:
+        pattern = re.compile(schema['pattern']) if 'pattern' in schema else None
+        min_length = schema.get('minLength', 0)
+
+        def check_string(value, path, errors):
+            if not isinstance(value, str):
+                return
+            if len(value) < min_length:
+                errors.append((path, f'string shorter than {min_length}'))
+            if pattern and not pattern.search(value):
+                errors.append((path, f'{value!r} does not match {pattern.pattern}'))
+        checks.append(check_string)
+
+    if any(key in schema for key in ('properties', 'required', 'additionalProperties',
+                                      'propertyNames', 'minProperties')):
+        properties = {name: compile_schema(child) for name, child in schema.get('properties', {}).items()}
+        required = schema.get('required', [])
+        additional = schema.get('additionalProperties', True)
+        additional = compile_schema(additional) if isinstance(additional, dict) else additional
+        property_names = compile_schema(schema['propertyNames']) if 'propertyNames' in schema else None
+        min_properties = schema.get('minProperties', 0)
+
+        def check_object(value, path, errors):
+            if not isinstance(value, dict):
+                return
+            for name in required:
+                if name not in value:
+                    errors.append((path, f'missing required property {name!r}'))
+            if len(value) < min_properties:
+                errors.append((path, f'expected at least {min_properties} properties'))
+            for name, child in value.items():
+                child_path = _pointer(path, name)
+                if property_names is not None:
+                    property_names(name, child_path, errors)
+                validator = properties.get(name)
+                if validator is not None:
+                    validator(child, child_path, errors)
+                elif additional is False:
+                    errors.append((child_path, 'additional property not allowed'))
+                elif additional is not True:
+                    additional(child, child_path, errors)
+        checks.append(check_object)
+
+    if any(key in schema for key in ('items', 'minItems', 'maxItems')):
+        items = compile_schema(schema['items']) if 'items' in schema else None
+        min_items = schema.get('minItems', 0)
+        max_items = schema.get('maxItems')
+
+        def check_array(value, path, errors):
+            if not isinstance(value, list):
+                return
+            if len(value) < min_items:
+                errors.append((path, f'expected at least {min_items} items, got {len(value)}'))
+            if max_items is not None and len(value) > max_items:
+                errors.append((path, f'expected at most {max_items} items, got {len(value)}'))
+            if items is not None:
+                for index, child in enumerate(value):
+                    items(child, _pointer(path, index), errors)
+        checks.append(check_array)
+
+    if 'anyOf' in schema:
+        options = [compile_schema(option) for option in schema['anyOf']]
+
+        def check_any_of(value, path, errors):
+            for option in options:
+                option_errors = []
+                option(value, path, option_errors)
+                if not option_errors:
+                    return
+            errors.append((path, 'does not match any allowed form'))
+        checks.append(check_any_of)
+
+    type_check = checks[0] if 'type' in schema else None
+    rest = checks[1:] if type_check else checks
+
+    def validate(value, path, errors):
+        if len(errors) >= MAX_ERRORS:
+            return
+        # A wrong type makes every other keyword's message noise
+        if type_check is not None and not type_check(value, path, errors):
+            return
+        for check in rest:
+            check(value, path, errors)
+
+    return validate
+
+
+COMPILED_SCHEMAS = {document: compile_schema(schema) for document, schema in DOCUMENT_SCHEMAS.items()}
+
+# ----------------------------------------------------------------------
+# Memoized document validation
+# ----------------------------------------------------------------------
+
+def validate_value(document, value):
+    """Structured result for an already-parsed document"""
+    validator = COMPILED_SCHEMAS.get(document)
+    if validator is None:
+        return {'document': document, 'valid': True, 'errors': [], 'schema': False}
+    errors = []
+    validator(value, '', errors)
+    return {
+        'document': document,
+        'valid': not errors,
+        'errors': [{'path': path or '/', 'message': message} for path, message in errors[:MAX_ERRORS]],
+        'schema': True
+    }
+
+
+class DocumentValidator:
+    """Parses and validates documents, memoized by sha256 of their bytes"""
+
+    def __init__(self, root='.', cache_size=64):
+        self.root = root
+        self.cache_size = cache_size
+        self.cache = OrderedDict()
+        # Accepted writes not yet on disk: document -> (value, result)
+        self.pending = {}
+        # Bumped on every pending change, so caches over these documents can key on it
+        self.generation = 0
+        self.lock = threading.Lock()
+
+    def validate_bytes(self, document, data):
+        """Return (parsed value or None, result); the parsed value is shared, do not mutate it"""
+        key = (document, hashlib.sha256(data).hexdigest())
+        with self.lock:
+            if key in self.cache:
+                self.cache.move_to_end(key)
+                return self.cache[key]
+
+        try:
+            value = json.loads(data)
+        except (json.JSONDecodeError, UnicodeDecodeError) as e:
+            value = None
+            result = {
+                'document': document,
+                'valid': False,
+                'errors': [{'path': '/', 'message': f'Invalid JSON: {e}'}],
+                'schema': document in COMPILED_SCHEMAS
+            }
+        else:
+            result = validate_value(document, value)
+        result['sha256'] = key[1]
+
+        with self.lock:
+            self.cache[key] = (value, result)
+            while len(self.cache) > self.cache_size:
+                self.cache.popitem(last=False)
+        return value, result
+
+    def store(self, document, data, value):
+        """Seed the cache for bytes the caller just serialized from value"""
+        key = (document, hashlib.sha256(data).hexdigest())
+        result = validate_value(document, value)
+        result['sha256'] = key[1]
+        with self.lock:
+            self.cache[key] = (value, result)
+            self.cache.move_to_end(key)
+            while len(self.cache) > self.cache_size:
+                self.cache.popitem(last=False)
+        return value, result
+
+    def set_pending(self, document, value):
+        """Serve value for document from validate_file() until its write lands; None clears it"""
+        with self.lock:
+            if value is None:
+                self.pending.pop(document, None)
+            else:
+                self.pending[document] = (value, validate_value(document, value))
+            self.generation += 1
+
+    def pending_value(self, document):
+        """The accepted but unwritten value for document, or None"""
+        pending = self.pending.get(document)
+        return pending[0] if pending is not None else None
+
+    def validate_file(self, document):
+        pending = self.pending.get(document)
+        if pending is not None:
+            return pending
+        path = os.path.join(self.root, document)
+        with open(path, 'rb') as f:
+            return self.validate_bytes(document, f.read())
+
+    def validate_all(self):
+        """Results for every document that has a schema and exists under the root"""
+        results = {}
+        for document in DOCUMENT_SCHEMAS:
+            if os.path.exists(os.path.join(self.root, document)):
+                results[document] = self.validate_file(document)[1]
+        return results
@@ -0,0 +1,211 @@
+#!/usr/bin/env python3
+"""
+VIB34D Service Worker
+Generates the package's sw.js from package-manifest.json. Each build's
+precache list is versioned by a hash of its files' checksums, and the
+worker drops every other version's caches once it activates. Hashed
+assets are served cache-first and carried over from the previous version
+without a refetch. Config JSON is stale-while-revalidate. Pages are
+network-first, with the cached copy used offline.
+"""
+
+import hashlib
+import json
+import re
+
+SERVICE_WORKER_FILE = 'sw.js'
+REGISTRATION_MARKER = 'data-vib34d-sw'
+
+# Fingerprinted by the packager (name.<md5:10>.ext) or by shader digest
+HASHED_ASSET_RE = re.compile(r'\.[0-9a-f]{10}\.(?:js|css|json)$|(?:^|/)[0-9a-f]{16}\.glsl$')
+REVALIDATE_SUFFIXES = ('.json', '.bin')
+
+# Server-side, tooling and documentation files never requested by a page
+EXCLUDED_SUFFIXES = ('.py', '.sh', '.bat', '.md', '.zip')
+EXCLUDED_FILES = {'package.json', 'package-manifest.json', 'build-report.json', SERVICE_WORKER_FILE}
+EXCLUDED_DIRECTORIES = ('documentation/', 'tests/', 'scripts/', '.')
+
+REGISTRATION_SCRIPT = f'''<script {REGISTRATION_MARKER}>
+if ('serviceWorker' in navigator) {{
+    window.addEventListener('load', () => navigator.serviceWorker.register('/{SERVICE_WORKER_FILE}'));
+}}
+</script>
+'''
+
+SERVICE_WORKER_TEMPLATE = '''/* VIB34D service worker, generated by create-production-package.py from package-manifest.json */
+const VERSION = '__VERSION__';
+const PRECACHE = `vib34d-precache-${VERSION}`;
+const RUNTIME = `vib34d-runtime-${VERSION}`;
+
+// [url, strategy]: 'immutable' cache-first, 'revalidate' stale-while-revalidate, 'page' network-first
+const PRECACHE_ENTRIES = __ENTRIES__;
+const STRATEGIES = new Map(PRECACHE_ENTRIES);
+const IMMUTABLE_RE = /\\.[0-9a-f]{10}\\.(?:js|css|json)$|\\/[0-9a-f]{16}\\.glsl$|^\\/api\\/shaders\\/[0-9a-f]{16}$/;
+const CONFIG_API_RE = /^\\/api\\/config(?:\\/(?!writes$|flush$)[^/]+(?:\\/[^/]*)?)?$/;
+
+self.addEventListener('install', (event) => {
+    event.waitUntil((async () => {
+        const cache = await caches.open(PRECACHE);
+        await Promise.all(PRECACHE_ENTRIES.map(async ([url, strategy]) => {
+            // A hashed name always has the same content, so an older version's copy saves the download
+            const previous = strategy === 'immutable' ? await caches.match(url) : undefined;
+            const response = previous || await fetch(url, { cache: 'no-cache' });
+            if (!response.ok) {
+                throw new Error(`Precache failed for ${url}: ${response.status}`);
+            }
+            await cache.put(url, response);
+        }));
+        await self.skipWaiting();
+    })());
+});
+
+self.addEventListener('activate', (event) => {
+    event.waitUntil((async () => {
+        const current = new Set([PRECACHE, RUNTIME]);
+        const names = await caches.keys();
+        await Promise.all(names
+            .filter((name) => name.startsWith('vib34d-') && !current.has(name))
+            .map((name) => caches.delete(name)));
+        await self.clients.claim();
+    })());
+});
+
+self.addEventListener('fetch', (event) => {
+    const request = event.request;
+    const url = new URL(request.url);
+    if (request.method !== 'GET' || url.origin !== self.location.origin) {
+        return;
+    }
+    const strategy = request.mode === 'navigate' ? 'page' : strategyFor(url.pathname);
+    if (strategy === 'page') {
+        event.respondWith(networkFirst(request));
+    } else if (strategy === 'immutable') {
+        event.respondWith(cacheFirst(request));
+    } else if (strategy === 'revalidate') {
+        event.respondWith(staleWhileRevalidate(request, event));
+    }
+});
+
+function strategyFor(path) {
+    if (STRATEGIES.has(path)) {
+        return STRATEGIES.get(path);
+    }
+    if (IMMUTABLE_RE.test(path)) {
+        return 'immutable';
+    }
+    return CONFIG_API_RE.test(path) ? 'revalidate' : null;
+}
+
+async function cacheFirst(request) {
+    const cached = await caches.match(request);
+    if (cached) {
+        return cached;
+    }
+    const response = await fetch(request);
+    if (response.ok) {
+        const cache = await caches.open(RUNTIME);
+        await cache.put(request, response.clone());
+    }
+    return response;
+}
+
+async function staleWhileRevalidate(request, event) {
+    const cache = await caches.open(RUNTIME);
+    const cached = await cache.match(request) || await caches.match(request, { cacheName: PRECACHE });
+    const refresh = fetch(request).then(async (response) => {
+        if (response.ok) {
+            await cache.put(request, response.clone());
+        }
+        return response;
+    });
+    if (cached) {
+        event.waitUntil(refresh.catch(() => undefined));
+        return cached;
+    }
+    return refresh;
+}
+
+async function networkFirst(request) {
+    try {
+        const response = await fetch(request);
+        if (response.ok) {
+            const cache = await caches.open(RUNTIME);
+            await cache.put(request, response.clone());
+        }
+        return response;
+    } catch (error) {
+        // Offline: the last copy of this page, else the main dashboard
+        return await caches.match(request) || await caches.match('/index.html') || Response.error();
+    }
+}
+'''
+
+
+def _strategy(relative, pages):
+    if relative in pages:
+        return 'page'
+    if relative.endswith('.html') or relative in EXCLUDED_FILES or relative.endswith(EXCLUDED_SUFFIXES):
+        return None
+    if relative.startswith(EXCLUDED_DIRECTORIES):
+        return None
+    if HASHED_ASSET_RE.search(relative):
+        return 'immutable'
+    return 'revalidate'
+
+
+def precache_entries(manifest_files, pages):
+    """[{'url', 'strategy', 'checksum', 'size'}] for every file a page may request, sorted by URL"""
+    pages = set(pages)
+    entries = []
+    for relative, info in manifest_files.items():
+        relative = relative.replace('\\', '/')
+        strategy = _strategy(relative, pages)
+        if strategy is None:
+            continue
+        if strategy == 'revalidate' and not relative.endswith(REVALIDATE_SUFFIXES):
+            # Unhashed media and the like: left to the HTTP cache
+            continue
+        entries.append({'url': '/' + relative, 'strategy': strategy,
+                        'checksum': info['checksum'], 'size': info['size']})
+    return sorted(entries, key=lambda entry: entry['url'])
+
+
+def cache_version(entries):
+    """Changes whenever any precached file does"""
+    digest = hashlib.sha256()
+    for entry in entries:
+        digest.update(f'{entry["url"]}\0{entry["checksum"]}\n'.encode('utf-8'))
+    return digest.hexdigest()[:12]
+
+
+def render_service_worker(manifest_files, pages):
+    """(sw.js source, summary dict)"""
+    entries = precache_entries(manifest_files, pages)
+    version = cache_version(entries)
+    listing = '[\n' + ',\n'.join(f'    {json.dumps([entry["url"], entry["strategy"]])}' for entry in entries) + '\n]'
+    source = (SERVICE_WORKER_TEMPLATE
+              .replace('__VERSION__', version)
+              .replace('__ENTRIES__', listing))
+    strategies = {}
+    for entry in entries:
+        totals = strategies.setdefault(entry['strategy'], {'files': 0, 'bytes': 0})
+        totals['files'] += 1
+        totals['bytes'] += entry['size']
+    return source, {
+        'file': SERVICE_WORKER_FILE,
+        'version': version,
+        'precache_files': len(entries),
+        'precache_bytes': sum(entry['size'] for entry in entries),
+        'strategies': strategies
+    }
+
+
+def inject_registration(html):
+    """Page HTML with the registration script before the last </body>; unchanged if already there"""
+    if REGISTRATION_MARKER in html:
+        return html
+    # The last one: earlier </body> tags can sit inside script strings
+    position = html.lower().rfind('</body>')
+    if position == -1:
+        return html + REGISTRATION_SCRIPT
+    return html[:position] + REGISTRATION_SCRIPT + html[position:]
@@ -0,0 +1,326 @@
+#!/usr/bin/env python3
+"""
+VIB34D Shader Permutations
+Reads the GLSL templates out of core/ShaderManager.js, GeometryManager.js
+and ProjectionManager.js, splices every geometry/projection pair the way
+ShaderManager.createDynamicProgram() does, then minifies, hashes and
+deduplicates the results so clients fetch finished sources by hash
+instead of running replace() and recompiling per page
+
+The same pass runs static checks: each injection point appears exactly
+once, every u_* identifier is declared, and the functions the base shader
+and geometries call are defined exactly once.
+"""
+
+import gzip
+import hashlib
+import json
+import os
+import re
+import threading
+
+SHADER_INPUTS = [
+    'core/ShaderManager.js',
+    'core/GeometryManager.js',
+    'core/ProjectionManager.js'
+]
+
+# Packager output; a built package ships these instead of the core/ sources,
+# which fingerprinting renames
+COMPILED_DIR = 'shaders'
+COMPILED_INDEX = 'index.json'
+COMPILED_DIAGNOSTICS = 'diagnostics.json'
+
+GEOMETRY_INJECTION_POINT = '//__GEOMETRY_CODE_INJECTION_POINT__'
+PROJECTION_INJECTION_POINT = '//__PROJECTION_CODE_INJECTION_POINT__'
+
+# Names clients pass to createDynamicProgram() besides the registered ones;
+# GeometryManager.getGeometry() resolves unknown names to its default
+THEME_GEOMETRIES = ['hypercube', 'tetrahedron', 'sphere', 'torus', 'kleinbottle', 'fractal', 'wave', 'crystal']
+
+# Functions one part of the splice calls and another part must define
+REQUIRED_FUNCTIONS = ['calculateLattice', 'project4Dto3D']
+
+CLASS_RE = re.compile(r'class\s+(\w+)\s+extends\s+\w+\s*\{')
+TEMPLATE_RE = re.compile(r'getShaderCode\(\)\s*\{\s*return\s*`(.*?)`', re.S)
+REGISTER_RE = re.compile(r"register(?:Geometry|Projection)\('(\w+)',\s*new\s+(\w+)\(\)\)")
+DEFAULT_RE = re.compile(r"default(?:Geometry|Projection):\s*'(\w+)'")
+CONSTRUCTOR_RE = re.compile(r'constructor\((\w+)\s*=\s*(-?[\d.]+)\)')
+INTERPOLATION_RE = re.compile(r'\$\{this\.(\w+)\.toFixed\((\d+)\)\}')
+UNIFORM_DECL_RE = re.compile(r'\buniform\s+\w+\s+([\w\s,]+?);')
+FUNCTION_DEF_RE = re.compile(r'\b(?:void|float|int|bool|vec[234]|mat[234])\s+(\w+)\s*\([^;{)]*\)\s*\{')
+TOKEN_GAP_RE = re.compile(r'(?<=(\S)) (?=(\S))')
+
+
+class ShaderBuildError(RuntimeError):
+    """Raised when a shader source cannot be extracted"""
+
+
+def _method_template(source, method):
+    match = re.search(method + r'\(\)\s*\{\s*return\s*`(.*?)`', source, re.S)
+    if not match:
+        raise ShaderBuildError(f'Template for {method}() not found')
+    return match.group(1)
+
+
+def _class_bodies(source):
+    """{class name: source text up to the next class}"""
+    matches = list(CLASS_RE.finditer(source))
+    bodies = {}
+    for index, match in enumerate(matches):
+        end = matches[index + 1].start() if index + 1 < len(matches) else len(source)
+        bodies[match.group(1)] = source[match.start():end]
+    return bodies
+
+
+def _provider_sources(source, errors):
+    """(name -> GLSL for registered providers, default name)"""
+    bodies = _class_bodies(source)
+    providers = {}
+    for name, class_name in REGISTER_RE.findall(source):
+        body = bodies.get(class_name, '')
+        template = TEMPLATE_RE.search(body)
+        if not template:
+            errors.append(f'{class_name}: no getShaderCode() template')
+            continue
+        # ${this.field.toFixed(n)} takes the constructor default for that field
+        defaults = {}
+        for param, value in CONSTRUCTOR_RE.findall(body):
+            field = re.search(r'this\.(\w+)\s*=[^;]*\b' + param + r'\b', body)
+            defaults[field.group(1) if field else param] = float(value)
+
+        def substitute(match):
+            if match.group(1) not in defaults:
+                errors.append(f'{class_name}: cannot resolve this.{match.group(1)}')
+                return match.group(0)
+            return f'{defaults[match.group(1)]:.{int(match.group(2))}f}'
+
+        glsl = INTERPOLATION_RE.sub(substitute, template.group(1))
+        if '${' in glsl:
+            errors.append(f'{class_name}: unresolved template interpolation')
+        providers[name.lower()] = glsl
+    default = DEFAULT_RE.search(source)
+    return providers, default.group(1) if default else next(iter(providers), None)
+
+
+def load_shader_sources(root='.'):
+    """Base templates and provider GLSL, plus extraction errors"""
+    texts = {}
+    for document in SHADER_INPUTS:
+        with open(os.path.join(root, document), 'r', encoding='utf-8') as f:
+            texts[document] = f.read()
+    errors = []
+    geometries, default_geometry = _provider_sources(texts['core/GeometryManager.js'], errors)
+    projections, default_projection = _provider_sources(texts['core/ProjectionManager.js'], errors)
+    return {
+        'vertex': _method_template(texts['core/ShaderManager.js'], '_getBaseVertexShaderSource'),
+        'fragment': _method_template(texts['core/ShaderManager.js'], '_getBaseFragmentShaderSource'),
+        'geometries': geometries,
+        'projections': projections,
+        'defaultGeometry': default_geometry,
+        'defaultProjection': default_projection,
+        'errors': errors
+    }
+
+
+def _join_tokens(match):
+    left, right = match.group(1), match.group(2)
+    if (left.isalnum() or left in '_.') and (right.isalnum() or right in '_.'):
+        return ' '
+    # Keep "a - -b" from turning into a decrement
+    return ' ' if left == right and left in '+-' else ''
+
+
+def minify_glsl(source):
+    """Drop comments and collapse whitespace; preprocessor lines keep their newline"""
+    source = re.sub(r'/\*.*?\*/', ' ', source, flags=re.S)
+    chunks = []
+    run = []
+    for line in source.split('\n'):
+        line = line.split('//', 1)[0].strip()
+        if line.startswith('#'):
+            chunks.extend([' '.join(run), ' '.join(line.split())])
+            run = []
+        elif line:
+            run.append(line)
+    chunks.append(' '.join(run))
+    chunks = [TOKEN_GAP_RE.sub(_join_tokens, ' '.join(chunk.split())) if not chunk.startswith('#') else chunk
+              for chunk in chunks if chunk]
+    return '\n'.join(chunks)
+
+
+def check_shader(source):
+    """Static consistency problems in one spliced (unminified) fragment shader"""
+    problems = []
+    code = re.sub(r'//[^\n]*|/\*.*?\*/', ' ', source, flags=re.S)
+    declared = set()
+    for names in UNIFORM_DECL_RE.findall(code):
+        declared.update(name.strip() for name in names.split(','))
+    used = set(re.findall(r'\bu_\w+\b', code))
+    for name in sorted(used - declared):
+        problems.append(f'uniform {name} used but not declared')
+    definitions = FUNCTION_DEF_RE.findall(code)
+    for name in REQUIRED_FUNCTIONS:
+        count = definitions.count(name)
+        if count != 1:
+            problems.append(f'{name}() defined {count} times')
+    for opening, closing in ('{}', '()'):
+        if code.count(opening) != code.count(closing):
+            problems.append(f'unbalanced {opening}{closing}')
+    return problems
+
+
+def shader_hash(source):
+    return hashlib.sha256(source.encode('utf-8')).hexdigest()[:16]
+
+
+def build_permutations(sources):
+    """(index, {hash: minified source}, diagnostics) for every geometry/projection pair"""
+    shaders = {}
+    errors = list(sources['errors'])
+    warnings = []
+    fragment = sources['fragment']
+    for marker in (GEOMETRY_INJECTION_POINT, PROJECTION_INJECTION_POINT):
+        if fragment.count(marker) != 1:
+            errors.append(f'base fragment shader has {fragment.count(marker)} copies of {marker}')
+
+    vertex = minify_glsl(sources['vertex'])
+    vertex_hash = shader_hash(vertex)
+    shaders[vertex_hash] = vertex
+
+    geometry_names = list(sources['geometries'])
+    geometry_names += [name for name in THEME_GEOMETRIES if name not in sources['geometries']]
+    permutations = {}
+    source_bytes = 0
+    for geometry in geometry_names:
+        resolved_geometry = geometry if geometry in sources['geometries'] else sources['defaultGeometry']
+        for projection, projection_glsl in sources['projections'].items():
+            # Same replace order as createDynamicProgram()
+            spliced = fragment.replace(GEOMETRY_INJECTION_POINT, sources['geometries'][resolved_geometry], 1)
+            spliced = spliced.replace(PROJECTION_INJECTION_POINT, projection_glsl, 1)
+            for problem in check_shader(spliced):
+                errors.append(f'fragment-{geometry}-{projection}: {problem}')
+            source_bytes += len(sources['vertex']) + len(spliced)
+            minified = minify_glsl(spliced)
+            digest = shader_hash(minified)
+            shaders[digest] = minified
+            permutations[f'fragment-{geometry}-{projection}'] = {
+                'geometry': geometry,
+                'resolvedGeometry': resolved_geometry,
+                'projection': projection,
+                'vertex': vertex_hash,
+                'fragment': digest
+            }
+
+    declared = set()
+    for names in UNIFORM_DECL_RE.findall(fragment):
+        declared.update(name.strip() for name in names.split(','))
+    fragments = [shaders[permutation['fragment']] for permutation in permutations.values()]
+    for name in sorted(declared):
+        # One occurrence is the declaration itself
+        if all(len(re.findall(r'\b' + name + r'\b', source)) <= 1 for source in fragments):
+            warnings.append(f'uniform {name} declared but never used')
+
+    index = {
+        'format': 'vib34d-shaders',
+        'version': 1,
+        'defaultGeometry': sources['defaultGeometry'],
+        'defaultProjection': sources['defaultProjection'],
+        'geometries': geometry_names,
+        'projections': list(sources['projections']),
+        'permutations': permutations,
+        'shaders': {digest: {'bytes': len(source.encode('utf-8')), 'url': f'/api/shaders/{digest}'}
+                    for digest, source in shaders.items()}
+    }
+    diagnostics = {
+        'permutations': len(permutations),
+        'unique_shaders': len(shaders),
+        'source_bytes': source_bytes,
+        'minified_bytes': sum(len(source) for source in shaders.values()),
+        'errors': errors,
+        'warnings': warnings
+    }
+    return index, shaders, diagnostics
+
+
+def write_compiled(directory, index, shaders, diagnostics):
+    """Write build_permutations() output as <digest>.glsl files plus the index and diagnostics"""
+    os.makedirs(directory, exist_ok=True)
+    for digest, source in shaders.items():
+        with open(os.path.join(directory, f'{digest}.glsl'), 'wb') as f:
+            f.write(source.encode('utf-8'))
+    with open(os.path.join(directory, COMPILED_INDEX), 'w') as f:
+        json.dump(index, f, separators=(',', ':'))
+    with open(os.path.join(directory, COMPILED_DIAGNOSTICS), 'w') as f:
+        json.dump(diagnostics, f, indent=2)
+
+
+def load_compiled(directory):
+    """(index, shaders, diagnostics) as written by write_compiled()"""
+    with open(os.path.join(directory, COMPILED_INDEX), 'r', encoding='utf-8') as f:
+        index = json.load(f)
+    shaders = {}
+    for digest in index.get('shaders', {}):
+        with open(os.path.join(directory, f'{digest}.glsl'), 'rb') as f:
+            shaders[digest] = f.read().decode('utf-8')
+    try:
+        with open(os.path.join(directory, COMPILED_DIAGNOSTICS), 'r', encoding='utf-8') as f:
+            diagnostics = json.load(f)
+    except FileNotFoundError:
+        diagnostics = {
+            'permutations': len(index.get('permutations', {})),
+            'unique_shaders': len(shaders),
+            'minified_bytes': sum(len(source) for source in shaders.values()),
+            'errors': [],
+            'warnings': []
+        }
+    return index, shaders, diagnostics
+
+
+class ShaderPermutationCache:
+    """Rebuilds the permutations only when one of the core/ sources changes
+
+    Without the core/ sources (a built package) it serves the packager's
+    compiled shaders/ output instead.
+    """
+
+    def __init__(self, root='.'):
+        self.root = root
+        self.lock = threading.Lock()
+        self.signature = None
+        self.compiled = None
+
+    def _signature(self):
+        signature = []
+        for document in SHADER_INPUTS + [os.path.join(COMPILED_DIR, COMPILED_INDEX)]:
+            try:
+                stat = os.stat(os.path.join(self.root, document))
+                signature.append((stat.st_mtime_ns, stat.st_size))
+            except OSError:
+                signature.append(None)
+        return tuple(signature)
+
+    def get(self):
+        """{'index': (json, gzip, etag), 'shaders': {hash: (bytes, gzip)}, 'diagnostics': {...}}"""
+        with self.lock:
+            signature = self._signature()
+            if signature != self.signature:
+                if all(part is not None for part in signature[:len(SHADER_INPUTS)]):
+                    index, shaders, diagnostics = build_permutations(load_shader_sources(self.root))
+                elif signature[-1] is not None:
+                    index, shaders, diagnostics = load_compiled(os.path.join(self.root, COMPILED_DIR))
+                else:
+                    raise ShaderBuildError(f'Neither {", ".join(SHADER_INPUTS)} nor '
+                                           f'{COMPILED_DIR}/{COMPILED_INDEX} found under {self.root}')
+                body = json.dumps(index, separators=(',', ':')).encode('utf-8')
+                self.compiled = {
+                    'index': (body, gzip.compress(body, 9, mtime=0),
+                              '"' + hashlib.sha1(body).hexdigest()[:20] + '"'),
+                    'shaders': {
+                        digest: (source.encode('utf-8'), gzip.compress(source.encode('utf-8'), 9, mtime=0))
+                        for digest, source in shaders.items()
+                    },
+                    'diagnostics': diagnostics
+                }
+                self.signature = signature
+            return self.compiled
@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""
+VIB34D Package Smoke Test
+Starts a built package's own production server in-process on a free
+port and checks the API routes the dashboards depend on. The package is
+the working directory, and the server runs on the package's copies of
+the vib34d_* helpers, not the source tree's. The packager runs this
+against every build, so a route that only breaks in the packaged tree
+(e.g. sources renamed by fingerprinting) fails the build.
+
+Usage:
+    python3 vib34d_smoke_test.py [production-package]
+"""
+
+import argparse
+import contextlib
+import http.client
+import importlib.util
+import json
+import os
+import sys
+import threading
+from pathlib import Path
+from urllib.parse import quote
+
+# Routes that must answer 200 with a JSON body in every package
+SMOKE_ROUTES = [
+    '/api/status',
+    '/api/config',
+    '/api/validation',
+    '/api/parameters',
+    '/api/events/dispatch',
+    '/api/resolved',
+    '/api/shaders',
+    '/api/shaders/diagnostics'
+]
+
+
+class SmokeTestError(Exception):
+    """Raised when the package has no server to start"""
+
+
+def load_package_server(package_dir):
+    """The package's production-server.py, importing the package's own vib34d_* modules"""
+    package_dir = Path(package_dir).resolve()
+    server_path = package_dir / 'production-server.py'
+    if not server_path.exists():
+        raise SmokeTestError(f'{server_path} not found; expected a built package')
+    # Helpers already imported from elsewhere (e.g. the source tree) would shadow the packaged ones
+    for name in [name for name in sys.modules if name.startswith('vib34d_')]:
+        del sys.modules[name]
+    sys.path.insert(0, str(package_dir))
+    spec = importlib.util.spec_from_file_location('vib34d_package_server', server_path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+@contextlib.contextmanager
+def serve_package(package_dir):
+    """Yield (server module, handler class, port) for a quiet server over package_dir"""
+    previous_cwd = os.getcwd()
+    # Handler caches resolve paths against the working directory
+    os.chdir(Path(package_dir).resolve())
+    try:
+        module = load_package_server('.')
+
+        class QuietHandler(module.VIB34DProductionHandler):
+            def log_message(self, format, *args):
+                pass
+
+        # One scan is enough; nothing changes under the package meanwhile
+        QuietHandler.static_index.build()
+        server = module.VIB34DThreadingServer(('127.0.0.1', 0), QuietHandler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        try:
+            yield module, QuietHandler, server.server_address[1]
+        finally:
+            server.shutdown()
+            server.server_close()
+    finally:
+        os.chdir(previous_cwd)
+
+
+def fetch(port, route):
+    """(status, {lowercase header: value}, body) for a plain GET without Accept-Encoding"""
+    connection = http.client.HTTPConnection('127.0.0.1', port, timeout=60)
+    try:
+        connection.request('GET', quote(route))
+        response = connection.getresponse()
+        body = response.read()
+        return response.status, {name.lower(): value for name, value in response.getheaders()}, body
+    finally:
+        connection.close()
+
+
+def smoke_test(package_dir):
+    """[{'route', 'status', 'bytes', 'error'}] for every smoke route plus one compiled shader"""
+    results = []
+    with serve_package(package_dir) as (module, handler, port):
+        routes = list(SMOKE_ROUTES)
+        while routes:
+            route = routes.pop(0)
+            status, headers, body = fetch(port, route)
+            result = {'route': route, 'status': status, 'bytes': len(body), 'error': None}
+            if status != 200:
+                result['error'] = f'HTTP {status}'
+            elif headers.get('content-type', '').startswith('application/json'):
+                try:
+                    data = json.loads(body)
+                except json.JSONDecodeError as e:
+                    result['error'] = f'invalid JSON: {e}'
+                else:
+                    if route == '/api/shaders' and data.get('shaders'):
+                        routes.append(next(iter(data['shaders'].values()))['url'])
+            elif route.startswith('/api/shaders/') and 'immutable' not in headers.get('cache-control', ''):
+                result['error'] = 'compiled shader is not served as immutable'
+            results.append(result)
+    return results
+
+
+def main():
+    """Command line entry point"""
+    parser = argparse.ArgumentParser(description='VIB34D package smoke test')
+    parser.add_argument('package', nargs='?', default='production-package', help='Built package directory')
+    args = parser.parse_args()
+
+    try:
+        results = smoke_test(args.package)
+    except (SmokeTestError, OSError) as e:
+        print(f'❌ {e}')
+        sys.exit(1)
+    failures = [result for result in results if result['error']]
+    for result in results:
+        if result['error']:
+            print(f'❌ {result["route"]}: {result["error"]}')
+        else:
+            print(f'✅ {result["route"]}: {result["bytes"]:,} bytes')
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,265 @@
+#!/usr/bin/env python3
+"""
+VIB34D Static Export
+Runs the production handler in-process over a built package and saves
+every page alias, static file and parameterless API response into a
+directory any static host can serve: each response under a matching
+filename, a .gz sibling for compressible files, Netlify/Cloudflare style
+_headers and _redirects, and static-routes.json as a host-neutral map.
+
+API routes are found by following the /api/ links in responses plus the
+document, geometry, theme and face/role listings. Query-string variants,
+POST routes and live diagnostics stay with the Python server.
+
+Usage:
+    python3 vib34d_static_export.py [production-package] [-o static-site]
+"""
+
+import argparse
+import gzip
+import json
+import os
+import shutil
+import sys
+from collections import deque
+from pathlib import Path
+from urllib.parse import urlparse
+
+from vib34d_smoke_test import SmokeTestError, fetch, serve_package
+
+ROUTES_FILE = 'static-routes.json'
+
+# Parameterless GET routes the crawl starts from
+SEED_ROUTES = [
+    '/api/status',
+    '/api/config',
+    '/api/visualizers',
+    '/api/validation',
+    '/api/parameters',
+    '/api/resolved',
+    '/api/events/dispatch',
+    '/api/events/diagnostics',
+    '/api/geometry',
+    '/api/keyframes',
+    '/api/shaders',
+    '/api/shaders/diagnostics',
+    '/api/preview'
+]
+
+# Live or write routes that have no static equivalent
+DYNAMIC_ROUTES = ('/api/rum', '/api/metrics', '/api/debug/', '/api/config/writes', '/api/config/flush')
+
+# A config document that is missing or fails validation answers one of these; any other error fails the export
+CONFIG_DOCUMENT_ROUTE = '/api/config/'
+TOLERATED_STATUSES = (404, 422)
+
+# Server-side files that are not part of the site
+EXCLUDED_SUFFIXES = ('.py', '.pyc', '.sh', '.bat')
+EXCLUDED_FILES = {'package.json', 'package-manifest.json', 'build-report.json'}
+EXCLUDED_DIRECTORIES = ('scripts/', 'tests/', 'documentation/')
+
+# Per-response headers that must not be frozen into the header map
+VOLATILE_HEADERS = {'date', 'server', 'content-length', 'last-modified', 'etag', 'server-timing', 'x-trace-id',
+                    'connection', 'vary', 'content-encoding'}
+
+CONTENT_TYPE_EXTENSIONS = {
+    'application/json': '.json',
+    'application/octet-stream': '.bin',
+    'text/plain': '.txt',
+    'text/html': '.html',
+    'image/png': '.png'
+}
+COMPRESSIBLE_TYPES = ('text/', 'application/json', 'application/javascript', 'application/wasm',
+                      'application/octet-stream', 'image/svg+xml')
+# Skip .gz siblings that save less than this fraction
+MIN_GZIP_SAVING = 0.1
+
+
+class ExportError(Exception):
+    """Raised when the package cannot be served, a route fails or the output directory is unsafe to replace"""
+
+
+def _expansions(route, data):
+    """Child routes a listing response implies but doesn't link"""
+    if route == '/api/geometry':
+        return [f'/api/geometry/{name}' for name in data.get('types', [])]
+    if route == '/api/keyframes':
+        return [f'/api/keyframes/{name}' for name in data.get('themes', {})]
+    if route == '/api/resolved':
+        return [f'/api/resolved/{face["face"]}/{role}' for face in data.get('faces', []) for role in data.get('roles', [])]
+    return []
+
+
+def _api_links(value):
+    if isinstance(value, str):
+        if value.startswith('/api/'):
+            yield urlparse(value).path
+    elif isinstance(value, dict):
+        for item in value.values():
+            yield from _api_links(item)
+    elif isinstance(value, list):
+        for item in value:
+            yield from _api_links(item)
+
+
+def _output_name(route, content_type):
+    """Relative file for one route: static paths as-is, extensionless API routes get one from the type"""
+    if route == '/':
+        return 'index.html'
+    relative = route.lstrip('/')
+    if route.startswith('/api/') and not os.path.splitext(relative)[1]:
+        relative += CONTENT_TYPE_EXTENSIONS.get(content_type.split(';')[0].strip(), '.bin')
+    return relative
+
+
+def _is_static(url):
+    relative = url.lstrip('/')
+    return not (relative.endswith(EXCLUDED_SUFFIXES) or relative in EXCLUDED_FILES
+                or relative.startswith(EXCLUDED_DIRECTORIES))
+
+
+def export_static_site(package_dir, output_dir):
+    """Write the static site; returns a summary dict"""
+    package_dir = Path(package_dir).resolve()
+    output_dir = Path(output_dir).resolve()
+    if output_dir.exists():
+        if any(output_dir.iterdir()) and not (output_dir / ROUTES_FILE).exists():
+            raise ExportError(f'{output_dir} is not empty and not a previous export; refusing to replace it')
+        shutil.rmtree(output_dir)
+
+    try:
+        with serve_package(package_dir) as (module, handler, port):
+            return _crawl(module, handler, port, output_dir)
+    except SmokeTestError as e:
+        raise ExportError(str(e))
+
+
+def _header_case(name):
+    return '-'.join(part.capitalize() for part in name.split('-'))
+
+
+def _crawl(module, handler, port, output_dir):
+    static_urls = sorted(url for url in handler.static_index.files if _is_static(url))
+    queue = deque(list(module.PAGE_ALIASES) + static_urls + SEED_ROUTES)
+    queue.extend(f'/api/config/{doc_id}' for doc_id in sorted(handler.config_index.documents))
+    seen = set()
+    routes = {}
+    bodies = {}
+    skipped = {}
+    failures = []
+
+    while queue:
+        route = queue.popleft()
+        if route in seen or route.startswith(DYNAMIC_ROUTES):
+            continue
+        seen.add(route)
+        status, headers, body = fetch(port, route)
+        if status != 200:
+            if route.startswith(CONFIG_DOCUMENT_ROUTE) and status in TOLERATED_STATUSES:
+                skipped[route] = status
+            else:
+                failures.append(f'{route} ({status})')
+            continue
+
+        content_type = headers.get('content-type', 'application/octet-stream')
+        if route == '/':
+            relative = 'index.html'
+        elif route in module.PAGE_ALIASES:
+            relative = module.PAGE_ALIASES[route].lstrip('/')
+        else:
+            relative = _output_name(route, content_type)
+        bodies[relative] = body
+        routes[route] = {
+            'file': relative,
+            'content_type': content_type,
+            'cache_control': headers.get('cache-control'),
+            'etag': headers.get('etag'),
+            'bytes': len(body),
+            'gzip_bytes': None,
+            'headers': {name: value for name, value in headers.items() if name not in VOLATILE_HEADERS}
+        }
+
+        if route.startswith('/api/') and content_type.startswith('application/json'):
+            data = json.loads(body)
+            queue.extend(link for link in list(_api_links(data)) + _expansions(route, data) if link not in seen)
+
+    if failures:
+        # A static site silently missing a route would only show up in production
+        raise ExportError(f'{len(failures)} routes failed: {", ".join(failures)}')
+
+    output_dir.mkdir(parents=True)
+    for relative, body in bodies.items():
+        destination = output_dir / relative
+        destination.parent.mkdir(parents=True, exist_ok=True)
+        destination.write_bytes(body)
+
+    gzip_bytes = {}
+    for info in routes.values():
+        body = bodies[info['file']]
+        if body and info['content_type'].startswith(COMPRESSIBLE_TYPES):
+            if info['file'] not in gzip_bytes:
+                # mtime=0 keeps repeat exports byte-identical
+                compressed = gzip.compress(body, 9, mtime=0)
+                saved = len(compressed) <= len(body) * (1 - MIN_GZIP_SAVING)
+                if saved:
+                    (output_dir / (info['file'] + '.gz')).write_bytes(compressed)
+                gzip_bytes[info['file']] = len(compressed) if saved else None
+            info['gzip_bytes'] = gzip_bytes[info['file']]
+
+    # Headers every response carries go under /*, the rest per route
+    header_sets = [info['headers'] for info in routes.values()]
+    common = dict(header_sets[0]) if header_sets else {}
+    for headers in header_sets[1:]:
+        common = {name: value for name, value in common.items() if headers.get(name) == value}
+    header_lines = ['/*'] + [f'  {_header_case(name)}: {value}' for name, value in sorted(common.items())]
+    redirect_lines = []
+    for route, info in sorted(routes.items()):
+        info['headers'] = {name: value for name, value in info['headers'].items() if name not in common}
+        header_lines.append(route)
+        header_lines.extend(f'  {_header_case(name)}: {value}' for name, value in sorted(info['headers'].items()))
+        if route != '/' and route != '/' + info['file']:
+            # Rewrite, not redirect: the browser keeps the route's URL
+            redirect_lines.append(f'{route}  /{info["file"]}  200')
+
+    (output_dir / '_headers').write_text('\n'.join(header_lines) + '\n')
+    (output_dir / '_redirects').write_text('\n'.join(redirect_lines) + '\n')
+    with open(output_dir / ROUTES_FILE, 'w') as f:
+        json.dump({'format': 'vib34d-static-routes', 'version': 1, 'common_headers': common,
+                   'routes': dict(sorted(routes.items())), 'skipped': skipped}, f, indent=2)
+
+    return {
+        'output_dir': str(output_dir),
+        'routes': len(routes),
+        'api_routes': sum(1 for route in routes if route.startswith('/api/')),
+        'files': len(bodies),
+        'bytes': sum(len(body) for body in bodies.values()),
+        'gzip_files': sum(1 for size in gzip_bytes.values() if size),
+        'gzip_bytes': sum(size for size in gzip_bytes.values() if size),
+        'rewrites': len(redirect_lines),
+        'skipped': skipped
+    }
+
+
+def main():
+    """Command line entry point"""
+    parser = argparse.ArgumentParser(description='VIB34D static site export')
+    parser.add_argument('package', nargs='?', default='production-package', help='Built package directory')
+    parser.add_argument('-o', '--output', default='static-site')
+    args = parser.parse_args()
+
+    print(f'📦 Exporting {args.package} to {args.output}...')
+    try:
+        summary = export_static_site(args.package, args.output)
+    except (ExportError, OSError) as e:
+        print(f'❌ {e}')
+        sys.exit(1)
+    print(f'✅ Exported {summary["routes"]} routes ({summary["api_routes"]} API) as {summary["files"]} files, '
+          f'{summary["bytes"] / 1024:.1f} KB')
+    print(f'   🗜️ {summary["gzip_files"]} .gz siblings, {summary["gzip_bytes"] / 1024:.1f} KB')
+    print(f'   ↪️ {summary["rewrites"]} rewrites in _redirects')
+    for route, status in sorted(summary['skipped'].items()):
+        print(f'   ⏭️ Skipped {route} ({status})')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""
+VIB34D Static File Index
+Maps every servable URL path to its file, stat signature, MIME type and
+ready-made validator headers, so static requests and 404s are answered
+from a dict instead of translate_path(), isdir() and index.html probes.
+Directory listings are not served.
+
+A background thread rescans the tree with os.scandir() every few seconds
+and swaps in a new map; unchanged entries are reused. Hidden files and
+directories (.git, .vib34d-cache, ...) are never indexed.
+"""
+
+import email.utils
+import mimetypes
+import os
+import posixpath
+import threading
+import time
+from urllib.parse import unquote
+
+POLL_INTERVAL = 2.0
+SKIPPED_DIRECTORIES = {'__pycache__'}
+INDEX_FILES = ['index.html', 'index.htm']
+
+
+class StaticEntry:
+    """One servable file and the headers it is sent with"""
+
+    __slots__ = ('path', 'size', 'mtime_ns', 'content_type', 'etag', 'last_modified')
+
+    def __init__(self, path, stat):
+        self.path = path
+        self.size = stat.st_size
+        self.mtime_ns = stat.st_mtime_ns
+        self.content_type = mimetypes.guess_type(path)[0] or 'application/octet-stream'
+        self.etag = f'"{self.mtime_ns:x}-{self.size:x}"'
+        self.last_modified = email.utils.formatdate(stat.st_mtime, usegmt=True)
+
+    def matches(self, stat):
+        return (stat.st_size, stat.st_mtime_ns) == (self.size, self.mtime_ns)
+
+
+class StaticFileIndex:
+    """URL path -> StaticEntry for every file under root, kept current by polling"""
+
+    def __init__(self, root='.', poll_interval=POLL_INTERVAL):
+        self.root = root
+        self.poll_interval = poll_interval
+        self.lock = threading.Lock()
+        self.files = None
+        self.directories = frozenset()
+        self.thread = None
+        self.stopping = threading.Event()
+        self.scans = 0
+        self.last_scan_seconds = None
+
+    def _scan(self, previous):
+        files = {}
+        directories = {'/'}
+        pending = [('/', self.root)]
+        while pending:
+            url_dir, fs_dir = pending.pop()
+            try:
+                entries = list(os.scandir(fs_dir))
+            except OSError:
+                continue
+            for entry in entries:
+                if entry.name.startswith('.'):
+                    continue
+                url = url_dir + entry.name
+                try:
+                    if entry.is_dir():
+                        if entry.name not in SKIPPED_DIRECTORIES:
+                            directories.add(url + '/')
+                            pending.append((url + '/', entry.path))
+                    elif entry.is_file():
+                        stat = entry.stat()
+                        known = previous.get(url)
+                        if known is None or not known.matches(stat):
+                            known = StaticEntry(entry.path, stat)
+                        files[url] = known
+                except OSError:
+                    continue
+        return files, frozenset(directories)
+
+    def build(self):
+        """Rescan the tree; returns the number of indexed files"""
+        started = time.perf_counter()
+        files, directories = self._scan(self.files or {})
+        with self.lock:
+            self.files, self.directories = files, directories
+            self.scans += 1
+            self.last_scan_seconds = time.perf_counter() - started
+        return len(files)
+
+    def start(self):
+        """Initial scan plus the background watcher"""
+        count = self.build()
+        if self.thread is None:
+            self.thread = threading.Thread(target=self._watch, name='static-index', daemon=True)
+            self.thread.start()
+        return count
+
+    def stop(self):
+        self.stopping.set()
+
+    def _watch(self):
+        while not self.stopping.wait(self.poll_interval):
+            self.build()
+
+    def lookup(self, url_path):
+        """('file', url, entry), ('redirect', location) or None"""
+        if self.files is None:
+            self.build()
+        path = unquote(url_path.split('?', 1)[0].split('#', 1)[0])
+        trailing = path.endswith('/')
+        path = posixpath.normpath('/' + path.lstrip('/'))
+        if any(part.startswith('.') for part in path.split('/') if part):
+            return None
+        files, directories = self.files, self.directories
+        directory = path if path.endswith('/') else path + '/'
+        if not trailing and path in files:
+            return 'file', path, files[path]
+        if directory in directories:
+            if not trailing:
+                return 'redirect', directory
+            for name in INDEX_FILES:
+                entry = files.get(directory + name)
+                if entry is not None:
+                    return 'file', directory + name, entry
+        return None
+
+    def refresh(self, url, path, stat):
+        """Replace an entry whose file changed since the last scan"""
+        entry = StaticEntry(path, stat)
+        with self.lock:
+            self.files = {**self.files, url: entry}
+        return entry
+
+    def forget(self, url):
+        """Drop an entry whose file vanished since the last scan"""
+        with self.lock:
+            if url in self.files:
+                self.files = {name: entry for name, entry in self.files.items() if name != url}
+
+    def describe(self):
+        return {
+            'files': len(self.files or {}),
+            'directories': len(self.directories),
+            'scans': self.scans,
+            'last_scan_ms': round(self.last_scan_seconds * 1000, 3) if self.last_scan_seconds else None,
+            'poll_interval_seconds': self.poll_interval
+        }
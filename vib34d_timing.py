@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+VIB34D Request Timing
+Splits each request into exclusive stages (route, lookup, fs, api,
+serialize, write, ...) on the monotonic clock, renders them as a
+Server-Timing header for browser devtools, and appends requests slower
+than a threshold to a JSON-lines log with their trace id and breakdown
+
+Stages nest: time spent in an inner stage is not charged to the outer
+one, so the breakdown always sums to the request total.
+"""
+
+import contextlib
+import json
+import os
+import re
+import threading
+import time
+
+TRACE_HEADER = 'X-Trace-Id'
+TRACE_ID_RE = re.compile(r'^[0-9A-Za-z._-]{1,64}$')
+SLOW_REQUEST_ENV = 'VIB34D_SLOW_REQUEST_MS'
+SLOW_REQUEST_LOG = os.path.join('.vib34d-cache', 'slow-requests.jsonl')
+
+# Time not inside any named stage (request parsing, header writing)
+ROOT_STAGE = 'app'
+
+
+def new_trace_id():
+    return os.urandom(8).hex()
+
+
+def trace_id_from(headers):
+    """Client-supplied X-Trace-Id or a W3C traceparent trace id, else a fresh one"""
+    trace_id = (headers.get(TRACE_HEADER) or '').strip()
+    if TRACE_ID_RE.match(trace_id):
+        return trace_id
+    parts = (headers.get('traceparent') or '').strip().split('-')
+    if len(parts) == 4 and re.match(r'^[0-9a-f]{32}$', parts[1]):
+        return parts[1]
+    return new_trace_id()
+
+
+class RequestTimer:
+    """Exclusive per-stage durations for one request"""
+
+    def __init__(self, trace_id=None):
+        self.trace_id = trace_id or new_trace_id()
+        self.wall_started = time.time()
+        self.started = time.perf_counter()
+        self.mark = self.started
+        self.stack = [ROOT_STAGE]
+        self.durations = {}
+
+    def _charge(self, now):
+        stage = self.stack[-1]
+        self.durations[stage] = self.durations.get(stage, 0.0) + (now - self.mark)
+        self.mark = now
+
+    @contextlib.contextmanager
+    def stage(self, name):
+        self._charge(time.perf_counter())
+        self.stack.append(name)
+        try:
+            yield
+        finally:
+            self._charge(time.perf_counter())
+            self.stack.pop()
+
+    def elapsed_ms(self):
+        return (time.perf_counter() - self.started) * 1000
+
+    def breakdown(self):
+        """{stage: milliseconds} so far, in first-entered order"""
+        self._charge(time.perf_counter())
+        return {stage: round(seconds * 1000, 3) for stage, seconds in self.durations.items()}
+
+    def header(self):
+        """Server-Timing value; only covers work done before the headers went out"""
+        stages = [f'{stage};dur={ms:.3f}' for stage, ms in self.breakdown().items() if ms > 0]
+        stages.append(f'total;dur={self.elapsed_ms():.3f}')
+        return ', '.join(stages)
+
+
+class SlowRequestLog:
+    """Appends requests over threshold_ms as JSON lines; disabled when threshold_ms is None"""
+
+    def __init__(self, path=SLOW_REQUEST_LOG, threshold_ms=None):
+        self.path = path
+        self.threshold_ms = threshold_ms
+        self.lock = threading.Lock()
+        self.logged = 0
+
+    @classmethod
+    def from_environment(cls, path=SLOW_REQUEST_LOG):
+        value = os.environ.get(SLOW_REQUEST_ENV)
+        try:
+            return cls(path, float(value) if value else None)
+        except ValueError:
+            print(f"⚠️ Ignoring {SLOW_REQUEST_ENV}={value!r}: not a number")
+            return cls(path, None)
+
+    def record(self, timer, method, path, status):
+        """Write one entry if the request was slow; True when it was logged"""
+        if self.threshold_ms is None:
+            return False
+        total = timer.elapsed_ms()
+        if total < self.threshold_ms:
+            return False
+        entry = {
+            'time': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'start': round(timer.wall_started, 3),
+            'trace': timer.trace_id,
+            'method': method,
+            'path': path,
+            'status': status,
+            'total_ms': round(total, 3),
+            'stages': timer.breakdown()
+        }
+        line = json.dumps(entry, separators=(',', ':')) + '\n'
+        with self.lock:
+            os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+            with open(self.path, 'a', encoding='utf-8') as f:
+                f.write(line)
+            self.logged += 1
+        return True